@@ -0,0 +1,167 @@
+"""Snapshot colunar do catálogo para relatórios que cruzam todos os eventos.
+
+Cada campo fica numa coluna ``array`` tipada (uma posição por evento): id, tipo,
+data, mês, categoria, capacidade, preço, inscritos e check-ins. ``atualizar(evento)``
+regrava só a linha do evento (O(1)), então o SistemaEventos mantém o snapshot em
+dia a cada operação, como faz com o MotorRelatorios.
+
+As consultas agrupam direto nas colunas, sem tocar nos objetos Evento. Com NumPy
+instalado, as colunas viram arrays sem cópia (``np.frombuffer``) e as somas por
+grupo saem de ``np.unique`` + ``np.bincount``; sem ele, um único laço sobre as
+colunas faz o mesmo trabalho.
+"""
+import threading                               # atualizado por várias threads
+from array import array                        # colunas tipadas e contíguas
+from datetime import date                      # data de corte do no-show
+
+try:
+    import numpy as np                         # opcional: agregações vetorizadas
+except ImportError:
+    np = None
+
+_TIPOS = ("evento", "workshop", "palestra")
+_COLUNAS = (("id", "q"), ("tipo", "b"), ("data", "q"), ("mes", "q"), ("categoria", "q"),
+            ("capacidade", "q"), ("preco", "q"), ("inscritos", "q"), ("checkins", "q"))
+
+
+def _mes_texto(mes: int) -> str:
+    return f"{mes // 12:04d}-{mes % 12 + 1:02d}"
+
+
+class ColunasEventos:
+    """Colunas do catálogo (preço em centavos, data em ordinal, mês como ano*12 + mês-1).
+
+    ``usar_numpy=False`` força o caminho sem NumPy (o padrão é usá-lo se estiver instalado).
+    """
+    def __init__(self, eventos=(), usar_numpy: bool = True):
+        self._trava = threading.Lock()
+        self._np = np if usar_numpy else None
+        self._linha = {}                        # id -> posição nas colunas
+        self._categorias = []                   # código -> nome da categoria
+        self._cod_categoria = {}                # nome da categoria -> código
+        for nome, tipo in _COLUNAS:
+            setattr(self, nome, array(tipo))
+        for e in eventos:
+            self.atualizar(e)
+
+    def __len__(self) -> int:
+        return len(self._linha)
+
+    def atualizar(self, evento) -> None:
+        """Grava (ou regrava) a linha do evento."""
+        data = evento.data_evento
+        with self._trava:
+            cat = self._cod_categoria.get(evento.categoria)
+            if cat is None:
+                cat = self._cod_categoria[evento.categoria] = len(self._categorias)
+                self._categorias.append(evento.categoria)
+            valores = (evento.id, _TIPOS.index(evento.tipo) if evento.tipo in _TIPOS else -1,
+                       data.toordinal(), data.year * 12 + data.month - 1, cat, evento.capacidade_max,
+                       round(float(evento.preco) * 100), evento.total_inscritos(), evento.total_checkins())
+            i = self._linha.get(evento.id)
+            if i is None:
+                self._linha[evento.id] = len(self.id)
+                for (nome, _), v in zip(_COLUNAS, valores):
+                    getattr(self, nome).append(v)
+            else:
+                for (nome, _), v in zip(_COLUNAS, valores):
+                    getattr(self, nome)[i] = v
+
+    # ---------- consultas ----------
+    def receita_por_categoria_mes(self) -> dict:
+        """{categoria: {"AAAA-MM": {"eventos", "inscritos", "receita"}}} (receita em reais)."""
+        with self._trava:
+            if not self._linha:
+                return {}
+            base = min(self.mes)
+            n_meses = max(self.mes) - base + 1
+            cat, mes = self._colunas("categoria", "mes")
+            if self._np is not None:                     # chave única por (categoria, mês)
+                chaves = cat * n_meses + (mes - base)
+            else:
+                chaves = [c * n_meses + m - base for c, m in zip(cat, mes)]
+            grupos = self._somar(chaves, ("inscritos", "receita"))
+            del cat, mes, chaves                         # solta as visões antes de liberar a trava
+            nomes = list(self._categorias)
+        resultado = {}
+        for chave, (eventos, inscritos, receita) in grupos.items():
+            c, m = divmod(chave, n_meses)
+            resultado.setdefault(nomes[c], {})[_mes_texto(m + base)] = {
+                "eventos": eventos, "inscritos": inscritos, "receita": receita / 100}
+        return {c: dict(sorted(m.items())) for c, m in sorted(resultado.items())}
+
+    def distribuicao_ocupacao(self, faixas: int = 10) -> list:
+        """Quantos eventos em cada faixa de ocupação: [0%, 10%), [10%, 20%), ..., [90%, 100%]."""
+        with self._trava:
+            if not self._linha:
+                return [0] * faixas
+            ins, cap = self._colunas("inscritos", "capacidade")
+            if self._np is not None:
+                chaves = self._np.minimum(ins * faixas // self._np.maximum(cap, 1), faixas - 1)
+            else:
+                chaves = [min(i * faixas // max(c, 1), faixas - 1) for i, c in zip(ins, cap)]
+            grupos = self._somar(chaves, ())
+            del ins, cap, chaves                         # solta as visões antes de liberar a trava
+        return [grupos.get(f, (0,))[0] for f in range(faixas)]
+
+    def no_show_por_categoria(self, ate: date = None) -> dict:
+        """{categoria: {"eventos", "inscritos", "checkins", "no_show"}} dos eventos até ``ate`` (inclusive).
+
+        ``no_show`` é a fração de inscritos sem check-in. Sem ``ate``, considera o catálogo todo.
+        """
+        with self._trava:
+            if not self._linha:
+                return {}
+            cat, datas = self._colunas("categoria", "data")
+            filtro = None
+            if ate is not None:
+                filtro = datas <= ate.toordinal() if self._np is not None else [d <= ate.toordinal() for d in datas]
+            grupos = self._somar(cat, ("inscritos", "checkins"), filtro)
+            del cat, datas                               # solta as visões antes de liberar a trava
+            nomes = list(self._categorias)
+        return {nomes[c]: {"eventos": n, "inscritos": i, "checkins": k, "no_show": (1 - k / i) if i else 0.0}
+                for c, (n, i, k) in sorted(grupos.items(), key=lambda g: nomes[g[0]])}
+
+    # ---------- util (chamados sob a trava) ----------
+    def _colunas(self, *nomes):
+        """As colunas pedidas: visões NumPy sem cópia ou os próprios arrays.
+
+        Enquanto uma visão existir o ``array`` não pode crescer (BufferError no append),
+        então elas não podem sobreviver à trava.
+        """
+        if self._np is None:
+            return [getattr(self, n) for n in nomes]
+        return [self._np.frombuffer(getattr(self, n), dtype=self._np.int8 if n == "tipo" else self._np.int64)
+                for n in nomes]
+
+    def _somar(self, chaves, valores, filtro=None) -> dict:
+        """{chave: (nº de eventos, soma de cada valor)}; "receita" é inscritos x preço (centavos)."""
+        cols = [self._receita() if v == "receita" else self._colunas(v)[0] for v in valores]
+        npy = self._np
+        if npy is not None:
+            chaves = npy.asarray(chaves, dtype=npy.int64)
+            if filtro is not None:
+                chaves, cols = chaves[filtro], [c[filtro] for c in cols]
+            unicas, inverso = npy.unique(chaves, return_inverse=True)
+            somas = [npy.bincount(inverso, minlength=len(unicas))]
+            somas += [npy.bincount(inverso, weights=c, minlength=len(unicas)).round().astype(npy.int64)
+                      for c in cols]
+            return {k: tuple(int(s[j]) for s in somas) for j, k in enumerate(unicas.tolist())}
+        grupos = {}
+        for j, (chave, *vals) in enumerate(zip(chaves, *cols)):
+            if filtro is not None and not filtro[j]:
+                continue
+            g = grupos.get(chave)
+            if g is None:
+                grupos[chave] = [1] + vals
+            else:
+                g[0] += 1
+                for k, v in enumerate(vals, start=1):
+                    g[k] += v
+        return {k: tuple(g) for k, g in grupos.items()}
+
+    def _receita(self):
+        inscritos, preco = self._colunas("inscritos", "preco")
+        if self._np is not None:
+            return inscritos * preco
+        return [i * p for i, p in zip(inscritos, preco)]
@@ -0,0 +1,168 @@
+"""Arquivo frio: eventos que já passaram, guardados fora do snapshot e da memória.
+
+Cada mês de ``data_evento`` tem um arquivo só de acréscimo, ``<pasta>/AAAA-MM.jsonl.gz``.
+Cada arquivamento anexa a ele blocos gzip (membros independentes; o arquivo
+inteiro continua legível com ``gzip.open``) de até ``eventos_por_bloco`` eventos,
+um por linha, no formato autocontido de ``Evento.to_dict()`` — nome e e-mail dentro
+do evento, sem a tabela de participantes do snapshot.
+
+O índice ``<pasta>/indice.jsonl`` ganha uma linha por bloco (mês, posição, tamanho
+e IDs), gravada depois do bloco: um bloco sem linha no índice (queda no meio) é
+ignorado. Buscar um evento arquivado custa descomprimir um bloco, e os últimos
+blocos lidos ficam num pequeno cache. O índice só é lido no primeiro acesso, então
+abrir o sistema não fica mais lento à medida que o histórico cresce.
+
+Se o mesmo ID for arquivado de novo (evento reaberto e arquivado outra vez), vale o
+bloco mais recente.
+"""
+import gzip, json, os, threading
+from collections import OrderedDict
+from evento import evento_from_dict
+from participante import RegistroParticipantes
+
+
+class ArquivoFrio:
+    """Eventos encerrados em blocos gzip por mês + índice ID -> bloco."""
+    def __init__(self, pasta: str = "data/arquivo", fsync: bool = True, cache_blocos: int = 8,
+                 eventos_por_bloco: int = 64):
+        self._pasta = pasta
+        self._por_bloco = eventos_por_bloco            # bloco menor: busca por ID descomprime menos
+        self._fsync = fsync
+        self._indice_path = os.path.join(pasta, "indice.jsonl")
+        self._trava = threading.Lock()
+        self._blocos = None                            # [(mês, posição, tamanho)], lido no primeiro acesso
+        self._onde = {}                                # id -> nº do bloco (o mais recente)
+        self._cache = OrderedDict()                    # nº do bloco -> {id: dict do evento} (LRU)
+        self._cache_max = cache_blocos
+        self.bytes_gravados = 0
+
+    def __len__(self) -> int:
+        with self._trava:
+            self._carregar_indice()
+            return len(self._onde)
+
+    def __contains__(self, id_evento) -> bool:
+        with self._trava:
+            self._carregar_indice()
+            return id_evento in self._onde
+
+    def meses(self) -> list:
+        """Meses ("AAAA-MM") com eventos arquivados, em ordem."""
+        with self._trava:
+            self._carregar_indice()
+            return sorted({mes for mes, _, _ in self._blocos})
+
+    # ---------- gravação ----------
+    def arquivar(self, eventos) -> int:
+        """Anexa os eventos (blocos por mês) e registra os blocos no índice; devolve quantos."""
+        por_mes = {}
+        for e in eventos:
+            por_mes.setdefault(e.data_evento.strftime("%Y-%m"), []).append(e)
+        if not por_mes:
+            return 0
+        os.makedirs(self._pasta, exist_ok=True)
+        with self._trava:
+            for mes in sorted(por_mes):
+                eventos = por_mes[mes]
+                for i in range(0, len(eventos), self._por_bloco):
+                    self._anexar_bloco(mes, eventos[i:i + self._por_bloco])
+        return sum(len(v) for v in por_mes.values())
+
+    # ---------- leitura ----------
+    def buscar(self, id_evento: int):
+        """Evento arquivado (um objeto novo a cada chamada) ou None."""
+        with self._trava:
+            self._carregar_indice()
+            n = self._onde.get(id_evento)
+            if n is None:
+                return None
+            d = self._ler_bloco(n).get(id_evento)
+        return evento_from_dict(d, RegistroParticipantes()) if d is not None else None
+
+    def iter_eventos(self, ignorar=()):
+        """Todos os eventos arquivados, bloco a bloco (um bloco descomprimido por vez).
+
+        IDs em ``ignorar`` (ex.: os que voltaram ao conjunto quente) são pulados.
+        """
+        with self._trava:
+            self._carregar_indice()
+            blocos = list(enumerate(self._blocos))
+        participantes = RegistroParticipantes()        # a mesma pessoa é um objeto só dentro da leitura
+        for n, (mes, posicao, tamanho) in blocos:
+            for d in _descomprimir(self._caminho(mes), posicao, tamanho):
+                id_evento = d.get("id")
+                if id_evento in ignorar or self._onde.get(id_evento) != n:  # versão mais nova em outro bloco
+                    continue
+                yield evento_from_dict(d, participantes)
+
+    # ---------- util ----------
+    def _caminho(self, mes: str) -> str:
+        return os.path.join(self._pasta, f"{mes}.jsonl.gz")
+
+    def _anexar_bloco(self, mes: str, eventos) -> None:  # chamado sob a trava
+        linhas = "".join(json.dumps(e.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n"
+                         for e in eventos)
+        bloco = gzip.compress(linhas.encode("utf-8"))
+        with open(self._caminho(mes), "ab") as f:      # só acréscimo: blocos antigos nunca mudam
+            posicao = f.seek(0, os.SEEK_END)
+            f.write(bloco)
+            self._gravar(f)
+        ids = [e.id for e in eventos]
+        self._anexar_indice({"mes": mes, "pos": posicao, "tam": len(bloco), "ids": ids})
+        self.bytes_gravados += len(bloco)
+        if self._blocos is not None:                   # índice já em memória: acompanha
+            self._registrar_bloco(mes, posicao, len(bloco), ids)
+
+    def _gravar(self, f) -> None:
+        f.flush()
+        if self._fsync:
+            os.fsync(f.fileno())
+
+    def _anexar_indice(self, linha: dict) -> None:
+        with open(self._indice_path, "ab+") as f:
+            fim = f.seek(0, os.SEEK_END)
+            if fim:
+                f.seek(fim - 1)
+                if f.read(1) != b"\n":                 # linha cortada por queda: a nova começa limpa
+                    f.write(b"\n")
+            f.write(json.dumps(linha, separators=(",", ":")).encode("utf-8") + b"\n")
+            self._gravar(f)
+
+    def _carregar_indice(self) -> None:                # chamado sob a trava
+        if self._blocos is not None:
+            return
+        self._blocos, self._onde = [], {}
+        if not os.path.exists(self._indice_path):
+            return
+        with open(self._indice_path, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    b = json.loads(linha)
+                except ValueError:                     # linha parcial: o bloco dela fica de fora
+                    continue
+                self._registrar_bloco(b["mes"], b["pos"], b["tam"], b["ids"])
+
+    def _registrar_bloco(self, mes: str, posicao: int, tamanho: int, ids) -> None:
+        n = len(self._blocos)
+        self._blocos.append((mes, posicao, tamanho))
+        for id_evento in ids:
+            self._onde[id_evento] = n
+
+    def _ler_bloco(self, n: int) -> dict:              # chamado sob a trava
+        eventos = self._cache.get(n)
+        if eventos is None:
+            mes, posicao, tamanho = self._blocos[n]
+            eventos = {d["id"]: d for d in _descomprimir(self._caminho(mes), posicao, tamanho)}
+            self._cache[n] = eventos
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(n)
+        return eventos
+
+
+def _descomprimir(caminho: str, posicao: int, tamanho: int) -> list:
+    with open(caminho, "rb") as f:
+        f.seek(posicao)
+        dados = gzip.decompress(f.read(tamanho))
+    return [json.loads(linha) for linha in dados.splitlines() if linha]
@@ -0,0 +1,4 @@
+"""Benchmarks do sistema de eventos.
+
+Executar a partir da raiz do projeto, como módulo (ex.: ``python -m benchmarks.bench_cancelamento``).
+"""
@@ -0,0 +1,100 @@
+"""Carga e memória com anos de histórico: tudo no snapshot x eventos encerrados no arquivo frio.
+
+Gera ``--meses`` meses de eventos já realizados (mais os próximos ``--futuros``
+eventos) num snapshot JSON e compara o JsonRepo carregando tudo com o JsonRepo
+com ``pasta_arquivo`` (depois da primeira carga, que faz a migração). Mede também
+a busca por ID de um evento arquivado (bloco frio e bloco no cache) e a montagem
+dos relatórios que contam o histórico:
+
+    python -m benchmarks.bench_arquivo [--meses 36] [--eventos-mes 300] [--inscritos 50] [--futuros 300]
+"""
+import argparse, os, random, shutil, tempfile, time, tracemalloc
+from datetime import date, timedelta
+from evento import Evento
+from json_repo import JsonRepo
+from participante import Participante
+from sistemas_evento import SistemaEventos
+
+
+def _gerar(caminho, meses, por_mes, inscritos, futuros, semente=42):
+    rng = random.Random(semente)
+    hoje = date.today()
+    repo = JsonRepo(caminho, fsync=False)
+    datas = [hoje - timedelta(days=rng.randrange(31, 31 + 30 * meses)) for _ in range(meses * por_mes)]
+    datas += [hoje + timedelta(days=rng.randrange(1, 180)) for _ in range(futuros)]
+    for d in datas:
+        ev = Evento(repo.proximo_id(), "Evento", d, f"Local {rng.randrange(20)}", inscritos,
+                    f"Categoria {rng.randrange(10)}", 50.0)
+        for j in rng.sample(range(20 * inscritos), inscritos):
+            ev.inscrever(Participante(f"Pessoa {j}", f"pessoa.{j}@exemplo.com.br"))
+        repo.salvar_evento(ev)
+    repo.salvar()
+    return len(datas)
+
+
+def _carregar(caminho, pasta_arquivo=None):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    repo = JsonRepo(caminho, fsync=False, pasta_arquivo=pasta_arquivo)
+    repo.carregar()
+    duracao = time.perf_counter() - t0
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return repo, duracao, memoria
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--meses", type=int, default=36, help="meses de histórico")
+    ap.add_argument("--eventos-mes", type=int, default=300)
+    ap.add_argument("--inscritos", type=int, default=50, help="inscritos por evento")
+    ap.add_argument("--futuros", type=int, default=300, help="eventos ainda por acontecer")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="arquivo-") as pasta:
+        tudo = os.path.join(pasta, "tudo.json")
+        total = _gerar(tudo, args.meses, args.eventos_mes, args.inscritos, args.futuros)
+        quente, arquivo = os.path.join(pasta, "quente.json"), os.path.join(pasta, "arquivo")
+        shutil.copy(tudo, quente)
+        t0 = time.perf_counter()
+        JsonRepo(quente, fsync=False, pasta_arquivo=arquivo).carregar()   # migração (uma vez)
+        migracao = time.perf_counter() - t0
+
+        _, t_tudo, m_tudo = _carregar(tudo)
+        repo, t_quente, m_quente = _carregar(quente, arquivo)
+        gz = sum(os.path.getsize(os.path.join(arquivo, n)) for n in os.listdir(arquivo)) if os.path.isdir(arquivo) else 0
+        print(f"{total} eventos ({total - args.futuros} encerrados em {args.meses} meses), "
+              f"{args.inscritos} inscritos cada")
+        print(f"arquivo   tudo {os.path.getsize(tudo) / 1e6:7.2f} MB | quente {os.path.getsize(quente) / 1e6:7.2f} MB"
+              f" + frio {gz / 1e6:.2f} MB (gzip)")
+        print(f"carregar  tudo {1000 * t_tudo:7.0f} ms | quente {1000 * t_quente:7.0f} ms"
+              f" (migração: {1000 * migracao:.0f} ms, uma vez)")
+        print(f"memória   tudo {m_tudo / 1e6:7.1f} MB | quente {m_quente / 1e6:7.1f} MB")
+
+        passados = total - args.futuros
+        ids = random.Random(1).sample(range(1, passados + 1), min(200, passados))
+        if ids:                                         # sem encerrados não há o que buscar no arquivo
+            t0 = time.perf_counter()
+            repo.buscar_evento(ids[0])                  # primeiro acesso: lê o índice e um bloco
+            primeiro = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for i in ids[1:]:
+                repo.buscar_evento(i)
+            busca = (time.perf_counter() - t0) / (len(ids) - 1) if len(ids) > 1 else 0.0
+            t0 = time.perf_counter()
+            for _ in range(100):
+                repo.buscar_evento(ids[0])              # mesmo bloco: vem do cache
+            cache = (time.perf_counter() - t0) / 100
+            print(f"busca por ID arquivado: 1º {1000 * primeiro:.1f} ms | bloco frio {1000 * busca:.2f} ms"
+                  f" | bloco no cache {1e6 * cache:.0f} µs")
+        else:
+            print("busca por ID arquivado: nenhum evento encerrado")
+
+        sis = SistemaEventos(repo)
+        t0 = time.perf_counter()
+        por_mes = sis.relatorio_por_mes()
+        print(f"relatório por mês (histórico inteiro, {len(por_mes)} meses): {1000 * (time.perf_counter() - t0):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
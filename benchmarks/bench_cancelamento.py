@@ -0,0 +1,78 @@
+"""Custo de cancelamento e memória por 100 mil inscrições: lista (antes) x dict + __slots__ (agora).
+
+    python -m benchmarks.bench_cancelamento [--inscricoes 100000] [--cancelamentos 2000]
+"""
+import argparse, time, tracemalloc
+from datetime import date
+from evento import Evento
+from participante import Participante
+
+
+class _ParticipanteAntigo:
+    """Participante como era antes (com __dict__)."""
+    def __init__(self, nome, email):
+        self._nome = nome.strip()
+        self._email = email.strip().lower()
+
+    @property
+    def email(self):
+        return self._email
+
+
+class _EventoAntigo:
+    """Recorte do Evento antigo: lista + set de e-mails, cancelamento refaz a lista."""
+    def __init__(self):
+        self._inscritos = []
+        self._inscritos_emails = set()
+        self._checkins = set()
+
+    def inscrever(self, p):
+        self._inscritos.append(p)
+        self._inscritos_emails.add(p.email)
+
+    def cancelar_inscricao(self, email):
+        self._inscritos_emails.remove(email)
+        self._checkins.discard(email)
+        self._inscritos = [p for p in self._inscritos if p.email != email]
+
+
+def _novo_antigo():
+    return _EventoAntigo(), _ParticipanteAntigo
+
+
+def _novo_atual(n):
+    return Evento(1, "Bench", date(2100, 1, 1), "Recife", n, "Tech", 10.0), Participante
+
+
+def _medir(fabrica, n, k):
+    emails = [f"pessoa{i}@x.com" for i in range(n)]
+    tracemalloc.start()
+    ev, cls = fabrica()
+    for e in emails:
+        ev.inscrever(cls("Pessoa", e))
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    alvo = emails[::max(1, n // k)][:k]                  # lista de reembolso espalhada pelo evento
+    t0 = time.perf_counter()
+    for e in alvo:
+        ev.cancelar_inscricao(e)
+    dt = time.perf_counter() - t0
+    return memoria, dt / len(alvo)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--inscricoes", type=int, default=100_000)
+    ap.add_argument("--cancelamentos", type=int, default=2_000)
+    args = ap.parse_args()
+    n, k = args.inscricoes, args.cancelamentos
+
+    print(f"{n} inscrições, {k} cancelamentos")
+    print(f"{'versão':<8} {'memória (MB)':>13} {'bytes/inscr.':>13} {'cancel. (µs)':>13}")
+    for nome, fabrica in (("antes", _novo_antigo), ("agora", lambda: _novo_atual(n))):
+        mem, custo = _medir(fabrica, n, k)
+        print(f"{nome:<8} {mem / 1e6:>13.1f} {mem / n:>13.0f} {custo * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Participantes em vários eventos: arquivo e memória com a tabela única x uma cópia por evento.
+
+Cada evento recebe inscritos sorteados de um mesmo público (cada pessoa aparece,
+em média, em ``eventos x inscritos / participantes`` eventos) e um terço faz
+check-in. Compara o formato antigo (nome e e-mail repetidos dentro de cada evento,
+um Participante por inscrição) com o atual (tabela ``"participantes"`` gravada
+uma vez, eventos citando IDs, um Participante por pessoa em memória):
+
+    python -m benchmarks.bench_participantes [--eventos 2000] [--inscritos 100] [--participantes 25000]
+"""
+import argparse, json, os, random, tempfile, time, tracemalloc
+from datetime import date, timedelta
+from evento import Evento, evento_from_dict
+from json_repo import JsonRepo
+from json_stream import LeitorEventosJson
+from participante import Participante
+
+
+def _gerar(n_eventos, n_inscritos, n_participantes, semente=42):
+    rng = random.Random(semente)
+    hoje = date.today()
+    eventos = []
+    for i in range(n_eventos):
+        ev = Evento(i + 1, f"Evento {i}", hoje + timedelta(days=i % 365), f"Local {i % 20}",
+                    n_inscritos, f"Categoria {i % 10}", 50.0)
+        for j in rng.sample(range(n_participantes), n_inscritos):
+            ev.inscrever(Participante(f"Pessoa Sobrenome {j}", f"pessoa.{j}@exemplo.com.br"))
+            if j % 3 == 0:
+                ev.checkin(f"pessoa.{j}@exemplo.com.br")
+        eventos.append(ev)
+    return eventos
+
+
+def _gravar_antigo(caminho, eventos):
+    """O snapshot como era gravado antes da tabela: cada evento com seus inscritos completos."""
+    with open(caminho, "wb") as f:
+        f.write(f'{{"seq": {len(eventos) + 1}, "eventos": [\n'.encode("utf-8"))
+        f.write(b",\n".join(json.dumps(e.to_dict(), ensure_ascii=False).encode("utf-8") for e in eventos))
+        f.write(b"\n]}\n")
+
+
+def _carregar_antigo(caminho):
+    eventos = [evento_from_dict(d) for d in LeitorEventosJson(caminho)]
+    for e in eventos:
+        e.emails_inscritos()                            # hidrata: monta os Participantes
+    return eventos
+
+
+def _carregar_atual(caminho):
+    repo = JsonRepo(caminho)
+    repo.carregar()
+    for e in repo.todos_eventos():
+        e.emails_inscritos()
+    return repo
+
+
+def _medir(func, caminho):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = func(caminho)
+    duracao = time.perf_counter() - t0
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resultado
+    return duracao, memoria
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--eventos", type=int, default=2000)
+    ap.add_argument("--inscritos", type=int, default=100, help="inscritos por evento")
+    ap.add_argument("--participantes", type=int, default=25000, help="pessoas distintas")
+    args = ap.parse_args()
+
+    eventos = _gerar(args.eventos, args.inscritos, args.participantes)
+    with tempfile.TemporaryDirectory(prefix="participantes-") as pasta:
+        antigo, atual = os.path.join(pasta, "antigo.json"), os.path.join(pasta, "atual.json")
+        _gravar_antigo(antigo, eventos)
+        repo = JsonRepo(atual, fsync=False)
+        for e in eventos:
+            repo.salvar_evento(e)
+        repo.salvar()
+        del eventos, repo
+
+        t_antigo, m_antigo = _medir(_carregar_antigo, antigo)
+        t_atual, m_atual = _medir(_carregar_atual, atual)
+        print(f"{args.eventos} eventos x {args.inscritos} inscritos, {args.participantes} pessoas "
+              f"({args.eventos * args.inscritos / args.participantes:.1f} eventos por pessoa)")
+        print(f"arquivo   antigo {os.path.getsize(antigo) / 1e6:7.2f} MB | atual {os.path.getsize(atual) / 1e6:7.2f} MB")
+        print(f"memória   antigo {m_antigo / 1e6:7.1f} MB | atual {m_atual / 1e6:7.1f} MB (carregado e hidratado)")
+        print(f"carregar  antigo {1000 * t_antigo:7.0f} ms | atual {1000 * t_atual:7.0f} ms (com tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
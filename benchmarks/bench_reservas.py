@@ -0,0 +1,110 @@
+"""Simulação de esgotamento: pico de compradores reservando vagas com prazo (relógio virtual).
+
+Cada comprador reserva uma vaga (``reservar``) e parte paga dentro do prazo
+(``confirmar_reserva``); o resto desiste e a reserva vence. Quem encontra o
+evento lotado tenta de novo 60 s depois (até 4 tentativas). A cada segundo
+virtual o varredor devolve as vagas vencidas. Compara o custo da varredura pelo
+heap (proporcional ao que vence) com uma varredura ingênua de todas as reservas
+ativas a cada segundo, e confere que nenhum evento passou da capacidade:
+
+    python -m benchmarks.bench_reservas [--eventos 50] [--capacidade 200] [--compradores 50000]
+"""
+import argparse, random, time
+from datetime import date, timedelta
+from benchmarks.gerador import pesos_zipf
+from memory_repo import MemoryRepo
+from participante import Participante
+from sistemas_evento import SistemaEventos
+
+
+def _varredura_ingenua(sis, ids, agora):
+    """O que um varredor sem heap faria: olhar todas as reservas de todos os eventos."""
+    vencidas = 0
+    for i in ids:
+        reservas = sis.obter_evento(i)._reservas or {}
+        vencidas += sum(1 for expira_em in reservas.values() if expira_em <= agora)
+    return vencidas
+
+
+def simular(n_eventos, capacidade, n_compradores, janela, ttl, taxa_pagamento, semente=42):
+    rng = random.Random(semente)
+    agora = [0.0]
+    sis = SistemaEventos(MemoryRepo())
+    sis._reservas.relogio = lambda: agora[0]
+    amanha = date.today() + timedelta(days=1)
+    for i in range(n_eventos):
+        sis.criar_evento(f"Show {i}", amanha, "Recife", capacidade, "Arte", 100.0)
+    ids = list(range(1, n_eventos + 1))
+    acumulados = pesos_zipf(n_eventos)
+
+    chegadas = {}                                      # segundo -> [(id do evento, n do comprador, tentativa)]
+    for n in range(n_compradores):
+        i = ids[rng.choices(range(n_eventos), cum_weights=acumulados)[0]]
+        chegadas.setdefault(int(rng.random() * janela), []).append((i, n, 1))
+    pagamentos = {}                                    # segundo -> [(id do evento, n do comprador)]
+    c = {"reservas": 0, "recusadas": 0, "confirmadas": 0, "pagas_tarde": 0}
+    t_op = t_heap = t_ingenua = 0.0
+    fim = int(janela + 180 + 2 * ttl) + 1
+    for segundo in range(fim):
+        agora[0] = float(segundo)
+        t0 = time.perf_counter()
+        for i, n, tentativa in chegadas.pop(segundo, ()):
+            if sis.reservar(i, f"c{n}@x.com", ttl)[0]:
+                c["reservas"] += 1
+                if rng.random() < taxa_pagamento:      # atraso até 1.1 x ttl: alguns pagam tarde demais
+                    atraso = rng.uniform(1, ttl * 1.1)
+                    pagamentos.setdefault(segundo + int(atraso), []).append((i, n))
+            else:
+                c["recusadas"] += 1
+                if tentativa < 4:
+                    chegadas.setdefault(segundo + 60, []).append((i, n, tentativa + 1))
+        for i, n in pagamentos.pop(segundo, ()):
+            if sis.confirmar_reserva(i, Participante(f"Comprador {n}", f"c{n}@x.com"))[0]:
+                c["confirmadas"] += 1
+            else:
+                c["pagas_tarde"] += 1
+        t1 = time.perf_counter()
+        t_ingenua += _medir_ingenua(sis, ids, agora[0])
+        t2 = time.perf_counter()
+        sis.liberar_reservas_vencidas()
+        t3 = time.perf_counter()
+        t_op += t1 - t0
+        t_heap += t3 - t2
+
+    eventos = [sis.obter_evento(i) for i in ids]
+    assert all(e.total_inscritos() <= e.capacidade_max for e in eventos), "vendeu mais que a capacidade"
+    c["vendidos"] = sum(e.total_inscritos() for e in eventos)
+    c["reservas_ativas"] = sum(e.total_reservas() for e in eventos)
+    c["vencidas"] = c["reservas"] - c["confirmadas"] - c["reservas_ativas"]  # vagas devolvidas pelo varredor
+    return c, fim, t_op, t_heap, t_ingenua
+
+
+def _medir_ingenua(sis, ids, agora):
+    t0 = time.perf_counter()
+    _varredura_ingenua(sis, ids, agora)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--eventos", type=int, default=50)
+    ap.add_argument("--capacidade", type=int, default=200)
+    ap.add_argument("--compradores", type=int, default=50000)
+    ap.add_argument("--janela", type=int, default=60, help="segundos virtuais em que os compradores chegam")
+    ap.add_argument("--ttl", type=float, default=120.0, help="prazo da reserva (segundos)")
+    ap.add_argument("--pagamento", type=float, default=0.6, help="fração que tenta pagar")
+    args = ap.parse_args()
+
+    c, segundos, t_op, t_heap, t_ingenua = simular(args.eventos, args.capacidade, args.compradores,
+                                                   args.janela, args.ttl, args.pagamento)
+    print(f"{args.compradores} compradores em {args.janela} s para {args.eventos * args.capacidade} vagas")
+    for k, v in c.items():
+        print(f"  {k:<16} {v:>8}")
+    ops = c["reservas"] + c["recusadas"] + c["confirmadas"] + c["pagas_tarde"]
+    print(f"reservar/confirmar: {ops / t_op:,.0f} ops/s")
+    print(f"varredura ({segundos} ticks): heap {1000 * t_heap:.1f} ms | "
+          f"ingênua {1000 * t_ingenua:.1f} ms (só para achar as vencidas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Tamanho do arquivo e tempo de carga: events.json (JsonRepo) x snapshot binário (BinRepo).
+
+    python -m benchmarks.bench_snapshot [--eventos 2000] [--inscritos 200]
+"""
+import argparse, os, tempfile, time
+from datetime import date, timedelta
+from json_repo import JsonRepo
+from bin_repo import BinRepo
+from evento import Evento
+from participante import Participante
+from snapshot_bin import json_para_bin
+
+
+def _gerar(caminho, n_eventos, n_inscritos):
+    repo = JsonRepo(caminho, fsync=False)
+    hoje = date.today()
+    for i in range(n_eventos):
+        ev = Evento(repo.proximo_id(), f"Evento {i}", hoje + timedelta(days=i % 365), f"Local {i % 20}",
+                    n_inscritos, f"Categoria {i % 10}", 50.0)
+        for j in range(n_inscritos):
+            ev.inscrever(Participante(f"Pessoa {j}", f"pessoa{j}@exemplo.com"))
+            if j % 3 == 0:
+                ev.checkin(f"pessoa{j}@exemplo.com")
+        repo.salvar_evento(ev)
+    repo.salvar()
+
+
+def _medir(func):
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--eventos", type=int, default=2000)
+    ap.add_argument("--inscritos", type=int, default=200, help="inscritos por evento")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="snapshot-") as pasta:
+        caminho_json = os.path.join(pasta, "events.json")
+        caminho_bin = os.path.join(pasta, "events.bin")
+        _gerar(caminho_json, args.eventos, args.inscritos)
+        json_para_bin(caminho_json, caminho_bin)
+
+        repo_json, repo_bin = JsonRepo(caminho_json), BinRepo(caminho_bin)
+        t_json = _medir(repo_json.carregar)
+        t_bin = _medir(repo_bin.carregar)
+        t_um = _medir(lambda: repo_bin.buscar_evento(args.eventos // 2))
+        t_todos = _medir(repo_bin.todos_eventos)
+        repo_bin._fechar_snapshot()
+
+        print(f"{args.eventos} eventos x {args.inscritos} inscritos")
+        print(f"tamanho   json {os.path.getsize(caminho_json) / 1e6:8.2f} MB | "
+              f"binário {os.path.getsize(caminho_bin) / 1e6:8.2f} MB")
+        print(f"carregar  json {1000 * t_json:8.1f} ms | binário {1000 * t_bin:8.3f} ms (só abre o mmap)")
+        print(f"binário: 1º acesso a um evento {1000 * t_um:.3f} ms | decodificar todos {1000 * t_todos:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
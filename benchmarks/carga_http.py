@@ -0,0 +1,130 @@
+"""Gerador de carga local para o servidor HTTP (requisições por segundo e latência).
+
+Sobe o servidor no próprio processo (porta livre, MemoryRepo, JsonRepo com journal ou
+PartitionedRepo com uma partição JSON por processo) ou ataca um servidor já em
+execução com ``--url``:
+
+    python -m benchmarks.carga_http --clientes 200 --requisicoes 50
+    python -m benchmarks.carga_http --repo json --clientes 200
+    python -m benchmarks.carga_http --repo particionado --particoes 4 --clientes 200
+    python -m benchmarks.carga_http --url http://127.0.0.1:8080 --eventos 1,2,3
+"""
+import argparse, asyncio, json, os, tempfile, time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+
+async def _requisicao(reader, writer, metodo, caminho, corpo=None):
+    dados = json.dumps(corpo).encode("utf-8") if corpo is not None else b""
+    writer.write((f"{metodo} {caminho} HTTP/1.1\r\nHost: carga\r\n"
+                  f"Content-Length: {len(dados)}\r\n\r\n").encode("latin-1") + dados)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    tamanho = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""):
+            break
+        if h.lower().startswith(b"content-length:"):
+            tamanho = int(h.split(b":")[1])
+    await reader.readexactly(tamanho)
+    return status
+
+
+async def _cliente(host, porta, n, eventos, id_cliente, latencias, status):
+    """Um cliente com conexão keep-alive: inscreve, faz check-in e lista vagas."""
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        for i in range(n):
+            id_evento = eventos[(id_cliente + i) % len(eventos)]
+            email = f"c{id_cliente}-{i}@carga.com"
+            passo = i % 4
+            t0 = time.perf_counter()
+            if passo == 3:
+                st = await _requisicao(reader, writer, "GET", "/relatorios/eventos-com-vagas")
+            elif passo == 2:                                      # check-in de quem acabou de se inscrever
+                anterior = eventos[(id_cliente + i - 1) % len(eventos)]
+                st = await _requisicao(reader, writer, "POST", f"/eventos/{anterior}/checkins",
+                                       {"email": f"c{id_cliente}-{i - 1}@carga.com"})
+            else:
+                st = await _requisicao(reader, writer, "POST", f"/eventos/{id_evento}/inscricoes",
+                                       {"nome": "Carga", "email": email})
+            latencias.append(time.perf_counter() - t0)
+            status[st] = status.get(st, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def _rodar(args):
+    servidor, pasta = None, None
+    if args.url:
+        alvo = urlsplit(args.url)
+        host, porta = alvo.hostname, alvo.port or 80
+        eventos = [int(x) for x in args.eventos.split(",")]
+    else:
+        from servidor import ServidorEventos
+        from sistemas_evento import SistemaEventos
+        if args.repo == "json":
+            from json_repo import JsonRepo
+            pasta = tempfile.TemporaryDirectory(prefix="carga-")
+            repo = JsonRepo(os.path.join(pasta.name, "events.json"), journal=True, limite_journal=10 ** 9)
+        elif args.repo == "particionado":
+            from particionado import PartitionedRepo
+            pasta = tempfile.TemporaryDirectory(prefix="carga-")
+            repo = PartitionedRepo(pasta.name, args.particoes, processos=True,
+                                   journal=True, limite_journal=10 ** 9)
+        else:
+            from memory_repo import MemoryRepo
+            repo = MemoryRepo()
+        sistema = SistemaEventos(repo)
+        sistema.carregar()
+        amanha = date.today() + timedelta(days=1)
+        for i in range(args.n_eventos):
+            sistema.criar_evento(f"Carga {i}", amanha, "Recife", 10 ** 9, "Tech", 10.0)
+        eventos = [e.id for e in sistema.listar_eventos()]
+        servidor = ServidorEventos(sistema, "127.0.0.1", 0, workers=args.workers)
+        await servidor.iniciar()
+        host, porta = "127.0.0.1", servidor.porta
+
+    latencias, status = [], {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, porta, args.requisicoes, eventos, c, latencias, status)
+                           for c in range(args.clientes)))
+    duracao = time.perf_counter() - t0
+    if servidor is not None:
+        await servidor.encerrar()
+        if hasattr(repo, "fechar"):
+            repo.fechar()
+    if pasta is not None:
+        pasta.cleanup()
+
+    total = len(latencias)
+    print(f"{args.clientes} clientes x {args.requisicoes} requisições = {total} em {duracao:.2f}s")
+    print(f"vazão: {total / duracao:,.0f} req/s")
+    print("latência (ms): p50 {:.2f} | p95 {:.2f} | p99 {:.2f}".format(
+        *(1000 * _percentil(latencias, p) for p in (50, 95, 99))))
+    print("status:", dict(sorted(status.items())))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clientes", type=int, default=100, help="conexões simultâneas")
+    ap.add_argument("--requisicoes", type=int, default=50, help="requisições por cliente")
+    ap.add_argument("--repo", choices=("memoria", "json", "particionado"), default="memoria")
+    ap.add_argument("--particoes", type=int, default=4, help="partições (processos) com --repo particionado")
+    ap.add_argument("--n-eventos", type=int, default=10, help="eventos criados no servidor local")
+    ap.add_argument("--workers", type=int, default=32, help="threads do servidor local")
+    ap.add_argument("--url", help="servidor já em execução (não sobe um local)")
+    ap.add_argument("--eventos", default="1", help="IDs de eventos alvo quando usar --url")
+    asyncio.run(_rodar(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Gerador de cargas sintéticas para os benchmarks.
+
+``gerar_carga`` devolve eventos dos três tipos, participantes e a sequência de
+operações (inscrições, cancelamentos e check-ins). A popularidade dos eventos
+segue uma distribuição do tipo Zipf (poucos eventos concentram a maior parte da
+procura), então os eventos populares lotam e parte das inscrições é recusada,
+como acontece de verdade. A carga é determinística para uma mesma semente.
+"""
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+_CATEGORIAS = ("Tecnologia", "Negócios", "Arte", "Saúde", "Educação", "Esporte")
+_LOCAIS = ("Recife", "Olinda", "Jaboatão", "Caruaru", "Petrolina", "Online")
+
+
+class Carga:
+    """Dados e operações de um cenário (índices de evento seguem a ordem de criação)."""
+    def __init__(self):
+        self.eventos = []                              # kwargs de SistemaEventos.criar_evento
+        self.participantes = []                        # (nome, e-mail)
+        self.inscricoes = []                           # (índice do evento, índice do participante)
+        self.cancelamentos = []                        # (índice do evento, e-mail) de inscrições aceitas
+        self.checkins = []                             # (índice do evento, e-mail) de quem continua inscrito
+
+
+def pesos_zipf(n: int, s: float = 1.1) -> list:
+    """Pesos acumulados de uma Zipf com expoente s para n itens (o 1º é o mais popular)."""
+    return list(accumulate(1 / (k ** s) for k in range(1, n + 1)))
+
+
+def gerar_carga(n_eventos: int, n_participantes: int, inscricoes_por_participante: float = 3.0,
+                taxa_cancelamento: float = 0.1, taxa_checkin: float = 0.6, s: float = 1.1,
+                semente: int = 42) -> Carga:
+    rng = random.Random(semente)
+    carga = Carga()
+    hoje = date.today()
+    n_inscricoes = int(n_participantes * inscricoes_por_participante)
+    media = max(1, n_inscricoes // max(1, n_eventos))
+    tipos = ("evento", "workshop", "palestra")
+    for i in range(n_eventos):
+        tipo = tipos[i % 3]
+        ev = {"nome": f"{tipo.capitalize()} {i}", "data_evento": hoje + timedelta(days=1 + rng.randrange(365)),
+              "local": rng.choice(_LOCAIS), "capacidade_max": rng.randint(max(1, media // 2), 2 * media),
+              "categoria": rng.choice(_CATEGORIAS), "preco": float(rng.choice((0, 20, 50, 120, 300))),
+              "tipo": tipo}
+        if tipo == "workshop":
+            ev["material_necessario"] = "Notebook"
+        elif tipo == "palestra":
+            ev["palestrante"] = f"Palestrante {i % 50}"
+        carga.eventos.append(ev)
+    carga.participantes = [(f"Participante {j}", f"p{j}@carga.com") for j in range(n_participantes)]
+
+    ordem = list(range(n_eventos))
+    rng.shuffle(ordem)                                   # popularidade não depende do ID
+    acumulados = pesos_zipf(n_eventos, s)
+    ocupacao = [0] * n_eventos
+    aceitas = []                                         # inscrições que o sistema vai aceitar, na ordem
+    vistos = set()
+    for _ in range(n_inscricoes):
+        i = ordem[rng.choices(range(n_eventos), cum_weights=acumulados)[0]]
+        j = rng.randrange(n_participantes)
+        carga.inscricoes.append((i, j))
+        if (i, j) not in vistos and ocupacao[i] < carga.eventos[i]["capacidade_max"]:
+            vistos.add((i, j))
+            ocupacao[i] += 1
+            aceitas.append((i, carga.participantes[j][1]))
+
+    rng.shuffle(aceitas)
+    n_cancel = int(len(aceitas) * taxa_cancelamento)
+    carga.cancelamentos = aceitas[:n_cancel]
+    restantes = aceitas[n_cancel:]
+    carga.checkins = restantes[:int(len(restantes) * taxa_checkin)]
+    return carga
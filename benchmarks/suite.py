@@ -0,0 +1,144 @@
+"""Suíte de benchmarks: operações do SistemaEventos em várias escalas e repositórios.
+
+Para cada escala (eventos x participantes) e repositório, mede criar_evento,
+inscrever, cancelar_inscricao, checkin, os relatorio_*, salvar e carregar sobre
+uma carga sintética (``benchmarks.gerador``). Grava os resultados em JSON e,
+com ``--comparar``, falha (código 1) se alguma operação ficar mais lenta que a
+referência além do limite. Cada cenário roda ``--repeticoes`` vezes e vale o
+melhor tempo de cada operação; operações que somam menos de 1 ms na referência
+não entram na comparação (ruído):
+
+    python -m benchmarks.suite --saida base.json
+    python -m benchmarks.suite --saida atual.json --comparar base.json --limite 0.25
+    python -m benchmarks.suite --escalas 50x500 --repos memoria     # rodada rápida
+"""
+import argparse, json, os, platform, sys, tempfile, time
+from collections import deque
+from datetime import datetime
+from benchmarks.gerador import gerar_carga
+from participante import Participante
+from sistemas_evento import SistemaEventos
+
+_RELATORIOS_POR_EVENTO = ("relatorio_total_inscritos", "relatorio_receita_evento", "relatorio_ocupacao_evento")
+_RELATORIOS_GERAIS = ("relatorio_eventos_com_vagas", "relatorio_por_categoria", "relatorio_por_mes",
+                      "relatorio_geral", "relatorio_receita_categoria_mes", "relatorio_distribuicao_ocupacao",
+                      "relatorio_no_show")
+
+
+def _novo_repo(nome, pasta):
+    if nome == "memoria":
+        from memory_repo import MemoryRepo
+        return MemoryRepo()
+    from json_repo import JsonRepo
+    caminho = os.path.join(pasta, "events.json")
+    if nome == "json-journal":                         # como o main.py (journal com fsync por operação)
+        return JsonRepo(caminho, journal=True, limite_journal=10 ** 9)
+    return JsonRepo(caminho)
+
+
+class _Cronometro:
+    """Acumula (tempo, quantidade) por operação."""
+    def __init__(self):
+        self.resultados = {}
+
+    def medir(self, nome, func, itens):
+        n = 0
+        t0 = time.perf_counter()
+        for item in itens:
+            func(item)
+            n += 1
+        self.registrar(nome, time.perf_counter() - t0, n)
+
+    def registrar(self, nome, segundos, n=1):
+        self.resultados[nome] = {"n": n, "total_s": round(segundos, 6),
+                                 "us_por_op": round(1e6 * segundos / max(1, n), 3)}
+
+
+def _consumir(resultado):
+    """Relatórios que são geradores só trabalham quando consumidos."""
+    if hasattr(resultado, "__next__"):
+        deque(resultado, maxlen=0)
+
+
+def rodar_cenario(repo_nome, carga, repeticoes_relatorio=20):
+    """Executa a carga num repositório novo e devolve {operação: {n, total_s, us_por_op}}."""
+    c = _Cronometro()
+    with tempfile.TemporaryDirectory(prefix="suite-") as pasta:
+        repo = _novo_repo(repo_nome, pasta)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        c.medir("criar_evento", lambda kw: sis.criar_evento(**kw), carga.eventos)
+        ids = [e.id for e in sis.listar_eventos()]     # mesma ordem de criação
+        pessoas = carga.participantes
+        c.medir("inscrever", lambda ij: sis.inscrever(ids[ij[0]], Participante(*pessoas[ij[1]])),
+                carga.inscricoes)
+        c.medir("cancelar_inscricao", lambda ie: sis.cancelar_inscricao(ids[ie[0]], ie[1]), carga.cancelamentos)
+        c.medir("checkin", lambda ie: sis.checkin(ids[ie[0]], ie[1]), carga.checkins)
+        for nome in _RELATORIOS_POR_EVENTO:
+            c.medir(nome, getattr(sis, nome), ids)
+        for nome in _RELATORIOS_GERAIS:
+            func = getattr(sis, nome)
+            c.medir(nome, lambda _: _consumir(func()), range(repeticoes_relatorio))
+        if hasattr(repo, "salvar"):
+            c.medir("salvar", lambda _: sis.salvar(), range(1))
+            c.medir("carregar", lambda _: sis.carregar(), range(1))
+        if hasattr(repo, "fechar"):
+            repo.fechar()
+    return c.resultados
+
+
+def comparar(atual: dict, base: dict, limite: float):
+    """Lista de (chave, operação, base µs, atual µs) que pioraram mais que ``limite`` (0.2 = 20%)."""
+    regressoes = []
+    for chave, ops in atual["resultados"].items():
+        for op, r in ops.items():
+            ref = base.get("resultados", {}).get(chave, {}).get(op)
+            if ref and ref["total_s"] >= 0.001 and r["us_por_op"] > ref["us_por_op"] * (1 + limite):
+                regressoes.append((chave, op, ref["us_por_op"], r["us_por_op"]))
+    return regressoes
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--escalas", default="100x2000,1000x20000", help="eventos x participantes, separadas por vírgula")
+    ap.add_argument("--repos", default="memoria,json", help="memoria, json, json-journal")
+    ap.add_argument("--semente", type=int, default=42)
+    ap.add_argument("--repeticoes", type=int, default=3, help="rodadas por cenário (vale o melhor tempo)")
+    ap.add_argument("--saida", default="resultados_suite.json")
+    ap.add_argument("--comparar", help="JSON de uma rodada anterior")
+    ap.add_argument("--limite", type=float, default=0.2, help="piora tolerada (0.2 = 20%%)")
+    args = ap.parse_args()
+
+    saida = {"meta": {"data": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                      "plataforma": platform.platform(), "semente": args.semente,
+                      "repeticoes": args.repeticoes},
+             "resultados": {}}
+    for escala in args.escalas.split(","):
+        n_ev, n_part = (int(x) for x in escala.lower().split("x"))
+        carga = gerar_carga(n_ev, n_part, semente=args.semente)
+        for repo_nome in args.repos.split(","):
+            chave = f"{repo_nome}/{escala}"
+            rodadas = [rodar_cenario(repo_nome, carga) for _ in range(max(1, args.repeticoes))]
+            saida["resultados"][chave] = r = {op: min((x[op] for x in rodadas), key=lambda v: v["total_s"])
+                                              for op in rodadas[0]}
+            print(chave)
+            for op, v in r.items():
+                print(f"  {op:<28} {v['n']:>8} ops {v['us_por_op']:>12.2f} µs/op")
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"resultados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(saida, base, args.limite)
+        for chave, op, antes, agora in regressoes:
+            print(f"REGRESSÃO {chave} {op}: {antes:.2f} -> {agora:.2f} µs/op (+{100 * (agora / antes - 1):.0f}%)")
+        if regressoes:
+            sys.exit(1)
+        print(f"sem regressões acima de {100 * args.limite:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os                                      # checar arquivo/pasta
+from json_repo import JsonRepo                 # journal, contador e salvar() vêm daqui
+from indices import IdsOrdenados, IndiceEventos  # cursor por ID + índices secundários (montados na primeira busca)
+from snapshot_bin import SnapshotBinario, gravar_snapshot  # formato binário lido via mmap
+
+class BinRepo(JsonRepo):
+    """JsonRepo com snapshot no formato binário de ``snapshot_bin`` (mesmo journal opcional).
+
+    ``carregar()`` só mapeia o arquivo e lê o cabeçalho; cada evento é decodificado
+    no primeiro acesso por ID. ``todos_eventos()`` e ``salvar()`` decodificam o que
+    faltar, e os índices de busca são montados na primeira consulta a partir dos
+    campos escalares (sem decodificar inscritos).
+    """
+    def __init__(self, filepath: str = "data/events.bin", **kwargs):
+        super().__init__(filepath, **kwargs)
+        self._snap = None                              # snapshot mapeado (None antes de carregar)
+        self._indice = None                            # montado sob demanda em buscar_eventos
+
+    # ---------- CRUD ----------
+    def salvar_evento(self, evento) -> None:
+        self._ids.adicionar(evento.id)                 # já no snapshot: nada muda
+        self._eventos[evento.id] = evento
+        if evento.id >= self._seq:                     # ID vindo de fora: o contador nunca fica para trás
+            with self._trava:
+                self._seq = max(self._seq, evento.id + 1)
+        if self._indice is not None:                   # sem índice montado ainda: nada a atualizar
+            self._indice.adicionar(evento)
+
+    def _buscar_quente(self, id_evento: int):          # memória primeiro, depois o snapshot
+        ev = self._eventos.get(id_evento)
+        if ev is None and self._snap is not None:
+            with self._trava:                          # duas threads não decodificam o mesmo evento
+                ev = self._eventos.get(id_evento)
+                if ev is None:
+                    ev = self._snap.evento(id_evento, self.participantes)  # inscritos compartilhados
+                    if ev is not None:
+                        self._eventos[id_evento] = ev
+        return ev
+
+    def todos_eventos(self):                           # decodifica o restante do snapshot
+        if self._snap is not None:
+            for id_evento in self._snap.ids():
+                self._buscar_quente(id_evento)
+        return [self._eventos[i] for i in sorted(self._eventos)]
+
+    def buscar_eventos(self, categoria=None, local=None, tipo=None,
+                       data_de=None, data_ate=None, preco_max=None):
+        with self._trava:
+            if self._indice is None:                   # escalares do snapshot + eventos já em memória
+                self._indice = IndiceEventos(self._snap.iter_escalares() if self._snap is not None else ())
+                for e in list(self._eventos.values()):
+                    self._indice.adicionar(e)
+        for id_evento in self._indice.buscar(categoria, local, tipo, data_de, data_ate, preco_max):
+            yield self.buscar_evento(id_evento)
+
+    # ---------- persistência ----------
+    def carregar(self) -> None:                        # só abre o mmap (decodificação sob demanda)
+        if not os.path.exists(self._filepath):
+            if os.path.dirname(self._filepath):
+                os.makedirs(os.path.dirname(self._filepath), exist_ok=True)
+            self._grava_snapshot({"seq": 1}, [])
+        with self._trava:
+            self._fechar_snapshot()
+            self._snap = SnapshotBinario(self._filepath)
+            self._eventos = {}
+            self._ids = IdsOrdenados(self._snap.ids()) # sem decodificar eventos
+            self.participantes.limpar()
+            self._seq = self._snap.seq
+            self._op_n = self._snap.op_n
+            self._indice = None
+            if self._journal:
+                self._reaplicar_journal()
+
+    def salvar(self) -> None:
+        with self._trava:
+            self.todos_eventos()                       # tudo em memória antes de regravar o arquivo
+            self._fechar_snapshot()                    # o mmap antigo não pode ficar aberto na troca
+            super().salvar()
+
+    def arquivar_passados(self, hoje=None) -> int:     # precisa de tudo decodificado antes de regravar
+        if self.arquivo is None:
+            return 0
+        with self._trava:
+            self.todos_eventos()
+            self._fechar_snapshot()                    # o snapshot antigo não pode trazer os arquivados de volta
+            return super().arquivar_passados(hoje)
+
+    def iter_arquivo(self, leitor=None, participantes=None):  # eventos do arquivo, um de cada vez
+        snap = SnapshotBinario(self._filepath)
+        try:
+            for id_evento in list(snap.ids()):
+                yield snap.evento(id_evento, participantes)
+        finally:
+            snap.fechar()
+
+    # ---------- util ----------
+    def _grava_snapshot(self, cabecalho: dict, eventos) -> None:  # mesmo conteúdo do JsonRepo, em binário
+        self.bytes_gravados += gravar_snapshot(self._filepath, cabecalho["seq"], eventos,
+                                               cabecalho.get("op_n", 0), self._fsync)
+
+    def _fechar_snapshot(self) -> None:
+        if self._snap is not None:
+            self._snap.fechar()
+            self._snap = None
+
+    def _aplicar_registro(self, reg: dict) -> None:    # traz o evento do snapshot antes de reaplicar
+        self._buscar_quente(reg.get("id"))
+        super()._aplicar_registro(reg)
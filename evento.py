@@ -1,8 +1,17 @@
+import threading  # hidratação sob demanda pode ocorrer em várias threads
 from datetime import date  # importa o tipo de data do Python
 from participante import Participante  # importa a classe Participante (mesmo diretório)
+from lista_espera import ListaEspera  # fila de espera (criada só quando alguém entra nela)
+
+_TRAVA_HIDRATACAO = threading.Lock()  # garante que um evento é hidratado uma única vez
 
 class Evento:
     """Classe base para eventos genéricos. As subclasses (Workshop, Palestra) herdam desta."""
+    # __slots__ evita um __dict__ por objeto (eventos e participantes existem aos milhares)
+    __slots__ = ("_id", "_nome", "_data_evento", "_local", "_capacidade_max", "_categoria",
+                 "_preco", "_inscritos", "_inscritos_emails", "_checkins", "_versao", "_pendente",
+                 "_espera", "_reservas")
+
     def __init__(self, id_: int, nome: str, data_evento: date, local: str,
                  capacidade_max: int, categoria: str, preco: float):  # construtor com campos comuns
         self._id = id_                               # armazena o identificador do evento
@@ -12,9 +21,13 @@ class Evento:
         self._capacidade_max = capacidade_max        # capacidade máxima (vagas)
         self._categoria = categoria                  # categoria do evento
         self._preco = preco                          # preço do ingresso
-        self._inscritos = []                         # lista de Participante
-        self._inscritos_emails = set()               # conjunto de e-mails já inscritos (para evitar duplicidade)
+        self._inscritos = {}                         # e-mail -> Participante (mantém a ordem de inscrição)
+        self._inscritos_emails = self._inscritos.keys()  # visão dos e-mails inscritos (sempre consistente com o dict)
         self._checkins = set()                       # conjunto de e-mails que fizeram check-in
+        self._versao = 0                             # muda a cada alteração (repositórios detectam eventos "sujos")
+        self._pendente = None                        # não hidratado: ([(nome, e-mail)], [e-mails com check-in], registro ou None)
+        self._espera = None                          # ListaEspera (None enquanto ninguém esperou)
+        self._reservas = None                        # e-mail -> instante de expiração (reservas temporárias, não persistidas)
 
     # ---------- propriedades básicas ----------
     @property
@@ -31,6 +44,8 @@ class Evento:
     def categoria(self): return self._categoria      # retorna categoria
     @property
     def preco(self): return self._preco              # retorna preço
+    @property
+    def versao(self): return self._versao            # número de alterações (inscrições, cancelamentos, check-ins)
 
     # ---------- identificação do tipo ----------
     @property
@@ -39,55 +54,196 @@ class Evento:
 
     # ---------- regras de negócio ----------
     @property
-    def vagas_disponiveis(self):                     # calcula vagas restantes
-        return self._capacidade_max - len(self._inscritos)
+    def vagas_disponiveis(self):                     # calcula vagas restantes (reservas ativas ocupam vaga)
+        return self._capacidade_max - self.total_inscritos() - (len(self._reservas) if self._reservas else 0)
 
     def ja_inscrito(self, email: str) -> bool:       # verifica se um e-mail já está inscrito
+        self._hidratar()
         return email.lower() in self._inscritos_emails
 
     def inscrever(self, p: Participante):            # inscreve participante, respeitando regras
+        self._hidratar()                             # monta os Participantes antes de alterar
+        if self._reservas and p.email in self._reservas:  # quem tem reserva usa a própria vaga
+            del self._reservas[p.email]
         if self.vagas_disponiveis <= 0:              # se não há vagas
             return False, "Evento lotado."           # retorna erro
         if self.ja_inscrito(p.email):                # se e-mail já inscrito
             return False, "Este e-mail já está inscrito."  # retorna erro
-        self._inscritos.append(p)                    # adiciona participante
-        self._inscritos_emails.add(p.email)          # marca e-mail como inscrito
+        self._inscritos[p.email] = p                 # adiciona participante (e marca e-mail como inscrito)
+        if self._espera is not None:                 # inscrito não fica também na lista de espera
+            self._espera.remover(p.email)
+        self._versao += 1                            # incrementa só depois de alterar (quem leu a versão antes vê "sujo")
         return True, "Inscrição realizada!"          # sucesso
 
+    def inscrever_lote(self, participantes):         # inscreve vários de uma vez (ex.: planilha)
+        self._hidratar()
+        vagas = self.vagas_disponiveis               # vagas calculadas uma única vez para o lote
+        reservas = self._reservas or {}              # quem tem reserva usa a própria vaga
+        resultados = []                              # (participante, ok, msg) por item, na ordem recebida
+        aceitos = 0
+        for p in participantes:                      # aceita qualquer iterável (inclusive geradores)
+            if not p.email:                          # linha sem e-mail
+                ok, msg = False, "E-mail vazio."
+            elif p.email in self._inscritos:         # já inscrito (antes ou neste mesmo lote)
+                ok, msg = False, "Este e-mail já está inscrito."
+            elif vagas <= 0 and p.email not in reservas:  # lote passou da capacidade
+                ok, msg = False, "Evento lotado."
+            else:
+                self._inscritos[p.email] = p         # inscreve
+                if self._espera is not None:         # sai da lista de espera (se estava nela)
+                    self._espera.remover(p.email)
+                if reservas.pop(p.email, None) is None:  # com reserva a vaga já estava descontada
+                    vagas -= 1                       # consome vaga
+                aceitos += 1
+                ok, msg = True, "Inscrição realizada!"
+            resultados.append((p, ok, msg))
+        if aceitos:                                  # alguém foi inscrito: uma versão nova por lote
+            self._versao += 1
+        return resultados                            # relatório por item
+
     def cancelar_inscricao(self, email: str):        # cancela uma inscrição existente
+        self._hidratar()
         email = email.strip().lower()                # normaliza e-mail
         if email not in self._inscritos_emails:      # se não está inscrito
+            if self._espera is not None and self._espera.remover(email):  # só estava esperando
+                self._versao += 1
+                return True, "Removido(a) da lista de espera."
             return False, "Inscrição não encontrada para este e-mail."  # erro
-        self._inscritos_emails.remove(email)         # remove do set de inscritos
+        del self._inscritos[email]                   # remove em O(1) (o e-mail sai junto)
         self._checkins.discard(email)                # remove check-in (se houver)
-        self._inscritos = [p for p in self._inscritos if p.email != email]  # filtra lista
+        self._versao += 1                            # marca alteração
         return True, "Inscrição cancelada e vaga liberada."  # sucesso
 
     def checkin(self, email: str):                   # registra presença
+        self._hidratar()
         email = email.strip().lower()                # normaliza e-mail
         if email not in self._inscritos_emails:      # precisa estar inscrito
             return False, "Só é possível fazer check-in para e-mails inscritos."  # erro
         if email in self._checkins:                  # se já tem check-in
             return True, "Check-in já registrado (idempotente)."  # idempotente
-        self._checkins.add(email)                    # registra check-in
+        self._checkins.add(self._inscritos[email].email)  # registra check-in (mesma string do inscrito)
+        self._versao += 1                            # marca alteração
         return True, "Check-in realizado com sucesso."  # sucesso
 
-    def total_inscritos(self) -> int:                # total de inscrições ativas
-        return len(self._inscritos)
+    # ---------- reservas temporárias ----------
+    def reservar(self, email: str, expira_em: float):  # segura uma vaga até expira_em (ex.: durante o pagamento)
+        self._hidratar()
+        email = email.strip().lower()
+        if email in self._inscritos_emails:
+            return False, "Este e-mail já está inscrito."
+        if self._reservas and email in self._reservas:
+            return False, "Este e-mail já tem uma reserva ativa."
+        if self.vagas_disponiveis <= 0:
+            return False, "Evento lotado."
+        if self._reservas is None:
+            self._reservas = {}
+        self._reservas[email] = expira_em
+        return True, "Vaga reservada."
+
+    def liberar_reserva(self, email: str, expira_em: float = None) -> bool:  # devolve a vaga reservada
+        """Remove a reserva do e-mail; com ``expira_em``, só se for aquela mesma reserva (e não uma renovada)."""
+        email = email.strip().lower()
+        if not self._reservas or email not in self._reservas:
+            return False
+        if expira_em is not None and self._reservas[email] != expira_em:
+            return False
+        del self._reservas[email]
+        return True
+
+    def reserva_de(self, email: str):                # instante de expiração da reserva do e-mail (ou None)
+        return self._reservas.get(email.strip().lower()) if self._reservas else None
+
+    def total_reservas(self) -> int:                 # reservas ativas
+        return len(self._reservas) if self._reservas else 0
+
+    # ---------- lista de espera ----------
+    def entrar_lista_espera(self, p: Participante, forcar: bool = False):  # entra na fila de um evento lotado
+        """``forcar=True`` (journal) ignora as vagas livres: reservas não são gravadas, então na
+        reaplicação o evento pode parecer ter vagas que estavam seguras quando a pessoa entrou na fila."""
+        self._hidratar()
+        if self.ja_inscrito(p.email):                # já tem vaga
+            return False, "Este e-mail já está inscrito."
+        if self._espera is not None and p.email in self._espera:  # um lugar por e-mail
+            return False, "Este e-mail já está na lista de espera."
+        if self.vagas_disponiveis > 0 and not forcar:  # não faz sentido esperar
+            return False, "Ainda há vagas: faça a inscrição."
+        if self._espera is None:
+            self._espera = ListaEspera()
+        posicao = self._espera.adicionar(p)
+        self._versao += 1
+        return True, f"Você está na lista de espera (posição {posicao})."
+
+    def promover_da_espera(self, email: str = None, forcar: bool = False):  # vaga liberada: inscreve o próximo da fila
+        """Inscreve o primeiro da fila (ou o e-mail dado, ao reaplicar um journal) e o devolve; None se ninguém.
+
+        ``forcar=True`` (journal) aplica a promoção gravada sem conferir as vagas de novo.
+        """
+        if self._espera is None or not len(self._espera) or (self.vagas_disponiveis <= 0 and not forcar):
+            return None
+        self._hidratar()
+        p = self._espera.remover(email) if email else self._espera.proximo()  # O(1) amortizado
+        if p is None:
+            return None
+        self._inscritos[p.email] = p
+        self._versao += 1
+        return p
+
+    def lista_espera(self) -> list:                  # Participantes esperando, em ordem de chegada
+        return self._espera.participantes() if self._espera is not None else []
+
+    def total_espera(self) -> int:                   # quantos estão esperando
+        return len(self._espera) if self._espera is not None else 0
+
+    def emails_inscritos(self):                      # e-mails inscritos (sem montar listas)
+        self._hidratar()
+        return self._inscritos.keys()
+
+    def emails_checkin(self):                        # e-mails com check-in
+        self._hidratar()
+        return self._checkins
+
+    def emails_sem_hidratar(self):                   # ([e-mails inscritos], [e-mails com check-in]) sem montar Participantes
+        pendente = self._pendente
+        if pendente is None:
+            return list(self._inscritos), list(self._checkins)
+        return [_nome_email(x)[1] for x in pendente[0]], list(pendente[1])
+
+    def total_inscritos(self) -> int:                # total de inscrições ativas (não precisa hidratar)
+        pendente = self._pendente
+        return len(self._inscritos) if pendente is None else len(pendente[0])
+
+    def total_checkins(self) -> int:                 # total de check-ins realizados (não precisa hidratar)
+        pendente = self._pendente
+        return len(self._checkins) if pendente is None else len(pendente[1])
 
     def receita_total(self) -> float:                # receita = inscritos * preço
-        return len(self._inscritos) * float(self._preco)
+        return self.total_inscritos() * float(self._preco)
 
     # ---------- exibição ----------
     def resumo(self) -> str:                         # resumo textual do evento
         data_fmt = self._data_evento.strftime("%Y-%m-%d")  # formata data
         return (f"[ID {self._id}] ({self.tipo}) {self._nome} | {data_fmt} | {self._local} | "
                 f"Cap.: {self._capacidade_max} | Vagas: {self.vagas_disponiveis} | "
-                f"Cat.: {self._categoria} | Preço: R$ {self._preco:,.2f}")  # inclui tipo no resumo
+                f"Cat.: {self._categoria} | Preço: R$ {self._preco:,.2f} | "
+                f"Espera: {self.total_espera()}")  # inclui tipo e tamanho da lista de espera no resumo
 
     # ---------- persistência (base) ----------
-    def to_dict(self) -> dict:                       # serializa o objeto para dict (JSON)
-        return {
+    def to_dict(self, participantes=None) -> dict:   # serializa o objeto para dict (JSON)
+        """Com um RegistroParticipantes, inscritos e check-ins saem como IDs da tabela dele."""
+        pendente = self._pendente                    # não hidratado: devolve os dados crus como vieram
+        if pendente is not None:
+            pares = [_nome_email(x) for x in pendente[0]]
+            checkins = list(pendente[1])
+        else:
+            # list(...) copia de uma vez: seguro mesmo se outra thread alterar o evento durante um snapshot
+            pares = [(p.nome, p.email) for p in list(self._inscritos.values())]
+            checkins = list(self._checkins)
+        if participantes is not None:                # snapshot com tabela de participantes
+            inscritos = [participantes.id_de(nome, email) for nome, email in pares]
+            checkins = [participantes.id_email(email) for email in checkins]
+        else:
+            inscritos = [{"nome": nome, "email": email} for nome, email in pares]
+        d = {
             "tipo": self.tipo,                       # salva o tipo ("evento"/"workshop"/"palestra")
             "id": self._id,                          # id
             "nome": self._nome,                      # nome
@@ -96,12 +252,16 @@ class Evento:
             "capacidade_max": self._capacidade_max,  # capacidade
             "categoria": self._categoria,            # categoria
             "preco": float(self._preco),             # preço
-            "inscritos": [p.to_dict() for p in self._inscritos],  # lista de inscritos serializados
-            "checkins": list(self._checkins),        # lista de e-mails com check-in
+            "inscritos": inscritos,                  # lista de inscritos serializados
+            "checkins": checkins,                    # lista de e-mails com check-in
         }
+        espera = self.lista_espera()
+        if espera:                                   # só aparece quando há alguém esperando
+            d["lista_espera"] = [p.to_dict() for p in espera]
+        return d
 
     @classmethod
-    def from_dict(cls, d: dict):                     # desserializa um Evento genérico (não workshops/palestras)
+    def from_dict(cls, d: dict, participantes=None):  # desserializa um Evento genérico (não workshops/palestras)
         from datetime import date                    # importa date para parse ISO
         id_ = int(d["id"])                           # lê id
         data = date.fromisoformat(d["data_evento"])  # parse da data ISO
@@ -114,9 +274,52 @@ class Evento:
             categoria=d.get("categoria", ""),        # categoria
             preco=float(d.get("preco", 0.0)),        # preço
         )
-        # reconstrói inscritos
-        inscritos = [Participante.from_dict(x) for x in d.get("inscritos", [])]  # monta lista de Participante
-        ev._inscritos = inscritos                     # aplica
-        ev._inscritos_emails = {p.email for p in inscritos}  # set de e-mails
-        ev._checkins = set(d.get("checkins", []))     # aplica check-ins
+        ev._restaurar_inscricoes(d, participantes)    # reconstrói inscritos e check-ins
         return ev                                     # retorna objeto pronto
+
+    def _restaurar_inscricoes(self, d: dict, participantes=None) -> None:  # usado pelos from_dict (base e subclasses)
+        """Com um RegistroParticipantes, os inscritos viram os Participantes compartilhados dele
+        (no snapshot vêm como IDs da tabela do arquivo; no journal, como dicts)."""
+        inscritos = d.get("inscritos") or []
+        checkins = d.get("checkins") or []
+        if inscritos or checkins:                     # guarda só (nome, e-mail): Participantes ficam para _hidratar
+            if participantes is not None:             # IDs: a linha [nome, e-mail] da tabela do arquivo (strings compartilhadas)
+                pares = [participantes.do_arquivo(x) if type(x) is int else (x.get("nome", ""), x.get("email", ""))
+                         for x in inscritos]
+                checkins = [participantes.do_arquivo(x)[1] if type(x) is int else x for x in checkins]
+            else:
+                pares = [(x.get("nome", ""), x.get("email", "")) for x in inscritos]
+                checkins = list(checkins)
+            self._pendente = (pares, checkins, participantes)
+        if d.get("lista_espera"):                     # fila de espera (rara): restaurada na hora
+            novo = participantes.obter if participantes is not None else Participante
+            self._espera = ListaEspera(novo(x.get("nome", ""), x.get("email", "")) for x in d["lista_espera"])
+
+    def _hidratar(self) -> None:                      # monta Participantes e conjuntos no primeiro uso
+        if self._pendente is None:                    # caminho comum: já hidratado (sem trava)
+            return
+        with _TRAVA_HIDRATACAO:
+            pendente = self._pendente
+            if pendente is None:                      # outra thread hidratou enquanto esperava
+                return
+            novo = pendente[2].obter if pendente[2] is not None else Participante  # com registro: objeto compartilhado
+            for x in pendente[0]:                     # (nome, e-mail) ou Participante já compartilhado
+                p = x if type(x) is Participante else novo(*x)
+                self._inscritos[p.email] = p          # o dict não é trocado: a visão de e-mails continua válida
+            self._checkins = set(pendente[1])         # aplica check-ins
+            self._pendente = None                     # por último: quem vê None encontra tudo montado
+
+
+def _nome_email(x):                                  # item pendente: (nome, e-mail) ou Participante
+    return (x.nome, x.email) if type(x) is Participante else x
+
+
+def evento_from_dict(d: dict, participantes=None):   # fábrica polimórfica: escolhe a subclasse pelo "tipo"
+    from workshop import Workshop                    # importa aqui para evitar ciclos
+    from palestra import Palestra                    # idem
+    tipo = (d.get("tipo") or "evento").lower()       # lê tipo salvo
+    if tipo == "workshop":                           # reconstrói Workshop
+        return Workshop.from_dict(d, participantes)
+    if tipo == "palestra":                           # reconstrói Palestra
+        return Palestra.from_dict(d, participantes)
+    return Evento.from_dict(d, participantes)        # caso contrário Evento
@@ -0,0 +1,92 @@
+import functools, threading, time  # cache de respostas para chamadas repetidas
+from collections import OrderedDict  # ordem de uso (LRU) com move_to_end/popitem O(1)
+
+
+class CacheIdempotencia:
+    """Resultados ``(ok, msg)`` por chave de idempotência: LRU limitado + expiração por tempo.
+
+    Um quiosque que repete uma chamada depois de um timeout manda a mesma chave e
+    recebe a resposta original, sem tocar no evento nem no repositório. Chamadas
+    simultâneas com a mesma chave são serializadas (travas por faixa de chave), então
+    só a primeira executa. Os contadores (``estatisticas()``) ajudam a dimensionar
+    ``capacidade`` e ``ttl``.
+    """
+    def __init__(self, capacidade: int = 10000, ttl: float = 24 * 3600, relogio=time.monotonic, n_travas: int = 16):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.relogio = relogio
+        self._itens = OrderedDict()            # chave -> (expira_em, resultado); o mais recente no fim
+        self._trava = threading.Lock()         # protege o OrderedDict e os contadores
+        self._travas = [threading.Lock() for _ in range(n_travas)]  # uma execução por chave
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0                     # achadas vencidas (contam também como falha)
+        self.descartadas = 0                   # removidas por falta de espaço (LRU)
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def obter(self, chave):
+        """Resultado guardado para a chave (ou None); conta acerto/falha."""
+        agora = self.relogio()
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None and item[0] <= agora:
+                del self._itens[chave]
+                self.expiradas += 1
+                item = None
+            if item is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def guardar(self, chave, resultado) -> None:
+        agora = self.relogio()
+        with self._trava:
+            self._itens[chave] = (agora + self.ttl, resultado)
+            self._itens.move_to_end(chave)
+            itens = self._itens
+            while itens:                                 # vencidas no começo da fila saem já
+                primeiro = next(iter(itens.values()))
+                if primeiro[0] > agora:
+                    break
+                itens.popitem(last=False)
+                self.expiradas += 1
+            while len(itens) > self.capacidade:          # passou do limite: sai a menos usada
+                itens.popitem(last=False)
+                self.descartadas += 1
+
+    def executar(self, chave, func):
+        """Resposta guardada para a chave ou, na primeira vez, ``func()`` (guardada em seguida)."""
+        with self._travas[hash(chave) % len(self._travas)]:
+            resultado = self.obter(chave)
+            if resultado is None:
+                resultado = func()
+                self.guardar(chave, resultado)
+            return resultado
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {"itens": len(self._itens), "capacidade": self.capacidade, "acertos": self.acertos,
+                    "falhas": self.falhas, "expiradas": self.expiradas, "descartadas": self.descartadas,
+                    "taxa_acerto": self.acertos / consultas if consultas else 0.0}
+
+
+def idempotente(func):
+    """Acrescenta ``chave_idempotencia=None`` a um método do SistemaEventos.
+
+    Sem chave, chama o método normalmente; com chave, a resposta vem de
+    ``self.idempotencia`` (a chave vale por método: a mesma chave em ``checkin`` e
+    ``inscrever`` são entradas diferentes).
+    """
+    nome = func.__name__
+
+    @functools.wraps(func)
+    def com_chave(self, *args, chave_idempotencia=None, **kwargs):
+        if chave_idempotencia is None:
+            return func(self, *args, **kwargs)
+        return self.idempotencia.executar((nome, chave_idempotencia), lambda: func(self, *args, **kwargs))
+    return com_chave
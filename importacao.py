@@ -0,0 +1,27 @@
+import csv                                     # leitura de planilhas exportadas em CSV
+from participante import Participante          # cada linha vira um Participante
+
+_COLUNAS_EMAIL = ("email", "e-mail", "e_mail")  # nomes aceitos para a coluna de e-mail
+
+
+def ler_participantes_csv(caminho: str):
+    """Gera um Participante por linha do CSV (colunas "nome" e "email"), sem carregar o arquivo inteiro.
+
+    O separador (vírgula, ponto e vírgula ou tab) é detectado pelo cabeçalho, já que
+    planilhas exportadas em pt-BR costumam usar ";".
+    """
+    with open(caminho, "r", encoding="utf-8-sig", newline="") as f:
+        amostra = f.readline()
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        f.seek(0)
+        leitor = csv.DictReader(f, dialect=dialeto)
+        campos = {c.strip().lower(): c for c in (leitor.fieldnames or [])}
+        col_nome = campos.get("nome")
+        col_email = next((campos[c] for c in _COLUNAS_EMAIL if c in campos), None)
+        if col_email is None:
+            raise ValueError("O CSV precisa de uma coluna 'email'.")
+        for linha in leitor:
+            yield Participante(linha.get(col_nome) or "", linha.get(col_email) or "")
@@ -0,0 +1,179 @@
+import threading                              # salvar_evento é chamado por várias threads
+from bisect import bisect_left, bisect_right, insort  # índice de datas ordenado
+
+
+def normalizar_texto(texto) -> str:
+    """Normaliza texto para comparação (sem diferenciar maiúsculas/espaços nas pontas)."""
+    return (texto or "").strip().casefold()
+
+
+def paginar_por_id(buscar, ids, after_id=None, limit=None):
+    """Gera ``buscar(id)`` para os IDs de ``ids`` (IdsOrdenados) após ``after_id``, em ordem, até ``limit`` eventos.
+
+    Cada passo acha o próximo ID existente por bisect, então a página custa o seu
+    tamanho, não o catálogo nem os buracos na sequência de IDs (eventos arquivados,
+    faixas de outras partições). Não itera o dict dos repositórios, então eventos
+    criados por outra thread durante a listagem não a quebram.
+    """
+    n = 0
+    for id_evento in ids.apos(after_id):
+        if limit is not None and n >= limit:
+            return
+        evento = buscar(id_evento)
+        if evento is not None:
+            n += 1
+            yield evento
+
+
+class IdsOrdenados:
+    """IDs dos eventos de um repositório em ordem crescente (o cursor de ``paginar_por_id``).
+
+    IDs novos vêm de ``proximo_id`` e quase sempre são os maiores: entram no fim em
+    O(1). Os demais casos (ID vindo de fora, remoção ao arquivar) custam O(n), raros.
+    """
+    def __init__(self, ids=()):
+        self._ids = sorted(set(ids))
+        self._trava = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def adicionar(self, id_evento: int) -> None:
+        with self._trava:
+            ids = self._ids
+            if not ids or id_evento > ids[-1]:
+                ids.append(id_evento)
+                return
+            i = bisect_left(ids, id_evento)
+            if ids[i] != id_evento:
+                ids.insert(i, id_evento)
+
+    def remover(self, id_evento: int) -> None:
+        with self._trava:
+            i = bisect_left(self._ids, id_evento)
+            if i < len(self._ids) and self._ids[i] == id_evento:
+                del self._ids[i]
+
+    def apos(self, after_id=None):
+        """Gera os IDs maiores que ``after_id``, em ordem (inserções durante a iteração não a quebram)."""
+        ultimo = after_id if after_id is not None else float("-inf")
+        while True:
+            with self._trava:
+                i = bisect_right(self._ids, ultimo)
+                if i >= len(self._ids):
+                    return
+                ultimo = self._ids[i]
+            yield ultimo
+
+
+class IndiceEventos:
+    """Índices secundários de eventos: hash por categoria, local e tipo + lista ordenada por data.
+
+    ``buscar()`` escolhe o índice mais seletivo (o menor conjunto ou a menor faixa de
+    datas, achada por bisect) e confere os demais filtros só nesses candidatos. Os
+    IDs saem em ordem de data (e ID), um por vez.
+    """
+    def __init__(self, eventos=()):
+        self._chaves = {}                      # id -> (categoria, local, tipo, ordinal da data, preço)
+        self._hash = ({}, {}, {})              # categoria/local/tipo -> set(ids)
+        self._datas = []                       # [(ordinal da data, id)] ordenada
+        self._trava = threading.Lock()
+        for e in eventos:
+            self.adicionar(e)
+
+    def adicionar(self, evento) -> None:
+        """Indexa (ou reindexa) um evento; sem custo se nada indexado mudou."""
+        chave = (normalizar_texto(evento.categoria), normalizar_texto(evento.local), evento.tipo,
+                 evento.data_evento.toordinal(), float(evento.preco))
+        if self._chaves.get(evento.id) == chave:
+            return
+        with self._trava:
+            self._remover(evento.id)
+            self._chaves[evento.id] = chave
+            for tabela, valor in zip(self._hash, chave):
+                tabela.setdefault(valor, set()).add(evento.id)
+            insort(self._datas, (chave[3], evento.id))
+
+    def remover(self, id_evento) -> None:
+        with self._trava:
+            self._remover(id_evento)
+
+    def _remover(self, id_evento) -> None:
+        chave = self._chaves.pop(id_evento, None)
+        if chave is None:
+            return
+        for tabela, valor in zip(self._hash, chave):
+            ids = tabela[valor]
+            ids.discard(id_evento)
+            if not ids:
+                del tabela[valor]
+        i = bisect_left(self._datas, (chave[3], id_evento))
+        del self._datas[i]
+
+    def buscar(self, categoria=None, local=None, tipo=None, data_de=None, data_ate=None, preco_max=None):
+        """Gera os IDs que satisfazem todos os filtros informados (None = sem filtro)."""
+        filtros = [(i, normalizar_texto(v)) for i, v in enumerate((categoria, local, tipo)) if v]
+        o_de = data_de.toordinal() if data_de else None
+        o_ate = data_ate.toordinal() if data_ate else None
+
+        def confere(id_):
+            chave = self._chaves.get(id_)
+            return (chave is not None and all(chave[i] == v for i, v in filtros)
+                    and (o_de is None or chave[3] >= o_de) and (o_ate is None or chave[3] <= o_ate)
+                    and (preco_max is None or chave[4] <= preco_max))
+
+        with self._trava:                                       # escolhe candidatos sobre um estado estável
+            conjuntos = [self._hash[i].get(v, set()) for i, v in filtros]
+            ini = bisect_left(self._datas, (o_de, -1)) if o_de is not None else 0
+            fim = bisect_right(self._datas, (o_ate, float("inf"))) if o_ate is not None else len(self._datas)
+            menor = min(conjuntos, key=len) if conjuntos else None
+            if menor is None or fim - ini <= len(menor):        # a faixa de datas é mais seletiva
+                candidatos = self._datas[ini:fim]
+            else:                                               # o conjunto hash é mais seletivo
+                candidatos = sorted((self._chaves[i][3], i) for i in menor)
+        for _, id_ in candidatos:                               # demais filtros conferidos sob demanda
+            if confere(id_):
+                yield id_
+
+
+class IndiceParticipantes:
+    """Índice invertido e-mail -> IDs de eventos (inscrições e check-ins), para todo o repositório."""
+    def __init__(self, eventos=()):
+        self._inscricoes = {}                  # e-mail -> set(ids) em que está inscrito
+        self._checkins = {}                    # e-mail -> set(ids) em que fez check-in
+        self._trava = threading.Lock()
+        for e in eventos:
+            self.adicionar_evento(e)
+
+    def adicionar_evento(self, evento) -> None:
+        """Indexa todas as inscrições e check-ins de um evento (sem hidratá-lo)."""
+        inscritos, checkins = evento.emails_sem_hidratar()
+        with self._trava:
+            for email in inscritos:
+                self._inscricoes.setdefault(email, set()).add(evento.id)
+            for email in checkins:
+                self._checkins.setdefault(email, set()).add(evento.id)
+
+    def inscrever(self, email: str, id_evento) -> None:
+        with self._trava:
+            self._inscricoes.setdefault(email, set()).add(id_evento)
+
+    def checkin(self, email: str, id_evento) -> None:
+        with self._trava:
+            self._checkins.setdefault(email, set()).add(id_evento)
+
+    def cancelar(self, email: str, id_evento) -> None:
+        """Remove a inscrição (e o check-in, que sai junto com ela)."""
+        with self._trava:
+            for tabela in (self._inscricoes, self._checkins):
+                ids = tabela.get(email)
+                if ids is not None:
+                    ids.discard(id_evento)
+                    if not ids:
+                        del tabela[email]
+
+    def eventos_de(self, email: str):
+        """(IDs inscritos, IDs com check-in) do e-mail, em ordem crescente."""
+        email = email.strip().lower()
+        with self._trava:
+            return sorted(self._inscricoes.get(email, ())), sorted(self._checkins.get(email, ()))
@@ -1,63 +1,303 @@
-import json, os                               # json para ler/gravar, os para checar arquivo/pasta
-from evento import Evento                      # classe base
-from workshop import Workshop                  # subclasse Workshop
-from palestra import Palestra                  # subclasse Palestra
+import json, os, threading                    # json para ler/gravar, os para checar arquivo/pasta, threading p/ trava
+from datetime import date, timedelta           # corte dos eventos encerrados (arquivo frio)
+from evento import Evento, evento_from_dict    # classe base + fábrica polimórfica
+from participante import RegistroParticipantes, TabelaSnapshot  # tabela única de participantes (também no snapshot)
+from json_stream import LeitorEventosJson      # leitura incremental (um evento por vez)
+from indices import IdsOrdenados, IndiceEventos, paginar_por_id  # índices secundários + listagem paginada por ID
+from arquivo_frio import ArquivoFrio           # eventos encerrados, fora da memória (opcional)
 
 class JsonRepo:
-    """Repositório com persistência em JSON para eventos e inscrições (suporta subclasses)."""
-    def __init__(self, filepath: str = "data.json"):  # recebe caminho do arquivo JSON
+    """Repositório com persistência em JSON para eventos e inscrições (suporta subclasses).
+
+    Com ``journal=True`` cada operação bem-sucedida é anexada (uma linha compacta)
+    ao arquivo ``<filepath>.log``; ``carregar()`` reaplica snapshot + log e, quando o
+    log passa de ``limite_journal`` registros, ele é compactado num novo snapshot.
+
+    ``salvar()`` guarda o JSON já codificado de cada evento (com a ``versao`` do
+    evento na hora da codificação) e só recodifica os eventos alterados desde o
+    último snapshot — via ``salvar_evento`` ou pelos métodos do próprio Evento. Os
+    demais trechos são copiados do cache para o arquivo.
+
+    O snapshot guarda a tabela de participantes uma vez (``"participantes"``, antes
+    de ``"eventos"``) e os eventos citam cada pessoa pelo ID nela; na memória, a
+    mesma pessoa é um único Participante em todos os eventos (``self.participantes``).
+    Arquivos antigos, com nome e e-mail dentro de cada evento, continuam sendo lidos.
+
+    Com ``pasta_arquivo``, ``carregar()`` move os eventos cuja data passou há mais de
+    ``carencia_dias`` para o ``ArquivoFrio`` (gzip por mês) e regrava o snapshot só
+    com os demais: a carga e a memória acompanham os eventos futuros, não o histórico.
+    ``buscar_evento`` e ``eventos_arquivados`` continuam achando os arquivados;
+    listagens e buscas por filtro (``iter_eventos``, ``buscar_eventos``,
+    ``todos_eventos``) ficam só com os eventos em memória.
+    """
+    def __init__(self, filepath: str = "data.json", journal: bool = False,
+                 limite_journal: int = 1000, fsync: bool = True,
+                 pasta_arquivo: str = None, carencia_dias: int = 30):  # recebe caminho do arquivo JSON
         self._filepath = filepath                      # salva caminho
         self._eventos = {}                             # dict id -> Evento
         self._seq = 1                                  # gerador de ID (contador simples)
+        self._journal = journal                        # liga/desliga o modo journal
+        self._journal_path = filepath + ".log"         # arquivo de log (JSON Lines)
+        self._limite_journal = limite_journal          # registros no log antes de compactar
+        self._fsync = fsync                            # força gravação física a cada operação
+        self._journal_fp = None                        # arquivo de log aberto (append)
+        self._journal_ops = 0                          # registros no log atual
+        self._op_n = 0                                 # número da última operação registrada
+        self._trava = threading.RLock()                # protege contador, log e snapshot entre threads
+        self._indice = IndiceEventos()                 # mantido em salvar_evento/carregar
+        self._ids = IdsOrdenados()                     # IDs em memória, em ordem (cursor de iter_eventos)
+        self._fragmentos = {}                          # id -> (evento, versão, JSON em bytes, IDs de participantes citados)
+        self._sujos = set()                            # IDs passados a salvar_evento desde o último snapshot
+        self.bytes_gravados = 0                        # journal + snapshots (lido pelas métricas)
+        self.participantes = RegistroParticipantes()   # um Participante por pessoa, compartilhado pelos eventos
+        self._tabela = TabelaSnapshot(self.participantes)  # tabela do snapshot, atualizada só pelos trechos que mudam
+        self.arquivo = ArquivoFrio(pasta_arquivo, fsync=fsync) if pasta_arquivo else None  # eventos encerrados
+        self._carencia = timedelta(days=carencia_dias) # dias após a data do evento antes de arquivar
+        self._arquivados = {}                          # id -> Evento já lido do arquivo frio (o mesmo a cada busca)
 
     # ---------- identidade ----------
-    def proximo_id(self) -> int:                       # gera um novo ID
-        nid = self._seq                                # pega valor atual
-        self._seq += 1                                 # incrementa contador
+    def proximo_id(self) -> int:                       # gera um novo ID (atômico)
+        with self._trava:                              # evita dois eventos com o mesmo ID
+            nid = self._seq                            # pega valor atual
+            self._seq += 1                             # incrementa contador
         return nid                                     # retorna ID
 
     # ---------- CRUD ----------
     def salvar_evento(self, evento: Evento) -> None:   # salva/atualiza evento em memória
+        if evento.id not in self._eventos:             # só eventos novos (ou reabertos) mudam a lista de IDs
+            self._ids.adicionar(evento.id)
         self._eventos[evento.id] = evento              # guarda no dicionário
+        if evento.id >= self._seq:                     # ID vindo de fora: o contador nunca fica para trás
+            with self._trava:
+                self._seq = max(self._seq, evento.id + 1)
+        self._sujos.add(evento.id)                     # recodificar no próximo snapshot
+        self._indice.adicionar(evento)                 # atualiza índices (O(1) se nada indexado mudou)
 
     def buscar_evento(self, id_evento: int):           # busca por ID
-        return self._eventos.get(id_evento)            # retorna evento ou None
+        ev = self._buscar_quente(id_evento)            # memória primeiro
+        if ev is None and self.arquivo is not None:    # encerrado há tempo: vem do arquivo frio
+            ev = self._buscar_arquivado(id_evento)
+        return ev                                      # retorna evento ou None
 
     def todos_eventos(self):                           # retorna lista de todos
         return list(self._eventos.values())            # converte dict->lista
 
+    def iter_eventos(self, after_id=None, limit=None):  # cursor: eventos após after_id, em ordem de ID
+        return paginar_por_id(self._buscar_quente, self._ids, after_id, limit)  # sem os arquivados
+
+    def buscar_eventos(self, categoria=None, local=None, tipo=None,
+                       data_de=None, data_ate=None, preco_max=None):  # consulta pelos índices
+        for id_evento in self._indice.buscar(categoria, local, tipo, data_de, data_ate, preco_max):
+            yield self._eventos[id_evento]             # entrega um evento por vez (ordem de data)
+
+    def eventos_arquivados(self):                      # gerador: histórico do arquivo frio (relatórios)
+        if self.arquivo is None:
+            return iter(())
+        return self.arquivo.iter_eventos(ignorar=self._eventos)  # reabertos: vale a cópia em memória
+
+    # ---------- journal ----------
+    def registrar_operacao(self, op: str, evento: Evento, **dados) -> None:  # anexa 1 registro ao log
+        if not self._journal:                          # sem journal: nada a fazer
+            return
+        with self._trava:                              # uma linha inteira por vez, numeração sem buracos
+            self._op_n += 1                            # numera a operação
+            reg = {"n": self._op_n, "op": op, "id": evento.id}  # campos comuns
+            if op == "criar":                          # criação leva o evento inteiro (recém-criado, vazio)
+                reg["evento"] = evento.to_dict()
+            reg.update(dados)                          # nome/e-mail etc.
+            fp = self._abre_journal()                  # abre log em modo append
+            linha = json.dumps(reg, ensure_ascii=False, separators=(",", ":")) + "\n"  # linha compacta
+            fp.write(linha)
+            self.bytes_gravados += len(linha.encode("utf-8"))
+            fp.flush()                                 # esvazia buffer do Python
+            if self._fsync:                            # durabilidade por operação
+                os.fsync(fp.fileno())
+            self._journal_ops += 1                     # conta registros
+            if self._journal_ops >= self._limite_journal:  # log grande demais
+                self.compactar()                       # dobra o log num novo snapshot
+
+    def compactar(self) -> None:                       # snapshot novo + log vazio
+        self.salvar()
+
+    def fechar(self) -> None:                          # fecha o log (se aberto)
+        if self._journal_fp is not None:
+            self._journal_fp.close()
+            self._journal_fp = None
+
     # ---------- persistência ----------
     def carregar(self) -> None:                        # carrega JSON para memória
         # cria arquivo/pasta se ainda não existem
         if not os.path.exists(self._filepath):         # se arquivo não existe
             if os.path.dirname(self._filepath):        # se há diretório na rota
                 os.makedirs(os.path.dirname(self._filepath), exist_ok=True)  # cria pasta
-            self._grava_arquivo({"seq": 1, "eventos": []})  # grava JSON inicial
-        data = self._le_arquivo()                      # lê JSON
-        self._seq = int(data.get("seq", 1))            # recupera contador
+            self._grava_snapshot({"seq": 1}, [])       # grava JSON inicial
+        leitor = self._le_arquivo()                    # leitor incremental do JSON
         self._eventos = {}                             # zera memória
-        for e in data.get("eventos", []):              # percorre lista de eventos
-            tipo = (e.get("tipo") or "evento").lower() # lê tipo salvo
-            if tipo == "workshop":                     # reconstrói Workshop
-                ev = Workshop.from_dict(e)             # usa fábrica da subclasse
-            elif tipo == "palestra":                   # reconstrói Palestra
-                ev = Palestra.from_dict(e)             # usa fábrica da subclasse
-            else:                                      # caso contrário Evento
-                ev = Evento.from_dict(e)               # usa fábrica base
+        self._fragmentos, self._sujos = {}, set()      # cache do snapshot anterior não vale mais
+        self._tabela.limpar()
+        self._arquivados = {}                          # relidos do arquivo frio quando pedidos
+        self.participantes.limpar()                    # IDs novos e densos: só quem está em algum evento
+        for ev in self.iter_arquivo(leitor, self.participantes):  # um evento por vez (sem a árvore JSON inteira)
             self._eventos[ev.id] = ev                  # guarda reconstruído
+        self._seq = int(leitor.campos.get("seq", 1))   # recupera contador
+        self._op_n = int(leitor.campos.get("op_n", 0)) # última operação já contida no snapshot
+        if self._journal:                              # reaplica o log sobre o snapshot
+            self._reaplicar_journal()
+        self._indice = None                            # montado abaixo, já sem os arquivados
+        self._ids = IdsOrdenados(self._eventos)
+        self.arquivar_passados()                       # histórico sai da memória (e do snapshot)
+        self._indice = IndiceEventos(self._eventos.values())  # reconstrói índices
 
     def salvar(self) -> None:                          # grava memória no JSON
-        payload = {                                    # monta objeto raiz
-            "seq": self._seq,                          # salva contador
-            "eventos": [e.to_dict() for e in self._eventos.values()]  # mapeia cada evento -> dict
-        }
-        self._grava_arquivo(payload)                   # grava no arquivo
+        # Outras threads podem estar alterando eventos agora: uma alteração pode entrar no snapshot
+        # e ainda assim ter o registro no log depois dele; reaplicar esses registros é inofensivo.
+        with self._trava:
+            cabecalho = {"seq": self._seq}             # campos da raiz (além de "eventos")
+            if self._journal:                          # snapshot sabe até onde o log já foi aplicado
+                cabecalho["op_n"] = self._op_n
+            self._grava_snapshot(cabecalho, list(self._eventos.values()))  # grava no arquivo
+            if self._journal:                          # snapshot gravado: log pode ser descartado
+                self.fechar()
+                open(self._journal_path, "w", encoding="utf-8").close()  # trunca log
+                self._journal_ops = 0
+
+    def arquivar_passados(self, hoje: date = None) -> int:  # move os encerrados para o arquivo frio
+        if self.arquivo is None:
+            return 0
+        limite = (hoje or date.today()) - self._carencia
+        with self._trava:
+            passados = [e for e in self.todos_eventos() if e.data_evento < limite]
+            if not passados:
+                return 0
+            self.arquivo.arquivar(passados)            # gravados (com fsync) antes de sair do snapshot
+            for e in passados:
+                del self._eventos[e.id]
+                self._ids.remover(e.id)
+                if self._indice is not None:
+                    self._indice.remover(e.id)
+            self.salvar()                              # snapshot só com os quentes; o log é truncado
+        return len(passados)
+
+    def iter_arquivo(self, leitor=None, participantes=None):  # gerador: eventos do arquivo, um de cada vez
+        leitor = leitor or self._le_arquivo()
+        participantes = participantes if participantes is not None else RegistroParticipantes()
+        tabela = None
+        for e in leitor:                               # cada dict vira objeto e é liberado em seguida
+            if tabela is None:                         # a tabela vem antes de "eventos" no arquivo
+                tabela = leitor.campos.pop("participantes", [])
+                participantes.ler_tabela(tabela)
+            yield evento_from_dict(e, participantes)
+        participantes.ler_tabela(None)                 # a tabela do arquivo não é mais necessária
 
     # ---------- util ----------
-    def _le_arquivo(self):                             # helper para ler JSON
-        with open(self._filepath, "r", encoding="utf-8") as f:  # abre arquivo
-            return json.load(f)                        # carrega JSON
+    def _buscar_quente(self, id_evento: int):          # só os eventos em memória
+        return self._eventos.get(id_evento)
+
+    def _buscar_arquivado(self, id_evento: int):       # lido uma vez: alterações no objeto não se perdem
+        ev = self._arquivados.get(id_evento)
+        if ev is None:
+            with self._trava:                          # duas threads não recebem cópias diferentes
+                ev = self._arquivados.get(id_evento)
+                if ev is None:
+                    ev = self.arquivo.buscar(id_evento)
+                    if ev is not None:
+                        self._arquivados[id_evento] = ev
+        return ev
+
+    def _le_arquivo(self):                             # helper para ler JSON (incremental)
+        return LeitorEventosJson(self._filepath)       # percorre "eventos" sem carregar o arquivo todo
+
+    def _grava_snapshot(self, cabecalho: dict, eventos) -> None:  # helper para gravar JSON
+        sujos, self._sujos = self._sujos, set()        # o que chegar agora fica para o próximo snapshot
+        anteriores, fragmentos = dict(self._fragmentos), {}
+        try:
+            for e in eventos:
+                versao = e.versao                      # lida antes de to_dict: se mudar no meio, fica "sujo"
+                f = anteriores.pop(e.id, None)
+                if f is None or f[0] is not e or f[1] != versao or e.id in sujos:
+                    d = e.to_dict(self.participantes)  # só os alterados
+                    novo = (e, versao, json.dumps(d, ensure_ascii=False).encode("utf-8"),
+                            frozenset(d["inscritos"]).union(d["checkins"]))
+                    self._tabela.trocar(f[3] if f is not None else frozenset(), novo[3])
+                    f = novo
+                fragmentos[e.id] = f
+            for f in anteriores.values():              # eventos que saíram (ex.: arquivados)
+                self._tabela.trocar(f[3], frozenset())
+        except BaseException:                          # contagens pela metade: o próximo snapshot recomeça do zero
+            self._fragmentos = {}
+            self._tabela.limpar()
+            raise
+        self._fragmentos = fragmentos
+        raiz = json.dumps(cabecalho, ensure_ascii=False)[:-1]  # '{"seq": ...' sem o '}' final
+        tmp = self._filepath + ".tmp"                  # grava ao lado e troca (atômico)
+        with open(tmp, "wb") as f:                     # abre arquivo temporário
+            n = f.write(raiz.encode("utf-8") + b', "participantes": ' + self._tabela.codificar()  # só quem algum evento cita
+                        + b', "eventos": [\n')
+            n += f.write(b",\n".join(t[2] for t in fragmentos.values()))  # um evento por linha
+            n += f.write(b"\n]}\n")
+            f.flush()
+            if self._fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self._filepath)                # substitui o arquivo antigo
+        self.bytes_gravados += n
+
+    def _abre_journal(self):                           # abre (uma vez) o log em modo append
+        if self._journal_fp is None:
+            self._journal_fp = open(self._journal_path, "a", encoding="utf-8")
+        return self._journal_fp
+
+    def _reaplicar_journal(self) -> None:              # aplica registros com n > op_n do snapshot
+        self.fechar()
+        self._journal_ops = 0
+        if not os.path.exists(self._journal_path):    # nada registrado ainda
+            return
+        incompleto = False                             # última linha cortada por queda?
+        with open(self._journal_path, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    reg = json.loads(linha)
+                except ValueError:                     # linha parcial: queda no meio da gravação
+                    incompleto = True
+                    break
+                self._journal_ops += 1
+                if reg.get("n", 0) <= self._op_n:      # já incluído no snapshot
+                    continue
+                self._aplicar_registro(reg)
+                self._op_n = reg["n"]
+        if incompleto:                                 # descarta o lixo gravando snapshot limpo
+            self.compactar()
 
-    def _grava_arquivo(self, obj):                     # helper para gravar JSON
-        with open(self._filepath, "w", encoding="utf-8") as f:  # abre arquivo
-            json.dump(obj, f, ensure_ascii=False, indent=2)     # salva com identação
+    def _aplicar_registro(self, reg: dict) -> None:    # reexecuta uma operação do log
+        op = reg.get("op")
+        if op == "criar":                              # evento novo
+            if reg.get("id") in self._eventos:         # já está no snapshot (não zera as inscrições)
+                return
+            ev = evento_from_dict(reg["evento"], self.participantes)
+            self._eventos[ev.id] = ev
+            self._ids.adicionar(ev.id)
+            self._seq = max(self._seq, ev.id + 1)      # contador nunca volta atrás
+            return
+        ev = self._eventos.get(reg.get("id"))          # demais operações atuam num evento existente
+        if ev is None and self.arquivo is not None:    # alterado depois de arquivado: volta à memória
+            ev = self._buscar_arquivado(reg.get("id"))
+            if ev is not None:
+                self._eventos[ev.id] = ev
+                self._ids.adicionar(ev.id)
+                self._sujos.add(ev.id)                 # entra no próximo snapshot (e é arquivado de novo)
+        if ev is None:                                 # descartar perderia a operação quando o log fosse truncado
+            raise ValueError(f"{self._journal_path}: registro {reg.get('n')} altera o evento {reg.get('id')}, "
+                             "que não está no snapshot" + ("" if self.arquivo is not None else
+                                                           " (arquivo frio não configurado: pasta_arquivo?)"))
+        if op == "inscrever":
+            ev.inscrever(self.participantes.obter(reg.get("nome", ""), reg.get("email", "")))
+        elif op == "inscrever_lote":
+            ev.inscrever_lote(self.participantes.obter(x.get("nome", ""), x.get("email", ""))
+                              for x in reg.get("participantes", []))
+        elif op == "cancelar":
+            ev.cancelar_inscricao(reg.get("email", ""))
+        elif op == "checkin":
+            ev.checkin(reg.get("email", ""))
+        elif op == "espera":                           # resultado gravado, sem reconferir vagas (reservas não vão ao log)
+            ev.entrar_lista_espera(self.participantes.obter(reg.get("nome", ""), reg.get("email", "")), forcar=True)
+        elif op == "promover":                         # o e-mail registrado (não "o próximo"): reaplicar é inofensivo
+            ev.promover_da_espera(reg.get("email", ""), forcar=True)
@@ -0,0 +1,93 @@
+import json                                   # usa o decodificador padrão para cada valor
+
+_DECODER = json.JSONDecoder()                  # raw_decode: decodifica um valor a partir de uma posição
+_ESPACOS = " \t\n\r"                           # espaços permitidos entre tokens JSON
+
+
+class LeitorEventosJson:
+    """Lê um arquivo {"seq": ..., "eventos": [...]} entregando um evento (dict) por vez.
+
+    Só o texto do evento atual (mais um bloco de leitura) fica em memória, em vez da
+    árvore JSON inteira. Os demais campos do objeto raiz ficam em ``campos`` e estão
+    completos depois que a iteração termina (podem vir antes ou depois de "eventos").
+    """
+    def __init__(self, caminho: str, tamanho_bloco: int = 64 * 1024):
+        self._caminho = caminho
+        self._bloco = tamanho_bloco
+        self.campos = {}
+        self._f = None
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self):
+        with open(self._caminho, "r", encoding="utf-8") as f:
+            self._f, self._buf, self._pos, self._eof = f, "", 0, False
+            self._consumir("{")
+            if self._espiar() == "}":                  # objeto raiz vazio
+                return
+            while True:
+                chave = self._valor()
+                self._consumir(":")
+                if chave == "eventos":
+                    yield from self._itera_lista()
+                else:
+                    self.campos[chave] = self._valor()
+                if self._consumir(",}") == "}":
+                    break
+
+    # ---------- util ----------
+    def _itera_lista(self):
+        self._consumir("[")
+        if self._espiar() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._valor()
+            if self._consumir(",]") == "]":
+                return
+
+    def _ler_mais(self) -> bool:
+        """Acrescenta texto ao buffer (descartando o que já foi consumido); False no fim do arquivo."""
+        if self._eof:
+            return False
+        pedaco = self._f.read(max(self._bloco, len(self._buf) - self._pos))  # cresce em dobro p/ valores grandes
+        if not pedaco:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + pedaco
+        self._pos = 0
+        return True
+
+    def _espiar(self) -> str:
+        """Pula espaços e devolve o próximo caractere (sem consumir); "" no fim do arquivo."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _ESPACOS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._ler_mais():
+                return ""
+
+    def _consumir(self, esperados: str) -> str:
+        c = self._espiar()
+        if not c or c not in esperados:
+            raise ValueError(f"JSON inválido em {self._caminho}: esperado {esperados!r}, encontrado {c!r}")
+        self._pos += 1
+        return c
+
+    def _valor(self):
+        """Decodifica o próximo valor JSON completo, lendo mais do arquivo se ele estiver cortado."""
+        self._espiar()
+        while True:
+            try:
+                obj, fim = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._ler_mais():
+                    continue
+                raise
+            # um número no fim do buffer pode continuar no próximo bloco
+            if fim == len(self._buf) and self._ler_mais():
+                continue
+            self._pos = fim
+            return obj
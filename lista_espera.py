@@ -0,0 +1,55 @@
+from collections import deque  # fila FIFO com popleft O(1)
+
+
+class ListaEspera:
+    """Fila de espera de um evento (ordem de chegada, um lugar por e-mail).
+
+    A fila guarda ``(senha, Participante)`` e o dict ``e-mail -> (senha, Participante)``
+    diz quem ainda está esperando. Sair da fila só apaga do dict (O(1)); a entrada
+    velha fica na fila e é descartada quando chega a vez dela (remoção preguiçosa),
+    então promover o próximo custa O(1) amortizado. Se o lixo passar da metade da
+    fila, ela é refeita de uma vez (também O(1) amortizado).
+    """
+    __slots__ = ("_fila", "_ativos", "_senha")
+
+    def __init__(self, participantes=()):
+        self._fila = deque()
+        self._ativos = {}
+        self._senha = 0                                  # distingue entradas do mesmo e-mail (saiu e voltou)
+        for p in participantes:
+            self.adicionar(p)
+
+    def __len__(self) -> int:
+        return len(self._ativos)
+
+    def __contains__(self, email: str) -> bool:
+        return email in self._ativos
+
+    def adicionar(self, p) -> int:
+        """Coloca no fim da fila e devolve a posição (1 = próximo a ser chamado)."""
+        self._senha += 1
+        entrada = (self._senha, p)
+        self._fila.append(entrada)
+        self._ativos[p.email] = entrada
+        return len(self._ativos)
+
+    def remover(self, email: str):
+        """Tira o e-mail da espera (a entrada na fila vira lixo); devolve o Participante ou None."""
+        entrada = self._ativos.pop(email, None)
+        if len(self._fila) > 2 * len(self._ativos) + 64:  # muito lixo acumulado: refaz a fila
+            self._fila = deque(e for e in self._fila if self._ativos.get(e[1].email) is e)
+        return entrada[1] if entrada else None
+
+    def proximo(self):
+        """Retira e devolve o primeiro que ainda está esperando (ou None)."""
+        while self._fila:
+            entrada = self._fila.popleft()
+            email = entrada[1].email
+            if self._ativos.get(email) is entrada:      # entradas de quem já saiu são descartadas aqui
+                del self._ativos[email]
+                return entrada[1]
+        return None
+
+    def participantes(self) -> list:
+        """Quem está esperando, em ordem de chegada."""
+        return [e[1] for e in list(self._fila) if self._ativos.get(e[1].email) is e]
@@ -1,18 +1,32 @@
+import os  # lê a variável de ambiente das métricas
 # Importa a função que executa o menu interativo.
 from menu import run_menu
 # Importa o repositório que salva os dados em um arquivo JSON.
 from json_repo import JsonRepo
 # from memory_repo import MemoryRepo  # Alternativa que salva os dados apenas em memória.
+# from sqlite_repo import SqliteRepo  # Alternativa com banco SQLite (leitura sob demanda, escrita por operação).
+# from bin_repo import BinRepo  # Alternativa com snapshot binário lido via mmap (carga quase instantânea).
 
 def main():
     # Cria uma instância do repositório JSON, especificando o arquivo onde os dados serão guardados.
-    repo = JsonRepo("data/events.json")
+    # Com journal=True cada operação é gravada na hora em data/events.json.log (não se perde nada se o programa cair).
+    # Eventos encerrados há mais de 30 dias vão para data/arquivo (gzip por mês) e saem da memória.
+    repo = JsonRepo("data/events.json", journal=True, pasta_arquivo="data/arquivo")
     # repo = MemoryRepo()  # Opção para usar o sistema sem salvar dados permanentemente.
+    # repo = SqliteRepo("data/events.db")  # Opção com SQLite em modo WAL.
+    # repo = BinRepo("data/events.bin", journal=True)  # Opção com snapshot binário + journal.
 
     # Importa a classe principal do sistema de eventos.
     from sistemas_evento import SistemaEventos
     # Cria a instância do sistema, passando o repositório como dependência.
-    sistema = SistemaEventos(repo=repo)
+    # EVENTOS_CHAVE_TOKENS liga os tokens de check-in assinados (devolvidos na inscrição).
+    sistema = SistemaEventos(repo=repo, chave_tokens=os.environ.get("EVENTOS_CHAVE_TOKENS"))
+    # Métricas são opcionais: EVENTOS_METRICAS=data/metricas.jsonl liga e grava um retrato por minuto.
+    if os.environ.get("EVENTOS_METRICAS"):
+        sistema.ativar_metricas().iniciar_dump(os.environ["EVENTOS_METRICAS"], intervalo=60)
+    # Rastro também é opcional: EVENTOS_RASTRO=data/rastro.jsonl grava cada operação (python -m rastro reproduzir ...).
+    if os.environ.get("EVENTOS_RASTRO"):
+        sistema.ativar_rastro(os.environ["EVENTOS_RASTRO"])
 
     try:
         # Carrega os dados do arquivo JSON para a memória.
@@ -23,7 +37,7 @@ def main():
         # Captura o comando de interrupção (Ctrl+C) para sair de forma elegante.
         print("\nSaindo...")
     finally:
-        # Garante que os dados sejam salvos no arquivo JSON ao encerrar o programa.
+        # Garante que os dados sejam salvos no arquivo JSON ao encerrar o programa (compacta o journal).
         sistema.salvar()
 
 # Verifica se o script está sendo executado diretamente para chamar a função main.
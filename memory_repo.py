@@ -1,4 +1,6 @@
+import threading
 from typing import Dict
+from indices import IdsOrdenados, IndiceEventos, paginar_por_id
 
 class MemoryRepo:
     """Repositório que armazena os dados apenas em memória."""
@@ -7,16 +9,29 @@ class MemoryRepo:
         self._eventos: Dict[int, object] = {}
         # Sequência para gerar IDs.
         self._seq = 1
+        # Trava que torna a geração de IDs atômica entre threads.
+        self._trava = threading.Lock()
+        # Índices secundários (categoria, local, tipo, data).
+        self._indice = IndiceEventos()
+        # IDs em ordem (cursor da listagem).
+        self._ids = IdsOrdenados()
 
     def proximo_id(self):
-        """Gera o próximo ID sequencial."""
-        nid = self._seq
-        self._seq += 1
+        """Gera o próximo ID sequencial (atômico)."""
+        with self._trava:
+            nid = self._seq
+            self._seq += 1
         return nid
 
     def salvar_evento(self, evento):
-        """Salva/atualiza um evento no dicionário."""
+        """Salva/atualiza um evento no dicionário (e nos índices)."""
+        if evento.id not in self._eventos:        # só eventos novos mudam a lista de IDs
+            self._ids.adicionar(evento.id)
         self._eventos[evento.id] = evento
+        if evento.id >= self._seq:                # ID vindo de fora: o contador nunca fica para trás
+            with self._trava:
+                self._seq = max(self._seq, evento.id + 1)
+        self._indice.adicionar(evento)
 
     def buscar_evento(self, id_evento):
         """Busca um evento pelo ID."""
@@ -24,4 +39,14 @@ class MemoryRepo:
 
     def todos_eventos(self):
         """Retorna uma lista com todos os eventos."""
-        return list(self._eventos.values())
\ No newline at end of file
+        return list(self._eventos.values())
+
+    def iter_eventos(self, after_id=None, limit=None):
+        """Gera os eventos em ordem de ID após ``after_id`` (cursor), no máximo ``limit``."""
+        return paginar_por_id(self._eventos.get, self._ids, after_id, limit)
+
+    def buscar_eventos(self, categoria=None, local=None, tipo=None,
+                       data_de=None, data_ate=None, preco_max=None):
+        """Gera, em ordem de data, os eventos que atendem aos filtros (usa os índices)."""
+        for id_evento in self._indice.buscar(categoria, local, tipo, data_de, data_ate, preco_max):
+            yield self._eventos[id_evento]
\ No newline at end of file
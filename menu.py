@@ -26,6 +26,25 @@ def _input_float(msg: str) -> float:              # lê float (suporta vírgula)
         except ValueError:
             print("⚠️  Informe um valor numérico (ex.: 150 ou 99.90).")  # erro
 
+def _input_opcional(msg: str) -> str:             # lê string (vazio = sem filtro)
+    return input(msg).strip()
+
+def _input_data_opcional(msg: str):               # lê data AAAA-MM-DD ou None se vazio
+    while True:
+        s = input(msg).strip()
+        if not s: return None
+        try: return datetime.strptime(s, "%Y-%m-%d").date()
+        except ValueError:
+            print("⚠️  Data inválida. Use AAAA-MM-DD (ex.: 2025-10-06).")
+
+def _input_float_opcional(msg: str):              # lê float ou None se vazio
+    while True:
+        s = input(msg).strip().replace(",", ".")
+        if not s: return None
+        try: return float(s)
+        except ValueError:
+            print("⚠️  Informe um valor numérico (ex.: 150 ou 99.90).")
+
 def run_menu(sistema):                             # loop principal do menu
     opcoes = {                                     # mapa de opções
         "1": ("Cadastrar Evento", lambda: _cadastrar_evento(sistema)),     # cria evento
@@ -34,6 +53,9 @@ def run_menu(sistema):                             # loop principal do menu
         "4": ("Cancelar Inscrição", lambda: _cancelar_inscricao(sistema)), # cancela
         "5": ("Check-in", lambda: _checkin(sistema)),                      # check-in
         "6": ("Relatórios", lambda: _relatorios(sistema)),                 # relatórios
+        "7": ("Importar Inscrições (CSV)", lambda: _importar_csv(sistema)), # inscrição em lote
+        "8": ("Eventos do Participante", lambda: _eventos_participante(sistema)),  # busca por e-mail
+        "9": ("Métricas", lambda: _metricas(sistema)),                     # desempenho (opcional)
         "0": ("Sair", None),                                               # sair
     }
 
@@ -86,12 +108,31 @@ def _cadastrar_evento(sistema):                        # fluxo de cadastro
 # ---------- Listagem ----------
 def _listar_eventos(sistema):                            # lista eventos
     print("\n=== Listar Eventos ===")                   # título
-    eventos = sistema.listar_eventos()                  # busca no sistema
-    if not eventos:                                     # se vazio
+    if _input_opcional("Aplicar filtros? (s/N): ").lower() == "s":  # busca indexada
+        print("(deixe em branco para não filtrar)")
+        tipo_op = _input_opcional("Tipo (1) Evento  2) Workshop  3) Palestra): ")
+        filtros = {
+            "categoria": _input_opcional("Categoria: ") or None,
+            "local": _input_opcional("Local: ") or None,
+            "tipo": {"1": "evento", "2": "workshop", "3": "palestra"}.get(tipo_op),
+            "data_de": _input_data_opcional("A partir de (AAAA-MM-DD): "),
+            "data_ate": _input_data_opcional("Até (AAAA-MM-DD): "),
+            "preco_max": _input_float_opcional("Preço máximo: "),
+        }
+        eventos = sistema.buscar_eventos(**filtros)     # gerador em ordem de data
+    else:
+        eventos = sistema.listar_eventos()              # gerador em ordem de ID (sem copiar o catálogo)
+    if not _paginar(eventos):                           # se vazio
         print("(Nenhum evento cadastrado)")             # mensagem
-        return                                          # sai
-    for e in eventos:                                   # para cada evento
+
+def _paginar(eventos, tamanho: int = 20) -> int:        # imprime de página em página; devolve quantos
+    n = 0
+    for e in eventos:                                   # só formata o que vai para a tela
+        if n and n % tamanho == 0 and _input_opcional("-- Enter para mais, q para parar: ").lower() == "q":
+            break
         print(e.resumo())                               # imprime resumo
+        n += 1
+    return n
 
 # ---------- Inscrição ----------
 def _inscrever(sistema):                                 # inscreve alguém
@@ -102,6 +143,47 @@ def _inscrever(sistema):                                 # inscreve alguém
     p = Participante(nome, email)                       # cria participante
     ok, msg = sistema.inscrever(id_evento, p)           # chama sistema
     print(("✔️ " if ok else "❌ ") + msg)                # mostra resultado
+    if ok:
+        ok_token, token = sistema.token_checkin(id_evento, p.email)  # só com tokens ligados
+        if ok_token:
+            print(f"🎫 Token de check-in: {token}")
+    if not ok and msg == "Evento lotado.":               # oferece a lista de espera
+        if input("Entrar na lista de espera? (s/n): ").strip().lower() == "s":
+            ok, msg = sistema.entrar_lista_espera(id_evento, p)
+            print(("✔️ " if ok else "❌ ") + msg)
+
+# ---------- Inscrição em lote ----------
+def _importar_csv(sistema):                              # importa planilha de inscritos
+    print("\n=== Importar Inscrições (CSV) ===")        # título
+    id_evento = _input_int("ID do evento: ")            # ID
+    caminho = _input_str("Arquivo CSV (colunas nome;email): ")  # caminho do arquivo
+    try:
+        ok, resp = sistema.importar_csv(id_evento, caminho)  # lê e inscreve o lote
+    except (OSError, ValueError) as e:                  # arquivo ausente ou sem coluna de e-mail
+        print("❌ " + str(e))
+        return
+    if not ok:                                          # evento inexistente
+        print("❌ " + resp)
+        return
+    aceitos = sum(1 for _, _, ok_linha, _ in resp if ok_linha)  # conta sucessos
+    for i, email, ok_linha, msg in resp:                # mostra só as recusas
+        if not ok_linha:
+            print(f"❌ Registro {i} ({email or '-'}): {msg}")
+    print(f"✔️ {aceitos} de {len(resp)} inscrições realizadas.")  # resumo
+
+# ---------- Eventos de um participante ----------
+def _eventos_participante(sistema):                      # em quais eventos um e-mail está
+    print("\n=== Eventos do Participante ===")          # título
+    email = _input_str("E-mail do participante: ")      # e-mail
+    eventos = sistema.eventos_do_participante(email)    # consulta pelo índice e-mail -> eventos
+    if not eventos:                                     # se vazio
+        print("(Nenhuma inscrição para este e-mail)")
+        return
+    for e, fez_checkin in eventos:                      # lista com indicação de presença
+        print(e.resumo() + (" | ✔️ check-in" if fez_checkin else ""))
+    if _input_opcional("Cancelar TODAS as inscrições deste e-mail? (s/N): ").lower() == "s":
+        for id_evento, ok, msg in sistema.cancelar_todas_inscricoes(email):
+            print(f"[ID {id_evento}] " + ("✔️ " if ok else "❌ ") + msg)
 
 # ---------- Cancelamento ----------
 def _cancelar_inscricao(sistema):                        # cancela inscrição
@@ -114,18 +196,32 @@ def _cancelar_inscricao(sistema):                        # cancela inscrição
 # ---------- Check-in ----------
 def _checkin(sistema):                                   # faz check-in
     print("\n=== Check-in ===")                         # título
+    email = _input_str("E-mail ou token de check-in: ")  # e-mail (ou token lido do QR code)
+    if "@" not in email:                                # token: já traz o evento e o e-mail
+        ok, msg = sistema.checkin_token(email)
+        print(("✔️ " if ok else "❌ ") + msg)
+        return
     id_evento = _input_int("ID do evento: ")            # ID
-    email = _input_str("E-mail do participante: ")      # e-mail
     ok, msg = sistema.checkin(id_evento, email)         # chama sistema
     print(("✔️ " if ok else "❌ ") + msg)                # mostra resultado
 
 # ---------- Relatórios ----------
+def _formata_agregado(d: dict) -> str:                   # linha com os indicadores de um agregado
+    return (f"Inscritos: {d['inscritos']}/{d['capacidade']} ({d['ocupacao']:.0%}) | "
+            f"Check-ins: {d['checkins']} ({d['taxa_checkin']:.0%}) | Receita: R$ {d['receita']:,.2f}")
+
 def _relatorios(sistema):                                # submenu de relatórios
     while True:                                          # loop até voltar
         print("\n--- Relatórios ---")                    # título
         print(" 1) Total de inscritos por evento")       # opção 1
         print(" 2) Listar eventos com vagas disponíveis")# opção 2
         print(" 3) Receita total de um evento")          # opção 3
+        print(" 4) Ocupação e check-ins de um evento")   # opção 4
+        print(" 5) Resumo por categoria")                # opção 5
+        print(" 6) Resumo por mês")                      # opção 6
+        print(" 7) Receita por categoria e mês")         # opção 7
+        print(" 8) Distribuição de ocupação")            # opção 8
+        print(" 9) No-show por categoria")               # opção 9
         print(" 0) Voltar")                              # opção voltar
         esc = input("Selecione: ").strip()               # lê escolha
         if esc == "0":                                   # se voltar
@@ -135,17 +231,66 @@ def _relatorios(sistema):                                # submenu de relatório
             ok, resp = sistema.relatorio_total_inscritos(id_evento)  # chama
             print(f"Total de inscritos: {resp}" if ok else "❌ " + str(resp))  # resultado
         elif esc == "2":                                 # eventos com vagas
-            eventos = sistema.relatorio_eventos_com_vagas()  # lista
-            if not eventos:                              # se vazio
+            if not _paginar(sistema.relatorio_eventos_com_vagas()):  # gerador, página a página
                 print("(Nenhum evento com vagas)")       # mensagem
-            else:
-                for e in eventos:                        # para cada
-                    print(e.resumo())                    # imprime
         elif esc == "3":                                 # receita de um evento
             id_evento = _input_int("ID do evento: ")     # ID
             ok, resp = sistema.relatorio_receita_evento(id_evento)  # chama
             print(f"Receita total: R$ {resp:,.2f}" if ok else "❌ " + str(resp))  # resultado
+        elif esc == "4":                                 # indicadores de um evento
+            id_evento = _input_int("ID do evento: ")     # ID
+            ok, resp = sistema.relatorio_ocupacao_evento(id_evento)  # chama
+            print(_formata_agregado(resp) if ok else "❌ " + str(resp))  # resultado
+        elif esc in ("5", "6"):                          # agregados por categoria / mês
+            grupos = sistema.relatorio_por_categoria() if esc == "5" else sistema.relatorio_por_mes()
+            if not grupos:                               # se vazio
+                print("(Nenhum evento cadastrado)")
+            for chave, dados in grupos.items():          # uma linha por grupo
+                print(f"{chave}: {dados['eventos']} evento(s) | {_formata_agregado(dados)}")
+        elif esc == "7":                                 # receita cruzando categoria e mês
+            tabela = sistema.relatorio_receita_categoria_mes()
+            if not tabela:
+                print("(Nenhum evento cadastrado)")
+            for categoria, meses in tabela.items():      # um bloco por categoria
+                print(categoria)
+                for mes, d in meses.items():
+                    print(f"  {mes}: {d['eventos']} evento(s) | Inscritos: {d['inscritos']} | "
+                          f"Receita: R$ {d['receita']:,.2f}")
+        elif esc == "8":                                 # histograma de ocupação
+            faixas = sistema.relatorio_distribuicao_ocupacao()
+            for i, n in enumerate(faixas):               # uma barra por faixa de 10%
+                print(f"{10 * i:>3}%–{10 * (i + 1):>3}%: {n:>6} " + "█" * min(n, 50))
+        elif esc == "9":                                 # quem se inscreveu e não apareceu
+            ate = _input_data_opcional("Eventos até (AAAA-MM-DD, vazio = todos): ")
+            tabela = sistema.relatorio_no_show(ate)
+            if not tabela:
+                print("(Nenhum evento no período)")
+            for categoria, d in tabela.items():
+                print(f"{categoria}: {d['eventos']} evento(s) | Inscritos: {d['inscritos']} | "
+                      f"Check-ins: {d['checkins']} | No-show: {d['no_show']:.0%}")
         else:
             print("⚠️  Opção inválida.")                 # inválido
 
-
+# ---------- Métricas ----------
+def _metricas(sistema):                                  # chamadas, latências, bytes e espera por travas
+    print("\n=== Métricas ===")                         # título
+    if sistema.metricas is None:                         # desligadas por padrão (custo zero)
+        if input("Métricas desligadas. Ativar agora? (s/n): ").strip().lower() != "s":
+            return
+        sistema.ativar_metricas()
+        print("✔️ Métricas ativadas (os números começam a contar a partir de agora).")
+        return
+    dados = sistema.metricas.instantaneo()               # retrato atual
+    chamadas = sorted(dados["chamadas"].items(), key=lambda kv: -kv[1]["total_ms"])  # mais custosas primeiro
+    if not chamadas:
+        print("(Nenhuma chamada registrada ainda)")
+    for nome, h in chamadas:                             # uma linha por método
+        print(f"{nome:<36} {h['n']:>7}x | p50 {h['p50_ms']:.3f} | p95 {h['p95_ms']:.3f} | "
+              f"p99 {h['p99_ms']:.3f} ms | total {h['total_ms']:,.1f} ms")
+    e = dados["espera_trava"]
+    print(f"Espera por travas: {e['n']} aquisições | p99 {e['p99_ms']:.3f} ms | total {e['total_ms']:,.1f} ms")
+    print(f"Bytes gravados: {dados['bytes_gravados']:,}")
+    if "idempotencia" in dados:                          # respostas reaproveitadas em chamadas repetidas
+        i = dados["idempotencia"]
+        print(f"Idempotência: {i['itens']}/{i['capacidade']} chaves | acertos {i['acertos']} | "
+              f"falhas {i['falhas']} ({i['taxa_acerto']:.0%} de acerto) | descartadas {i['descartadas']}")
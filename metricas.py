@@ -0,0 +1,173 @@
+import functools, json, os, threading, time   # instrumentação opcional (só biblioteca padrão)
+from bisect import bisect_left                 # balde do histograma
+from datetime import datetime                  # carimbo dos dumps
+
+_LIMITES = [1e-6 * 2 ** (i / 4) for i in range(100)]  # baldes de 1 µs a ~30 s, cada um ~19% maior
+
+_USOS = ("criar_evento", "listar_eventos", "buscar_eventos", "obter_evento", "inscrever", "inscrever_lote",
+         "importar_csv", "cancelar_inscricao", "checkin", "checkin_token", "entrar_lista_espera",
+         "eventos_do_participante", "cancelar_todas_inscricoes", "reservar", "confirmar_reserva", "liberar_reserva",
+         "liberar_reservas_vencidas", "carregar", "salvar")
+_REPO = ("proximo_id", "salvar_evento", "buscar_evento", "todos_eventos", "buscar_eventos",
+         "registrar_operacao", "eventos_do_participante", "carregar", "salvar", "compactar")
+
+
+class Histograma:
+    """Latências em baldes logarítmicos: registro O(log baldes), percentis com erro de ~19%."""
+    __slots__ = ("n", "total", "maximo", "_baldes")
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self._baldes = [0] * (len(_LIMITES) + 1)
+
+    def registrar(self, segundos: float) -> None:
+        self.n += 1
+        self.total += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        self._baldes[bisect_left(_LIMITES, segundos)] += 1
+
+    def percentil(self, p: float) -> float:
+        """Limite superior do balde que contém o percentil p (0-100), em segundos."""
+        if not self.n:
+            return 0.0
+        alvo, acumulado = p / 100 * self.n, 0
+        for i, c in enumerate(self._baldes):
+            acumulado += c
+            if acumulado >= alvo and c:
+                return min(_LIMITES[i], self.maximo) if i < len(_LIMITES) else self.maximo
+        return self.maximo
+
+    def resumo(self) -> dict:
+        ms = lambda s: round(1000 * s, 3)
+        return {"n": self.n, "total_ms": ms(self.total), "p50_ms": ms(self.percentil(50)),
+                "p95_ms": ms(self.percentil(95)), "p99_ms": ms(self.percentil(99)), "max_ms": ms(self.maximo)}
+
+
+class Metricas:
+    """Contadores de chamadas, histogramas de latência, bytes gravados e espera por travas.
+
+    Nada é medido até ``instrumentar(sistema, metricas)`` (ou
+    ``SistemaEventos.ativar_metricas``) trocar os métodos da instância por versões
+    cronometradas; sem isso o custo é zero. ``iniciar_dump`` anexa um retrato em
+    JSON Lines a um arquivo local a cada ``intervalo`` segundos.
+    """
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._chamadas = {}                    # nome -> Histograma
+        self._espera = Histograma()            # espera para obter a trava de um evento
+        self._repos = []                       # repositórios com contador bytes_gravados
+        self._idempotencia = None              # CacheIdempotencia do sistema (acertos/falhas)
+        self._parar = None                     # Event da thread de dump
+
+    def registrar(self, nome: str, segundos: float) -> None:
+        with self._trava:
+            h = self._chamadas.get(nome)
+            if h is None:
+                h = self._chamadas[nome] = Histograma()
+            h.registrar(segundos)
+
+    def registrar_espera(self, segundos: float) -> None:
+        with self._trava:
+            self._espera.registrar(segundos)
+
+    def observar_repo(self, repo) -> None:
+        if hasattr(repo, "bytes_gravados"):    # JsonRepo/BinRepo contam o que gravam
+            self._repos.append(repo)
+
+    def instantaneo(self) -> dict:
+        """Retrato atual: {"chamadas": {nome: resumo}, "espera_trava": resumo, "bytes_gravados": n,
+        "idempotencia": contadores do cache (se o sistema tiver um)}."""
+        with self._trava:
+            chamadas = {k: h.resumo() for k, h in sorted(self._chamadas.items())}
+            espera = self._espera.resumo()
+        dados = {"chamadas": chamadas, "espera_trava": espera,
+                 "bytes_gravados": sum(r.bytes_gravados for r in self._repos)}
+        if self._idempotencia is not None:
+            dados["idempotencia"] = self._idempotencia.estatisticas()
+        return dados
+
+    # ---------- dump periódico ----------
+    def iniciar_dump(self, caminho: str, intervalo: float = 60.0) -> None:
+        """Anexa ``instantaneo()`` (uma linha JSON) a ``caminho`` a cada ``intervalo`` segundos."""
+        self.parar_dump()
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._parar = parar = threading.Event()
+
+        def laco():
+            while not parar.wait(intervalo):
+                self.gravar_dump(caminho)
+
+        threading.Thread(target=laco, name="dump-metricas", daemon=True).start()
+
+    def parar_dump(self) -> None:
+        if self._parar is not None:
+            self._parar.set()
+            self._parar = None
+
+    def gravar_dump(self, caminho: str) -> None:
+        linha = {"data": datetime.now().isoformat(timespec="seconds")}
+        linha.update(self.instantaneo())
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linha, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+class _TravaMedida:
+    """Trava que registra quanto tempo se esperou para obtê-la."""
+    __slots__ = ("_trava", "_metricas")
+
+    def __init__(self, trava, metricas):
+        self._trava = trava
+        self._metricas = metricas
+
+    def acquire(self):
+        t0 = time.perf_counter()
+        self._trava.acquire()
+        self._metricas.registrar_espera(time.perf_counter() - t0)
+        return True
+
+    def release(self):
+        self._trava.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _medido(func, nome, metricas):
+    registrar = metricas.registrar
+
+    @functools.wraps(func)
+    def medido(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registrar(nome, time.perf_counter() - t0)
+    return medido
+
+
+def instrumentar(sistema, metricas: Metricas) -> Metricas:
+    """Troca métodos do sistema e do repositório (na instância) por versões cronometradas.
+
+    Casos de uso viram ``sistema.<nome>``, chamadas ao repositório ``repo.<nome>``
+    (só as que o repositório tem) e as travas por evento passam a medir a espera.
+    Geradores (ex.: ``buscar_eventos``) contam só a criação, não o consumo.
+    """
+    nomes = _USOS + tuple(n for n in dir(sistema) if n.startswith("relatorio_"))
+    for nome in nomes:
+        if hasattr(sistema, nome):
+            setattr(sistema, nome, _medido(getattr(sistema, nome), f"sistema.{nome}", metricas))
+    repo = sistema._repo
+    for nome in _REPO:
+        if hasattr(repo, nome):
+            setattr(repo, nome, _medido(getattr(repo, nome), f"repo.{nome}", metricas))
+    sistema._travas = [_TravaMedida(t, metricas) for t in sistema._travas]
+    metricas.observar_repo(repo)
+    metricas._idempotencia = getattr(sistema, "idempotencia", None)
+    return metricas
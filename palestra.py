@@ -2,6 +2,8 @@ from evento import Evento  # importa a classe base
 # Subclasse Palestra acrescenta o campo "palestrante"
 
 class Palestra(Evento):  # define que Palestra herda de Evento
+    __slots__ = ("_palestrante",)  # campo específico (a base já define os demais slots)
+
     def __init__(self, id_, nome, data_evento, local, capacidade_max, categoria, preco,
                  palestrante: str):  # inclui campo específico
         super().__init__(id_, nome, data_evento, local, capacidade_max, categoria, preco)  # inicializa base
@@ -19,14 +21,14 @@ class Palestra(Evento):  # define que Palestra herda de Evento
         base = super().resumo()    # aproveita o resumo da classe base
         return f"{base} | Palestrante: {self._palestrante}"  # adiciona informação
 
-    def to_dict(self) -> dict:     # serializa incluindo campo específico
-        data = super().to_dict()   # pega dict base
+    def to_dict(self, participantes=None) -> dict:  # serializa incluindo campo específico
+        data = super().to_dict(participantes)  # pega dict base
         data["tipo"] = "palestra"  # garante tipo correto
         data["palestrante"] = self._palestrante  # campo extra
         return data                # retorna dict completo
 
     @classmethod
-    def from_dict(cls, d: dict):   # desserializa uma Palestra
+    def from_dict(cls, d: dict, participantes=None):  # desserializa uma Palestra
         from datetime import date  # importa date para parse
         data = date.fromisoformat(d["data_evento"])  # converte data ISO
         obj = cls(                 # cria instância de Palestra
@@ -39,10 +41,5 @@ class Palestra(Evento):  # define que Palestra herda de Evento
             preco=float(d.get("preco", 0.0)),  # preço
             palestrante=d.get("palestrante", ""),  # campo específico
         )
-        # reconstrói inscritos/check-ins a partir do dict, reaproveitando lógica da base
-        from participante import Participante      # importa Participante aqui para evitar ciclos
-        inscritos = [Participante.from_dict(x) for x in d.get("inscritos", [])]  # lista de inscritos
-        obj._inscritos = inscritos                 # aplica inscritos
-        obj._inscritos_emails = {p.email for p in inscritos}  # set de e-mails
-        obj._checkins = set(d.get("checkins", [])) # aplica check-ins
+        obj._restaurar_inscricoes(d, participantes)  # reconstrói inscritos/check-ins reaproveitando lógica da base
         return obj                                 # retorna objeto
@@ -0,0 +1,244 @@
+"""Repositório particionado: eventos espalhados por N repositórios independentes.
+
+O evento de ID ``i`` mora na partição ``(i - 1) % N``; cada partição tem o seu
+arquivo (``<pasta>/p<k>.json``) e a sua faixa de IDs (k+1, k+1+N, k+1+2N, ...),
+e ``proximo_id()`` reveza entre elas. Consultas que cruzam partições
+(``todos_eventos``, ``buscar_eventos``, ``salvar``...) são repassadas a todas e
+os resultados são intercalados.
+
+Com ``processos=True`` cada partição roda num processo próprio: o roteador
+(este objeto, dentro do processo do SistemaEventos) mantém os eventos em memória
+e manda para o processo da partição só o registro de cada operação — o mesmo do
+journal —, que o processo reaplica na sua cópia e anexa ao journal da partição
+(com fsync). Nesse modo o journal vem ligado por padrão (``journal=False`` explícito
+desliga; aí nada chega ao disco antes de ``salvar()``), e a fábrica precisa ser um
+JsonRepo/BinRepo (ou ``functools.partial`` de um), pois o processo usa o journal deles.
+
+Quando usar processos: a gravação de partições diferentes passa a acontecer em
+paralelo, em núcleos diferentes, mas cada operação paga a ida e volta pelo pipe.
+Compensa com vários núcleos e fsync caro (disco lento ou de rede); numa máquina de
+um núcleo, ou com fsync rápido, o modo no mesmo processo é mais rápido (medido com
+``benchmarks.carga_http``: 4 partições em processos ~1,8 mil req/s contra ~2,4 mil
+de um JsonRepo só, em um núcleo com fsync de ~85 µs).
+"""
+import heapq, multiprocessing, os, threading
+from functools import partial
+from evento import evento_from_dict
+from indices import IdsOrdenados, IndiceEventos, paginar_por_id
+from json_repo import JsonRepo
+
+
+class PartitionedRepo:
+    """Roteador de N partições (no mesmo processo ou uma por processo)."""
+    def __init__(self, pasta: str = "data/particoes", n_particoes: int = 4, fabrica=JsonRepo,
+                 processos: bool = False, extensao: str = ".json", **opcoes):
+        if n_particoes < 1:
+            raise ValueError("É preciso ao menos uma partição.")
+        self._n = n_particoes
+        self._trava = threading.Lock()                 # alocação de IDs
+        self._vez = 0                                  # próxima partição a criar evento (revezamento)
+        self._proximos = [None] * n_particoes          # próximo ID livre de cada partição (lido no 1º uso)
+        self._ids = IdsOrdenados()                     # IDs de todas as partições, em ordem (cursor)
+        if processos and "journal" not in opcoes and "journal" not in getattr(fabrica, "keywords", {}):
+            opcoes["journal"] = True                   # cada operação chega ao disco da partição
+        fabrica = partial(fabrica, **opcoes) if opcoes else fabrica
+        caminhos = [os.path.join(pasta, f"p{k}{extensao}") for k in range(n_particoes)]
+        self._processos = processos
+        if processos:
+            self._lojas = [_ParticaoRemota(fabrica, c) for c in caminhos]
+            self._eventos = {}                         # cópia do roteador: id -> Evento
+            self._indice = IndiceEventos()
+        else:
+            self._lojas = [fabrica(c) for c in caminhos]
+
+    def particao(self, id_evento: int) -> int:
+        return (id_evento - 1) % self._n
+
+    # ---------- identidade ----------
+    def proximo_id(self) -> int:
+        """ID da próxima partição da vez, dentro da faixa dela."""
+        with self._trava:
+            k = self._vez
+            self._vez = (k + 1) % self._n
+            nid = self._proximos[k]
+            if nid is None:                            # alinha o contador da partição à faixa dela
+                v = self._lojas[k].proximo_id()
+                nid = v + (k - (v - 1)) % self._n
+            self._proximos[k] = nid + self._n
+        return nid
+
+    # ---------- CRUD ----------
+    def salvar_evento(self, evento) -> None:
+        loja = self._lojas[self.particao(evento.id)]
+        self._ids.adicionar(evento.id)                 # O(1) no caso comum (ID novo é o maior)
+        if not self._processos:
+            loja.salvar_evento(evento)
+            return
+        novo = evento.id not in self._eventos
+        self._eventos[evento.id] = evento
+        self._indice.adicionar(evento)
+        if novo:                                       # o processo só recebe o evento inteiro na criação;
+            loja.chamar("salvar_evento", evento.to_dict())  # depois, as operações (registrar_operacao)
+
+    def buscar_evento(self, id_evento: int):
+        if self._processos:
+            return self._eventos.get(id_evento)
+        return self._lojas[self.particao(id_evento)].buscar_evento(id_evento)
+
+    def todos_eventos(self):
+        """Todos os eventos, de todas as partições, em ordem de ID."""
+        if self._processos:
+            return [self._eventos[i] for i in sorted(self._eventos)]
+        por_loja = [sorted(loja.todos_eventos(), key=lambda e: e.id) for loja in self._lojas]
+        return list(heapq.merge(*por_loja, key=lambda e: e.id))
+
+    def iter_eventos(self, after_id=None, limit=None):
+        """Cursor em ordem de ID (cada ID vai direto à sua partição)."""
+        return paginar_por_id(self.buscar_evento, self._ids, after_id, limit)
+
+    def buscar_eventos(self, categoria=None, local=None, tipo=None,
+                       data_de=None, data_ate=None, preco_max=None):
+        """Eventos que atendem aos filtros, em ordem de data (resultados das partições intercalados)."""
+        filtros = (categoria, local, tipo, data_de, data_ate, preco_max)
+        if self._processos:
+            for id_evento in self._indice.buscar(*filtros):
+                yield self._eventos[id_evento]
+            return
+        fontes = [loja.buscar_eventos(*filtros) for loja in self._lojas]
+        yield from heapq.merge(*fontes, key=lambda e: (e.data_evento, e.id))
+
+    # ---------- journal ----------
+    def registrar_operacao(self, op: str, evento, **dados) -> None:
+        loja = self._lojas[self.particao(evento.id)]
+        if self._processos:                            # a partição reaplica a operação e a grava
+            loja.chamar("operacao", op, evento.id, dados)
+        elif hasattr(loja, "registrar_operacao"):
+            loja.registrar_operacao(op, evento, **dados)
+
+    # ---------- persistência (em todas as partições) ----------
+    def carregar(self) -> None:
+        with self._trava:
+            self._proximos = [None] * self._n
+        if not self._processos:
+            for loja in self._lojas:
+                if hasattr(loja, "carregar"):
+                    loja.carregar()
+            self._ids = IdsOrdenados(e.id for loja in self._lojas for e in loja.todos_eventos())
+            return
+        self._eventos = {}
+        for dicts in _em_todas(self._lojas, "carregar"):   # as partições carregam em paralelo
+            for d in dicts:
+                ev = evento_from_dict(d)
+                self._eventos[ev.id] = ev
+        self._indice = IndiceEventos(self._eventos.values())
+        self._ids = IdsOrdenados(self._eventos)
+
+    def salvar(self) -> None:
+        self._em_todas("salvar")
+
+    def compactar(self) -> None:
+        self._em_todas("compactar")
+
+    def fechar(self) -> None:
+        self._em_todas("fechar")
+        if self._processos:
+            for loja in self._lojas:
+                loja.encerrar()
+
+    @property
+    def bytes_gravados(self) -> int:                   # lido pelas métricas
+        if self._processos:
+            return sum(_em_todas(self._lojas, "bytes_gravados"))
+        return sum(getattr(loja, "bytes_gravados", 0) for loja in self._lojas)
+
+    # ---------- util ----------
+    def _em_todas(self, metodo: str) -> None:
+        if self._processos:
+            _em_todas(self._lojas, metodo)
+            return
+        for loja in self._lojas:
+            if hasattr(loja, metodo):
+                getattr(loja, metodo)()
+
+
+# ---------- modo com processos ----------
+class _ParticaoRemota:
+    """Ponta do roteador para o processo de uma partição (uma requisição por vez por partição)."""
+    def __init__(self, fabrica, caminho: str):
+        self._conexao, ponta = multiprocessing.Pipe()
+        self._trava = threading.Lock()
+        self._processo = multiprocessing.Process(target=_servir_particao, args=(ponta, fabrica, caminho),
+                                                 name=f"particao-{os.path.basename(caminho)}", daemon=True)
+        self._processo.start()
+        ponta.close()
+
+    def chamar(self, metodo: str, *args):
+        with self._trava:
+            self._conexao.send((metodo, args))
+            return self._resposta()
+
+    def proximo_id(self) -> int:
+        return self.chamar("proximo_id")
+
+    def encerrar(self) -> None:
+        self._conexao.close()
+        self._processo.join(timeout=5)
+
+    def _resposta(self):
+        ok, valor = self._conexao.recv()
+        if not ok:
+            raise valor
+        return valor
+
+
+def _em_todas(lojas, metodo: str, *args) -> list:
+    """Manda a mesma requisição a todas as partições antes de esperar: elas trabalham em paralelo."""
+    for loja in lojas:
+        loja._trava.acquire()
+    try:
+        for loja in lojas:
+            loja._conexao.send((metodo, args))
+        return [loja._resposta() for loja in lojas]
+    finally:
+        for loja in lojas:
+            loja._trava.release()
+
+
+def _servir_particao(conexao, fabrica, caminho: str) -> None:
+    """Laço do processo de uma partição: executa as requisições do roteador no repositório local."""
+    repo = fabrica(caminho)
+    while True:
+        try:
+            metodo, args = conexao.recv()
+        except (EOFError, OSError):                    # roteador fechou a conexão
+            break
+        try:
+            conexao.send((True, _executar(repo, metodo, args)))
+        except Exception as e:                         # o erro volta para o roteador
+            conexao.send((False, e))
+        if metodo == "fechar":
+            break
+
+
+def _executar(repo, metodo: str, args):
+    if metodo == "carregar":
+        repo.carregar()
+        return [e.to_dict() for e in repo.todos_eventos()]
+    if metodo == "salvar_evento":
+        repo.salvar_evento(evento_from_dict(args[0]))
+        return None
+    if metodo == "operacao":                           # mesma reaplicação do journal
+        op, id_evento, dados = args
+        repo._aplicar_registro(dict(dados, op=op, id=id_evento))
+        evento = repo.buscar_evento(id_evento)
+        if evento is not None:
+            repo.salvar_evento(evento)                 # regravar no próximo snapshot
+            repo.registrar_operacao(op, evento, **dados)
+        return None
+    if metodo == "bytes_gravados":
+        return getattr(repo, "bytes_gravados", 0)
+    if metodo == "proximo_id":
+        return repo.proximo_id()
+    if hasattr(repo, metodo):                          # salvar, compactar, fechar
+        return getattr(repo, metodo)()
+    return None
@@ -1,5 +1,11 @@
+import json, threading  # o registro é compartilhado pelas threads do SistemaEventos; a tabela vai em JSON
+
+
 class Participante:
     """Modelo que representa um participante."""
+    # Sem __dict__ por instância: um evento grande guarda dezenas de milhares destes.
+    __slots__ = ("_nome", "_email")
+
     def __init__(self, nome: str, email: str):
         # Remove espaços extras e converte e-mail para minúsculas.
         self._nome = nome.strip()
@@ -23,4 +29,136 @@ class Participante:
     @classmethod
     def from_dict(cls, d: dict):
         """Cria um objeto Participante a partir de um dicionário."""
-        return cls(d.get("nome", ""), d.get("email", ""))
\ No newline at end of file
+        return cls(d.get("nome", ""), d.get("email", ""))
+
+
+class RegistroParticipantes:
+    """Tabela única de participantes: um objeto Participante por pessoa, com ID compacto.
+
+    Quem se inscreve em vários eventos passa a ser o mesmo objeto (e as mesmas
+    strings de nome e e-mail) em todos eles, em vez de uma cópia por evento. O
+    JsonRepo grava a tabela uma vez no snapshot (``tabela()``) e os eventos citam
+    os participantes pelo ID (posição na tabela).
+
+    A chave é o e-mail normalizado; o raro caso do mesmo e-mail com outro nome
+    ganha uma entrada própria (nenhuma inscrição troca de nome).
+    """
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._lista = []                       # ID -> Participante
+        self._ids = {}                         # e-mail (ou (e-mail, nome) se o nome variar) -> ID
+        self._arquivo = None                   # tabela lida do snapshot ([[nome, e-mail], ...]) durante a carga
+
+    def __len__(self) -> int:
+        return len(self._lista)
+
+    def obter(self, nome: str, email: str) -> Participante:
+        """O Participante compartilhado para (nome, e-mail), criado no primeiro pedido."""
+        return self._lista[self.id_de(nome, email)]
+
+    def existente(self, p: Participante) -> Participante:
+        """A instância compartilhada equivalente a ``p`` se a pessoa já está no registro; senão o próprio ``p``
+        (sem registrar: quem ainda pode ser recusado não entra na tabela)."""
+        i = self._procurar(p.nome, p.email) if p.email else None
+        return self._lista[i] if i is not None else p
+
+    def interno(self, p: Participante) -> Participante:
+        """A instância compartilhada equivalente a ``p`` (o próprio ``p`` se for a primeira)."""
+        if not p.email:                        # linha sem e-mail (será recusada): não entra na tabela
+            return p
+        return self._lista[self._id(p.nome, p.email, p)]
+
+    def id_de(self, nome: str, email: str) -> int:
+        return self._id(nome.strip(), email.strip().lower(), None)
+
+    def id_email(self, email: str) -> int:
+        """ID da pessoa pelo e-mail (check-ins guardam só o e-mail)."""
+        i = self._ids.get(email)
+        return i if i is not None else self.id_de("", email)
+
+    def participante(self, i: int) -> Participante:
+        return self._lista[i]
+
+    def tabela(self) -> list:
+        """[[nome, e-mail], ...] na ordem dos IDs (formato do snapshot)."""
+        return [[p.nome, p.email] for p in list(self._lista)]
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._lista, self._ids = [], {}
+
+    # ---------- leitura do snapshot ----------
+    def ler_tabela(self, tabela) -> None:
+        """Tabela do arquivo; só os participantes citados por algum evento entram no registro
+        (quem cancelou tudo some no próximo snapshot). ``None`` encerra a leitura."""
+        self._arquivo = tabela
+
+    def do_arquivo(self, i: int) -> list:
+        """[nome, e-mail] do ID ``i`` na tabela do arquivo; o Participante só é montado quando
+        o evento é hidratado (``obter``)."""
+        return self._arquivo[i]
+
+    def _id(self, nome: str, email: str, p) -> int:  # nome e e-mail já normalizados
+        i = self._procurar(nome, email)
+        if i is None:
+            with self._trava:
+                i = self._procurar(nome, email)
+                if i is None:
+                    i = len(self._lista)
+                    self._lista.append(p if p is not None else Participante(nome, email))
+                    self._ids[email if email not in self._ids else (email, nome)] = i  # lista antes do dict
+        return i
+
+    def _procurar(self, nome: str, email: str):
+        i = self._ids.get(email)
+        if i is None or self._lista[i].nome == nome:
+            return i
+        return self._ids.get((email, nome))
+
+
+class TabelaSnapshot:
+    """Tabela de participantes do snapshot já codificada, mantida por contagem de referências.
+
+    O JsonRepo informa (``trocar``) os IDs citados por um evento quando o trecho dele
+    muda; só quem passa a ser citado, ou deixa de ser, tem a entrada recodificada, e
+    ``codificar`` só junta as entradas de novo se esse conjunto mudou. Quem ninguém
+    cita sai como ``null`` e a tabela termina no maior ID citado.
+    """
+    def __init__(self, registro: RegistroParticipantes):
+        self._registro = registro
+        self._usos = {}                        # ID -> nº de eventos que o citam
+        self._itens = []                       # ID -> JSON da entrada (b"null" se ninguém cita)
+        self._json = b"[]"                     # última codificação (None: conjunto mudou)
+
+    def trocar(self, antigos, novos) -> None:
+        """Um evento deixou de citar ``antigos`` e passou a citar ``novos`` (conjuntos de IDs)."""
+        for i in antigos:
+            if i not in novos:
+                n = self._usos[i] - 1
+                if n:
+                    self._usos[i] = n
+                else:
+                    del self._usos[i]
+                    self._itens[i] = b"null"
+                    self._json = None
+        for i in novos:
+            if i not in antigos:
+                n = self._usos.get(i, 0)
+                self._usos[i] = n + 1
+                if not n:
+                    if i >= len(self._itens):
+                        self._itens.extend([b"null"] * (i + 1 - len(self._itens)))
+                    p = self._registro.participante(i)
+                    self._itens[i] = json.dumps([p.nome, p.email], ensure_ascii=False).encode("utf-8")
+                    self._json = None
+
+    def codificar(self) -> bytes:
+        """``[[nome, e-mail], null, ...]`` em bytes, no formato do snapshot."""
+        if self._json is None:
+            while self._itens and self._itens[-1] == b"null":  # termina no maior ID citado
+                self._itens.pop()
+            self._json = b"[" + b", ".join(self._itens) + b"]"
+        return self._json
+
+    def limpar(self) -> None:              # o registro foi renumerado (nova carga)
+        self._usos, self._itens, self._json = {}, [], b"[]"
@@ -0,0 +1,341 @@
+"""Rastro de operações: grava cada chamada ao SistemaEventos e reproduz depois.
+
+Gravação (opcional, ``SistemaEventos.ativar_rastro(caminho)``): cada caso de uso
+chamado de fora vira uma linha JSON com o instante (segundos desde o início do
+rastro), método, argumentos, resultado e latência. Chamadas internas (ex.:
+``obter_evento`` dentro de ``inscrever``) não entram. A primeira linha guarda a
+data/hora de início. Resultados que são geradores (``listar_eventos``...) são
+lidos por inteiro para entrar no rastro.
+
+Reprodução, a partir da raiz do projeto::
+
+    python -m rastro reproduzir data/rastro.jsonl [--repo memoria|json] [--base data/events.json]
+                                [--velocidade 1] [--workers 4] [--chave-tokens segredo]
+
+``--velocidade 0`` (padrão) executa o mais rápido possível, ``1`` no ritmo original
+e ``10`` dez vezes mais rápido. ``--base`` parte de uma cópia do snapshot que
+existia quando a gravação começou (sem ela, de um repositório vazio). As datas dos
+argumentos são deslocadas pelos dias passados desde a gravação, para que eventos
+futuros continuem futuros (``--manter-datas`` desliga; relatórios por mês podem
+divergir quando há deslocamento). O relatório traz vazão, p50/p99 por método e as
+respostas que divergiram do que foi gravado.
+
+Com ``--workers N`` as operações de um evento vão sempre para o mesmo worker (a
+ordem por evento é mantida), criações rodam na ordem original e consultas sem
+evento são distribuídas; divergências em consultas globais são esperadas nesse
+modo, pois elas podem ver o catálogo em outro momento.
+"""
+import argparse, functools, json, os, queue, shutil, tempfile, threading, time
+from datetime import date, datetime, timedelta
+from metricas import Histograma
+from participante import Participante
+
+_OPERACOES = ("criar_evento", "listar_eventos", "buscar_eventos", "obter_evento", "inscrever", "inscrever_lote",
+              "cancelar_inscricao", "reservar", "confirmar_reserva", "liberar_reserva", "liberar_reservas_vencidas",
+              "entrar_lista_espera", "lista_espera", "checkin", "token_checkin", "checkin_token",
+              "eventos_do_participante", "cancelar_todas_inscricoes")
+_GLOBAIS = ("cancelar_todas_inscricoes",)      # mexem em vários eventos: esperam os workers esvaziarem
+
+
+# ---------- codificação (argumentos e resultados em JSON) ----------
+def _objeto(v):
+    """``default`` do json.dumps: só os tipos que o JSON não conhece passam por aqui."""
+    if isinstance(v, date):
+        return {"__data__": v.isoformat()}
+    if isinstance(v, Participante):
+        return {"__participante__": [v.nome, v.email]}
+    if hasattr(v, "id") and hasattr(v, "tipo"):         # Evento (e subclasses): vale a identidade
+        return {"__evento__": v.id}
+    if isinstance(v, (set, frozenset)):
+        return sorted(v, key=repr)
+    return repr(v)
+
+
+def _json(v) -> str:
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"), default=_objeto)
+
+
+def _decodificar(v, deslocamento=timedelta(0)):
+    if isinstance(v, list):
+        return [_decodificar(x, deslocamento) for x in v]
+    if isinstance(v, dict):
+        if "__data__" in v:
+            return date.fromisoformat(v["__data__"]) + deslocamento
+        if "__participante__" in v:
+            return Participante(*v["__participante__"])
+        return {k: _decodificar(x, deslocamento) for k, x in v.items()}
+    return v
+
+
+# ---------- gravação ----------
+class GravadorRastro:
+    """Anexa uma linha JSON por chamada a ``caminho`` (várias threads podem gravar ao mesmo tempo)."""
+    def __init__(self, caminho: str):
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        self._trava = threading.Lock()
+        self._local = threading.local()        # .dentro: já há uma chamada gravada em curso nesta thread
+        self._t0 = time.perf_counter()
+        self.n = 0
+        self._escrever({"inicio": datetime.now().isoformat(timespec="seconds"), "versao": 1})
+
+    def registrar(self, metodo: str, inicio: float, segundos: float, args, kwargs, resultado=None, erro=None):
+        linha = {"t": round(inicio - self._t0, 6), "metodo": metodo, "args": args}
+        if kwargs:
+            linha["kwargs"] = kwargs
+        if erro is not None:
+            linha["erro"] = erro
+        else:
+            linha["resultado"] = resultado
+        linha["ms"] = round(1000 * segundos, 3)
+        self._escrever(linha)
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._arquivo.close()
+
+    def _escrever(self, linha: dict) -> None:
+        texto = _json(linha) + "\n"
+        with self._trava:
+            self._arquivo.write(texto)
+            self._arquivo.flush()              # uma queda perde no máximo a linha em curso
+            self.n += 1
+
+
+def _gravado(func, nome, gravador):
+    local = gravador._local
+
+    @functools.wraps(func)
+    def gravado(*args, **kwargs):
+        if getattr(local, "dentro", False):    # chamada interna: só a de fora entra no rastro
+            return func(*args, **kwargs)
+        args = tuple(list(a) if hasattr(a, "__next__") else a for a in args)  # lote vindo de gerador: lido uma vez
+        local.dentro = True
+        t0 = time.perf_counter()
+        try:
+            resultado = func(*args, **kwargs)
+            gerador = hasattr(resultado, "__next__")
+            if gerador:                        # consumido aqui para o rastro (e devolvido como iterador)
+                resultado = list(resultado)
+        except Exception as e:
+            gravador.registrar(nome, t0, time.perf_counter() - t0, args, kwargs, erro=type(e).__name__)
+            raise
+        finally:
+            local.dentro = False
+        gravador.registrar(nome, t0, time.perf_counter() - t0, args, kwargs, resultado)
+        return iter(resultado) if gerador else resultado
+    return gravado
+
+
+def gravar_rastro(sistema, caminho: str) -> GravadorRastro:
+    """Troca os casos de uso do sistema (na instância) por versões que gravam cada chamada."""
+    gravador = GravadorRastro(caminho)
+    for nome in _OPERACOES + tuple(n for n in dir(sistema) if n.startswith("relatorio_")):
+        if hasattr(sistema, nome):
+            setattr(sistema, nome, _gravado(getattr(sistema, nome), nome, gravador))
+    return gravador
+
+
+# ---------- reprodução ----------
+def ler_rastro(caminho: str):
+    """(início da gravação ou None, [registros]) de um arquivo de rastro.
+
+    Um arquivo pode ter várias sessões (o gravador só anexa); o ``t`` de cada sessão
+    é somado ao intervalo desde o início da primeira.
+    """
+    inicio, registros, deslocamento = None, [], 0.0
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                reg = json.loads(linha)
+            except ValueError:                 # linha cortada por queda
+                continue
+            if "metodo" in reg:
+                reg["t"] += deslocamento
+                registros.append(reg)
+            elif "inicio" in reg:              # começo de uma sessão
+                sessao = datetime.fromisoformat(reg["inicio"])
+                if inicio is None:
+                    inicio = sessao
+                deslocamento = max((sessao - inicio).total_seconds(), registros[-1]["t"] if registros else 0.0)
+    return inicio, registros
+
+
+class Reproducao:
+    """Executa registros de rastro num SistemaEventos e compara as respostas com as gravadas."""
+    def __init__(self, sistema, registros, inicio: datetime = None, velocidade: float = 0.0, workers: int = 1):
+        self._sistema = sistema
+        self._registros = registros
+        self._velocidade = velocidade
+        self._workers = max(1, workers)
+        dias = (date.today() - inicio.date()).days if inicio is not None else 0
+        self._deslocamento = timedelta(days=max(0, dias))
+        self._trava = threading.Lock()
+        self._latencias = {}                   # método -> Histograma
+        self._divergentes = {}                 # método -> nº de respostas diferentes da gravada
+        self.exemplos = []                     # primeiras divergências: (nº do registro, método, gravado, obtido)
+        self.segundos = 0.0
+
+    def executar(self) -> dict:
+        t0 = time.perf_counter()
+        if self._workers == 1:
+            for i, reg in enumerate(self._registros):
+                self._esperar_vez(reg, t0)
+                self._rodar(i, reg)
+        else:
+            self._executar_concorrente(t0)
+        self.segundos = time.perf_counter() - t0
+        return self.relatorio()
+
+    def relatorio(self) -> dict:
+        n = sum(h.n for h in self._latencias.values())
+        operacoes = {}
+        for metodo, h in sorted(self._latencias.items()):
+            resumo = h.resumo()
+            operacoes[metodo] = {"n": resumo["n"], "p50_ms": resumo["p50_ms"], "p99_ms": resumo["p99_ms"],
+                                 "divergencias": self._divergentes.get(metodo, 0)}
+        return {"operacoes": n, "segundos": round(self.segundos, 3),
+                "vazao": round(n / self.segundos, 1) if self.segundos else 0.0,
+                "divergencias": sum(self._divergentes.values()), "por_metodo": operacoes}
+
+    # ---------- util ----------
+    def _esperar_vez(self, reg, t0):
+        if self._velocidade > 0:               # ritmo original (1) ou acelerado (> 1)
+            atraso = t0 + reg["t"] / self._velocidade - time.perf_counter()
+            if atraso > 0:
+                time.sleep(atraso)
+
+    def _rodar(self, i: int, reg: dict) -> None:
+        metodo = getattr(self._sistema, reg["metodo"])
+        args = _decodificar(reg.get("args", []), self._deslocamento)
+        kwargs = _decodificar(reg.get("kwargs", {}), self._deslocamento)
+        t = time.perf_counter()
+        try:
+            resultado = metodo(*args, **kwargs)
+            if hasattr(resultado, "__next__"):
+                resultado = list(resultado)
+            obtido = {"resultado": json.loads(_json(resultado))}  # mesma forma do que foi gravado
+        except Exception as e:
+            obtido = {"erro": type(e).__name__}
+        segundos = time.perf_counter() - t
+        gravado = {"erro": reg["erro"]} if "erro" in reg else {"resultado": reg.get("resultado")}
+        with self._trava:
+            h = self._latencias.get(reg["metodo"])
+            if h is None:
+                h = self._latencias[reg["metodo"]] = Histograma()
+            h.registrar(segundos)
+            if obtido != gravado:
+                self._divergentes[reg["metodo"]] = self._divergentes.get(reg["metodo"], 0) + 1
+                if len(self.exemplos) < 20:
+                    self.exemplos.append((i, reg["metodo"], gravado, obtido))
+
+    def _evento_de(self, reg):
+        """ID do evento da operação (None se não for de um evento só)."""
+        args = reg.get("args") or []
+        if reg["metodo"] == "checkin_token" and args:
+            tokens = getattr(self._sistema, "_tokens", None)
+            dados = tokens.verificar(args[0]) if tokens is not None else None
+            return dados[0] if dados else None
+        if reg["metodo"] != "criar_evento" and args and isinstance(args[0], int) and not isinstance(args[0], bool):
+            return args[0]
+        return None
+
+    def _executar_concorrente(self, t0):
+        filas = [queue.Queue() for _ in range(self._workers)]
+
+        def worker(fila):
+            while True:
+                item = fila.get()
+                if item is None:
+                    fila.task_done()
+                    return
+                self._rodar(*item)
+                fila.task_done()
+
+        threads = [threading.Thread(target=worker, args=(f,), daemon=True) for f in filas]
+        for t in threads:
+            t.start()
+        proxima = 0                            # consultas sem evento: distribuídas em rodízio
+        for i, reg in enumerate(self._registros):
+            self._esperar_vez(reg, t0)
+            id_evento = self._evento_de(reg)
+            if reg["metodo"] == "criar_evento":
+                self._rodar(i, reg)            # aqui mesmo: os IDs saem na ordem gravada
+            elif reg["metodo"] in _GLOBAIS:
+                for f in filas:                # tudo o que veio antes termina primeiro
+                    f.join()
+                self._rodar(i, reg)
+            elif id_evento is not None:
+                filas[hash(id_evento) % len(filas)].put((i, reg))
+            else:
+                filas[proxima].put((i, reg))
+                proxima = (proxima + 1) % len(filas)
+        for f in filas:
+            f.put(None)
+        for t in threads:
+            t.join()
+
+
+def _montar_sistema(repo: str, base: str, pasta: str, chave_tokens):
+    from sistemas_evento import SistemaEventos
+    from json_repo import JsonRepo
+    if repo == "json":
+        caminho = os.path.join(pasta, "events.json")
+        if base:
+            shutil.copyfile(base, caminho)
+        r = JsonRepo(caminho, journal=True, limite_journal=10 ** 9)
+    else:
+        from memory_repo import MemoryRepo
+        r = MemoryRepo()
+        if base:                               # o snapshot de partida, lido pelo JsonRepo
+            origem = JsonRepo(base)
+            origem.carregar()
+            for e in origem.todos_eventos():
+                r.salvar_evento(e)
+    sistema = SistemaEventos(r, chave_tokens=chave_tokens)
+    sistema.carregar()
+    return sistema
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Reproduz um rastro de operações do sistema de eventos")
+    sub = ap.add_subparsers(dest="comando", required=True)
+    rep = sub.add_parser("reproduzir", help="executa o rastro num repositório novo e compara as respostas")
+    rep.add_argument("rastro")
+    rep.add_argument("--repo", choices=("memoria", "json"), default="memoria")
+    rep.add_argument("--base", help="snapshot JSON de partida (o estado de quando a gravação começou)")
+    rep.add_argument("--velocidade", type=float, default=0.0, help="0 = sem esperas, 1 = ritmo original, 10 = 10x")
+    rep.add_argument("--workers", type=int, default=1, help="threads executando ao mesmo tempo")
+    rep.add_argument("--chave-tokens", default=os.environ.get("EVENTOS_CHAVE_TOKENS"),
+                     help="a mesma chave da gravação (tokens de check-in)")
+    rep.add_argument("--manter-datas", action="store_true", help="não desloca as datas dos argumentos")
+    rep.add_argument("--mostrar", type=int, default=5, help="divergências exibidas")
+    args = ap.parse_args()
+
+    inicio, registros = ler_rastro(args.rastro)
+    if args.manter_datas:
+        inicio = None
+    with tempfile.TemporaryDirectory(prefix="rastro-") as pasta:
+        sistema = _montar_sistema(args.repo, args.base, pasta, args.chave_tokens)
+        reproducao = Reproducao(sistema, registros, inicio, args.velocidade, args.workers)
+        r = reproducao.executar()
+        if hasattr(sistema._repo, "fechar"):
+            sistema._repo.fechar()
+    print(f"{r['operacoes']} operações em {r['segundos']:.2f}s ({r['vazao']:,.0f} ops/s, "
+          f"{args.workers} worker(s), velocidade {args.velocidade:g})")
+    print(f"{'método':<32} {'n':>7} {'p50 ms':>9} {'p99 ms':>9} {'diverg.':>8}")
+    for metodo, m in r["por_metodo"].items():
+        print(f"{metodo:<32} {m['n']:>7} {m['p50_ms']:>9.3f} {m['p99_ms']:>9.3f} {m['divergencias']:>8}")
+    print(f"divergências: {r['divergencias']}")
+    for i, metodo, gravado, obtido in reproducao.exemplos[:args.mostrar]:
+        print(f"  #{i} {metodo}: gravado {_curto(gravado)} | obtido {_curto(obtido)}")
+
+
+def _curto(valor, limite: int = 120) -> str:
+    texto = json.dumps(valor, ensure_ascii=False)
+    return texto if len(texto) <= limite else texto[:limite - 3] + "..."
+
+
+if __name__ == "__main__":
+    main()
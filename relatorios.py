@@ -0,0 +1,107 @@
+import threading                              # o motor é atualizado por várias threads
+
+
+def _novo_agregado() -> dict:
+    return {"eventos": 0, "capacidade": 0, "inscritos": 0, "checkins": 0, "receita": 0}  # receita em centavos
+
+
+def _com_taxas(a: dict) -> dict:
+    """Cópia do agregado com ocupação (inscritos/capacidade) e taxa de check-in (checkins/inscritos)."""
+    r = dict(a)
+    r["receita"] = a["receita"] / 100                # centavos -> reais (somas inteiras não acumulam erro)
+    r["ocupacao"] = a["inscritos"] / a["capacidade"] if a["capacidade"] else 0.0
+    r["taxa_checkin"] = a["checkins"] / a["inscritos"] if a["inscritos"] else 0.0
+    return r
+
+
+def _contribuicao(evento) -> tuple:
+    return (evento.categoria, evento.data_evento.strftime("%Y-%m"), evento.capacidade_max,
+            evento.total_inscritos(), evento.total_checkins(), round(evento.receita_total() * 100))
+
+
+class MotorRelatorios:
+    """Relatórios mantidos de forma incremental.
+
+    Em vez de varrer todos os eventos a cada consulta, o SistemaEventos chama
+    ``atualizar(evento)`` depois de cada criação/inscrição/cancelamento/check-in; o
+    motor troca a contribuição antiga do evento pela nova (O(1)). Mantém o conjunto
+    de eventos com vagas e receita/ocupação/check-ins por evento, categoria e mês.
+
+    Eventos encerrados do arquivo frio entram depois, com ``incluir_historico``: só
+    nos agregados (nunca em "com vagas") e só quando um relatório de histórico pede.
+    """
+    def __init__(self, eventos=()):
+        self._trava = threading.Lock()
+        self._por_evento = {}                   # id -> (categoria, mes, capacidade, inscritos, checkins, receita)
+        self._com_vagas = set()                 # IDs de eventos com vagas
+        self._por_categoria = {}                # categoria -> agregado
+        self._por_mes = {}                      # "AAAA-MM" -> agregado
+        self._total = _novo_agregado()
+        self.historico = False                  # arquivo frio já somado?
+        for e in eventos:
+            self.atualizar(e)
+
+    def atualizar(self, evento) -> None:
+        """Recalcula a contribuição de um evento (novo ou alterado) em O(1)."""
+        novo = _contribuicao(evento)
+        with self._trava:
+            antigo = self._por_evento.get(evento.id)
+            if antigo is not None:
+                self._aplicar(antigo, -1)
+            self._aplicar(novo, +1)
+            self._por_evento[evento.id] = novo
+            if evento.vagas_disponiveis > 0:
+                self._com_vagas.add(evento.id)
+            else:
+                self._com_vagas.discard(evento.id)
+
+    def incluir_historico(self, eventos) -> None:
+        """Soma eventos arquivados aos agregados; quem o motor já conhece (voltou à memória) fica como está."""
+        for evento in eventos:
+            novo = _contribuicao(evento)
+            with self._trava:
+                if evento.id not in self._por_evento:
+                    self._aplicar(novo, +1)
+                    self._por_evento[evento.id] = novo
+        self.historico = True
+
+    # ---------- consultas ----------
+    def ids_com_vagas(self) -> list:
+        """IDs dos eventos com vagas, em ordem crescente (custo proporcional ao resultado)."""
+        with self._trava:
+            return sorted(self._com_vagas)
+
+    def do_evento(self, id_evento: int):
+        """Agregado de um evento (ou None se o motor não o conhece)."""
+        with self._trava:
+            t = self._por_evento.get(id_evento)
+        if t is None:
+            return None
+        categoria, mes, capacidade, inscritos, checkins, receita = t
+        return _com_taxas({"eventos": 1, "capacidade": capacidade, "inscritos": inscritos,
+                           "checkins": checkins, "receita": receita})
+
+    def por_categoria(self) -> dict:
+        with self._trava:
+            return {k: _com_taxas(v) for k, v in sorted(self._por_categoria.items())}
+
+    def por_mes(self) -> dict:
+        with self._trava:
+            return {k: _com_taxas(v) for k, v in sorted(self._por_mes.items())}
+
+    def total(self) -> dict:
+        with self._trava:
+            return _com_taxas(self._total)
+
+    # ---------- util ----------
+    def _aplicar(self, t, sinal: int) -> None:
+        categoria, mes, capacidade, inscritos, checkins, receita = t
+        for tabela, chave in ((self._por_categoria, categoria), (self._por_mes, mes), (None, None)):
+            a = self._total if tabela is None else tabela.setdefault(chave, _novo_agregado())
+            a["eventos"] += sinal
+            a["capacidade"] += sinal * capacidade
+            a["inscritos"] += sinal * inscritos
+            a["checkins"] += sinal * checkins
+            a["receita"] += sinal * receita
+            if tabela is not None and a["eventos"] == 0:
+                del tabela[chave]               # grupo ficou vazio
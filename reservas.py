@@ -0,0 +1,56 @@
+import heapq, threading, time  # heap de vencimentos + thread de varredura opcional
+
+
+class VarredorReservas:
+    """Vencimentos das reservas temporárias num heap ``(expira_em, id do evento, e-mail)``.
+
+    ``vencidas()`` só retira do topo o que já venceu: o custo é proporcional ao que
+    expira, não ao total de reservas. Reservas confirmadas ou liberadas antes do
+    prazo não são procuradas no heap; a entrada fica lá e, quando vence, o evento
+    não a reconhece mais (o ``expira_em`` não confere) e ela é descartada
+    (remoção preguiçosa, como na ListaEspera).
+    """
+    def __init__(self, relogio=time.monotonic):
+        self.relogio = relogio                 # injetável (testes e simulação usam relógio virtual)
+        self._heap = []
+        self._trava = threading.Lock()
+        self._parar = None                     # Event da thread de varredura
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def agendar(self, id_evento: int, email: str, expira_em: float) -> None:
+        with self._trava:
+            heapq.heappush(self._heap, (expira_em, id_evento, email))
+
+    def proximo_vencimento(self):
+        """Instante do próximo vencimento (ou None): consultar é O(1)."""
+        with self._trava:
+            return self._heap[0][0] if self._heap else None
+
+    def vencidas(self, agora: float = None) -> list:
+        """Retira e devolve [(expira_em, id do evento, e-mail)] vencidas até ``agora``."""
+        agora = self.relogio() if agora is None else agora
+        saida = []
+        with self._trava:
+            heap = self._heap
+            while heap and heap[0][0] <= agora:
+                saida.append(heapq.heappop(heap))
+        return saida
+
+    # ---------- varredura periódica (opcional) ----------
+    def iniciar(self, liberar, intervalo: float = 1.0) -> None:
+        """Chama ``liberar()`` a cada ``intervalo`` segundos numa thread daemon."""
+        self.parar()
+        self._parar = parar = threading.Event()
+
+        def laco():
+            while not parar.wait(intervalo):
+                liberar()
+
+        threading.Thread(target=laco, name="varredor-reservas", daemon=True).start()
+
+    def parar(self) -> None:
+        if self._parar is not None:
+            self._parar.set()
+            self._parar = None
@@ -0,0 +1,323 @@
+import argparse, asyncio, json, os             # servidor HTTP/JSON só com a biblioteca padrão
+from concurrent.futures import ThreadPoolExecutor  # chamadas ao sistema (e o I/O de persistência) fora do loop
+from datetime import date                      # datas chegam em ISO (AAAA-MM-DD)
+from urllib.parse import parse_qs, unquote, urlsplit  # e-mail vem no caminho em DELETE; cursor na query
+from participante import Participante          # corpo de inscrição -> Participante
+
+_MOTIVOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+_MAX_CORPO = 1024 * 1024                       # 1 MiB por requisição
+_SUBROTAS = {"inscricoes": 2, "lista-espera": 1, "reservas": 2, "checkins": 1,  # /eventos/{id}/<nome>[/<e-mail>]:
+             "total-inscritos": 1, "receita": 1}                                # nº máximo de partes
+
+
+class ErroHttp(Exception):
+    """Erro que vira resposta HTTP (status + mensagem)."""
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def evento_json(e) -> dict:
+    """Campos públicos de um evento (sem a lista de inscritos)."""
+    d = {"id": e.id, "tipo": e.tipo, "nome": e.nome, "data_evento": e.data_evento.isoformat(),
+         "local": e.local, "capacidade_max": e.capacidade_max, "categoria": e.categoria,
+         "preco": float(e.preco), "vagas": e.vagas_disponiveis, "inscritos": e.total_inscritos()}
+    if e.tipo == "workshop":
+        d["material_necessario"] = e.material_necessario
+    elif e.tipo == "palestra":
+        d["palestrante"] = e.palestrante
+    return d
+
+
+class ServidorEventos:
+    """Front-end HTTP/JSON (asyncio) para o SistemaEventos.
+
+    O loop só faz parsing e roteamento; cada chamada ao sistema roda num pool de
+    threads, então a gravação do journal/SQLite de um cliente não bloqueia os demais
+    (o SistemaEventos já é seguro para várias threads).
+
+    Operações que alteram dados aceitam o cabeçalho ``Idempotency-Key``: uma
+    repetição com a mesma chave recebe a resposta original.
+
+    Rotas:
+        GET    /eventos[?after=ID&limit=N]       listar_eventos (com limit: página + "proximo")
+        POST   /eventos                          criar_evento
+        POST   /eventos/{id}/inscricoes          inscrever        {"nome", "email"}
+        DELETE /eventos/{id}/inscricoes/{email}  cancelar_inscricao
+        POST   /eventos/{id}/checkins            checkin          {"email"}
+        POST   /checkins                         checkin_token    {"token"}
+        POST   /eventos/{id}/lista-espera        entrar_lista_espera {"nome", "email"}
+        POST   /eventos/{id}/reservas            reservar         {"email", "ttl"?}
+        POST   /eventos/{id}/reservas/{email}    confirmar_reserva {"nome"}
+        DELETE /eventos/{id}/reservas/{email}    liberar_reserva
+        GET    /eventos/{id}/total-inscritos     relatorio_total_inscritos
+        GET    /eventos/{id}/receita             relatorio_receita_evento
+        GET    /relatorios/eventos-com-vagas     relatorio_eventos_com_vagas
+    """
+    def __init__(self, sistema, host: str = "127.0.0.1", porta: int = 8080, workers: int = 32):
+        self._sistema = sistema
+        self._host = host
+        self._porta = porta
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sistema")
+        self._servidor = None
+
+    @property
+    def porta(self) -> int:
+        """Porta efetiva (útil quando criado com porta=0)."""
+        return self._servidor.sockets[0].getsockname()[1] if self._servidor else self._porta
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self._host, self._porta)
+        return self._servidor
+
+    async def encerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._pool.shutdown(wait=True)
+
+    # ---------- conexão ----------
+    async def _atender(self, reader, writer):
+        try:
+            while True:                                  # keep-alive: várias requisições por conexão
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(writer, 400, {"ok": False, "mensagem": "Requisição inválida."}, False)
+                    break
+                cabecalhos = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = h.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                manter = (cabecalhos.get("connection", "").lower() != "close"
+                          and versao.upper() != "HTTP/1.0")
+                lido = False
+                try:
+                    corpo = await self._le_corpo(reader, metodo, cabecalhos)
+                    lido = True
+                    status, resposta = await self._despachar(metodo.upper(), alvo, corpo,
+                                                             cabecalhos.get("idempotency-key"))
+                except ErroHttp as e:
+                    status, resposta = e.status, {"ok": False, "mensagem": str(e)}
+                    manter = manter and lido           # corpo não consumido: o fluxo perdeu o alinhamento
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:                        # falha inesperada: responde 500 em vez de derrubar a conexão
+                    status, resposta = 500, {"ok": False, "mensagem": "Erro interno do servidor."}
+                await self._responder(writer, status, resposta, manter)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _le_corpo(self, reader, metodo, cabecalhos):
+        tamanho = cabecalhos.get("content-length")
+        if tamanho is None:
+            if metodo.upper() == "POST":
+                raise ErroHttp(411, "Content-Length obrigatório.")
+            return None
+        try:
+            n = int(tamanho)
+        except ValueError:
+            raise ErroHttp(400, "Content-Length inválido.") from None
+        if n < 0:
+            raise ErroHttp(400, "Content-Length inválido.")
+        if n > _MAX_CORPO:
+            raise ErroHttp(413, "Corpo grande demais.")
+        bruto = await reader.readexactly(n) if n else b""
+        if not bruto:
+            return {}
+        try:
+            return json.loads(bruto)
+        except ValueError:
+            raise ErroHttp(400, "JSON inválido.")
+
+    async def _responder(self, writer, status, obj, manter):
+        corpo = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        writer.write((f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+                      "Content-Type: application/json; charset=utf-8\r\n"
+                      f"Content-Length: {len(corpo)}\r\n"
+                      f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n").encode("latin-1") + corpo)
+        await writer.drain()
+
+    # ---------- roteamento ----------
+    async def _chamar(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: func(*args, **kwargs))
+
+    async def _alterar(self, chave, func, *args, **kwargs):  # operação que altera dados: repassa a chave
+        return await self._chamar(func, *args, chave_idempotencia=chave or None, **kwargs)
+
+    async def _despachar(self, metodo, alvo, corpo, chave=None):
+        url = urlsplit(alvo)
+        partes = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        s = self._sistema
+        if partes == ["eventos"]:
+            if metodo == "GET":
+                after_id, limit = self._cursor(parse_qs(url.query))
+                eventos = await self._chamar(lambda: [evento_json(e) for e in s.listar_eventos(after_id, limit)])
+                resposta = {"ok": True, "resultado": eventos}
+                if limit is not None:                    # próxima página: ?after=<proximo>
+                    resposta["proximo"] = eventos[-1]["id"] if len(eventos) == limit else None
+                return 200, resposta
+            if metodo == "POST":
+                return self._tupla(await self._alterar(chave, s.criar_evento, **self._dados_evento(corpo)), 201)
+        elif partes == ["checkins"]:
+            if metodo == "POST":
+                return self._tupla(await self._alterar(chave, s.checkin_token, self._campo(corpo, "token")))
+        elif partes == ["relatorios", "eventos-com-vagas"]:
+            if metodo == "GET":
+                eventos = await self._chamar(lambda: [evento_json(e) for e in s.relatorio_eventos_com_vagas()])
+                return 200, {"ok": True, "resultado": eventos}
+        elif len(partes) >= 3 and partes[0] == "eventos":
+            id_evento = self._id(partes[1])
+            rota = partes[2:]
+            if rota == ["inscricoes"] and metodo == "POST":
+                p = Participante(self._campo(corpo, "nome"), self._campo(corpo, "email"))
+                return await self._com_token(self._tupla(await self._alterar(chave, s.inscrever, id_evento, p), 201),
+                                             id_evento, p.email)
+            if len(rota) == 2 and rota[0] == "inscricoes" and metodo == "DELETE":
+                return self._tupla(await self._alterar(chave, s.cancelar_inscricao, id_evento, rota[1]))
+            if rota == ["lista-espera"] and metodo == "POST":
+                p = Participante(self._campo(corpo, "nome"), self._campo(corpo, "email"))
+                return self._tupla(await self._alterar(chave, s.entrar_lista_espera, id_evento, p), 201)
+            if rota == ["reservas"] and metodo == "POST":
+                try:
+                    ttl = float(corpo.get("ttl", 600)) if isinstance(corpo, dict) else 600.0
+                except (TypeError, ValueError):
+                    raise ErroHttp(400, "ttl inválido.")
+                if not 0 < ttl <= 3600:
+                    raise ErroHttp(400, "ttl deve estar entre 0 e 3600 segundos.")
+                return self._tupla(await self._alterar(chave, s.reservar, id_evento, self._campo(corpo, "email"), ttl), 201)
+            if len(rota) == 2 and rota[0] == "reservas" and metodo == "POST":
+                p = Participante(self._campo(corpo, "nome"), rota[1])
+                return await self._com_token(self._tupla(await self._alterar(chave, s.confirmar_reserva, id_evento, p),
+                                                         201), id_evento, p.email)
+            if len(rota) == 2 and rota[0] == "reservas" and metodo == "DELETE":
+                return self._tupla(await self._alterar(chave, s.liberar_reserva, id_evento, rota[1]))
+            if rota == ["checkins"] and metodo == "POST":
+                return self._tupla(await self._alterar(chave, s.checkin, id_evento, self._campo(corpo, "email")))
+            if rota == ["total-inscritos"] and metodo == "GET":
+                return self._tupla(await self._chamar(s.relatorio_total_inscritos, id_evento), resultado=True)
+            if rota == ["receita"] and metodo == "GET":
+                return self._tupla(await self._chamar(s.relatorio_receita_evento, id_evento), resultado=True)
+            if rota[0] not in _SUBROTAS or len(rota) > _SUBROTAS[rota[0]]:  # caminho desconhecido (não só o método)
+                raise ErroHttp(404, "Rota não encontrada.")
+        else:
+            raise ErroHttp(404, "Rota não encontrada.")
+        raise ErroHttp(405, "Método não permitido para esta rota.")
+
+    async def _com_token(self, resposta, id_evento, email):
+        """Inscrição aceita com tokens ligados: o token de check-in vai no campo "token"."""
+        status, corpo = resposta
+        if corpo["ok"]:
+            ok, token = await self._chamar(self._sistema.token_checkin, id_evento, email)
+            if ok:
+                corpo["token"] = token
+        return status, corpo
+
+    @staticmethod
+    def _tupla(res, status_ok=200, resultado=False):
+        """Converte o (ok, msg) do SistemaEventos em (status, corpo JSON)."""
+        ok, valor = res
+        if not ok:
+            return (404 if valor == "Evento não encontrado." else 400), {"ok": False, "mensagem": valor}
+        return status_ok, {"ok": True, ("resultado" if resultado else "mensagem"): valor}
+
+    @staticmethod
+    def _id(texto):
+        try:
+            return int(texto)
+        except ValueError:
+            raise ErroHttp(400, "ID de evento inválido.")
+
+    @staticmethod
+    def _cursor(query):
+        try:
+            after_id = int(query["after"][0]) if "after" in query else None
+            limit = int(query["limit"][0]) if "limit" in query else None
+        except ValueError:
+            raise ErroHttp(400, "Parâmetros after/limit inválidos.")
+        if limit is not None and not 1 <= limit <= 1000:
+            raise ErroHttp(400, "limit deve estar entre 1 e 1000.")
+        return after_id, limit
+
+    @staticmethod
+    def _campo(corpo, nome):
+        if not isinstance(corpo, dict) or not str(corpo.get(nome, "")).strip():
+            raise ErroHttp(400, f"Campo '{nome}' obrigatório.")
+        return str(corpo[nome])
+
+    @classmethod
+    def _dados_evento(cls, corpo):
+        try:
+            dados = {"nome": cls._campo(corpo, "nome"),
+                     "data_evento": date.fromisoformat(cls._campo(corpo, "data_evento")),
+                     "local": cls._campo(corpo, "local"),
+                     "capacidade_max": int(corpo.get("capacidade_max", 0)),
+                     "categoria": cls._campo(corpo, "categoria"),
+                     "preco": float(corpo.get("preco", 0.0)),
+                     "tipo": str(corpo.get("tipo", "evento"))}
+        except (TypeError, ValueError):                # ex.: capacidade null ou preço em lista
+            raise ErroHttp(400, "Data, capacidade ou preço inválidos.")
+        for extra in ("material_necessario", "palestrante"):
+            if extra in corpo:
+                dados[extra] = str(corpo[extra])
+        return dados
+
+
+async def _servir(sistema, host, porta):
+    servidor = ServidorEventos(sistema, host, porta)
+    srv = await servidor.iniciar()
+    print(f"Servindo em http://{host}:{servidor.porta} (Ctrl+C para sair)")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        await servidor.encerrar()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor HTTP/JSON do sistema de eventos")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--porta", type=int, default=8080)
+    ap.add_argument("--arquivo", default="data/events.json", help="arquivo JSON (journal ligado)")
+    ap.add_argument("--pasta-arquivo", default="data/arquivo",
+                    help="eventos encerrados há mais de --carencia dias saem da memória para cá (gzip por mês)")
+    ap.add_argument("--carencia", type=int, default=30, help="dias após o evento antes de arquivá-lo")
+    ap.add_argument("--metricas", help="liga as métricas e anexa um retrato por minuto a este arquivo")
+    ap.add_argument("--rastro", help="grava cada operação neste arquivo JSONL (reproduzível com python -m rastro)")
+    ap.add_argument("--chave-tokens", default=os.environ.get("EVENTOS_CHAVE_TOKENS"),
+                    help="liga os tokens de check-in assinados (padrão: EVENTOS_CHAVE_TOKENS)")
+    args = ap.parse_args()
+
+    from json_repo import JsonRepo
+    from sistemas_evento import SistemaEventos
+    repo = JsonRepo(args.arquivo, journal=True, pasta_arquivo=args.pasta_arquivo, carencia_dias=args.carencia)
+    sistema = SistemaEventos(repo=repo, chave_tokens=args.chave_tokens)
+    if args.metricas:
+        sistema.ativar_metricas().iniciar_dump(args.metricas, intervalo=60)
+    if args.rastro:
+        sistema.ativar_rastro(args.rastro)
+    sistema.carregar()
+    sistema.iniciar_varredura_reservas(intervalo=1.0)    # reservas vencidas voltam a ser vagas
+    try:
+        asyncio.run(_servir(sistema, args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nSaindo...")
+    finally:
+        sistema.salvar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,46 @@
+import threading  # travas por evento (vários quiosques no mesmo processo)
+from itertools import chain, islice  # histórico arquivado nos relatórios; limite da página sem cursor
 from datetime import date  # usado para validar data >= hoje
 from evento import Evento  # classe base
-from participante import Participante  # participante
+from participante import Participante, RegistroParticipantes  # participante + tabela compartilhada
 from workshop import Workshop  # subclasse Workshop
 from palestra import Palestra  # subclasse Palestra
+from relatorios import MotorRelatorios  # agregados mantidos a cada operação
+from indices import IndiceParticipantes  # índice invertido e-mail -> eventos
+from reservas import VarredorReservas  # vencimento das reservas temporárias (heap)
+from idempotencia import CacheIdempotencia, idempotente  # respostas de chamadas repetidas (chave_idempotencia)
 
 class SistemaEventos:
-    """Regras de negócio + criação polimórfica de eventos (Evento/Workshop/Palestra)."""
-    def __init__(self, repo):                 # recebe repositório (memória/JSON)
+    """Regras de negócio + criação polimórfica de eventos (Evento/Workshop/Palestra).
+
+    Seguro para várias threads: operações sobre um evento rodam sob a trava do
+    evento (lock striping: ``n_travas`` travas indexadas pelo ID), de modo que
+    eventos diferentes não disputam a mesma trava na maior parte do tempo.
+
+    Os métodos que alteram dados (marcados com ``@idempotente``) aceitam
+    ``chave_idempotencia``: repetir a chamada com a mesma chave devolve o
+    ``(ok, msg)`` original guardado em ``self.idempotencia``.
+    """
+    def __init__(self, repo, n_travas: int = 64, chave_tokens=None):  # recebe repositório (memória/JSON)
         self._repo = repo
+        self._travas = [threading.Lock() for _ in range(n_travas)]  # faixas de travas por evento
+        self._relatorios = None                # MotorRelatorios, montado na primeira consulta
+        self._trava_relatorios = threading.Lock()  # evita montar o motor/índices duas vezes
+        self._participantes = None             # IndiceParticipantes, montado no primeiro uso
+        registro = getattr(repo, "participantes", None)  # JsonRepo/BinRepo: a mesma tabela do snapshot
+        self._registro = registro if registro is not None else RegistroParticipantes()  # um objeto por pessoa
+        self._colunas = None                   # ColunasEventos (analitico), montado no primeiro relatório cruzado
+        self._reservas = VarredorReservas()    # reservas com prazo (só em memória: caem se o processo parar)
+        self.idempotencia = CacheIdempotencia()  # respostas por chave de idempotência (LRU + prazo)
+        self.metricas = None                   # Metricas (opcional): só existe depois de ativar_metricas()
+        self.rastro = None                     # GravadorRastro (opcional): só existe depois de ativar_rastro()
+        self._tokens = None                    # EmissorTokens (opcional): tokens de check-in assinados
+        if chave_tokens:
+            from tokens import EmissorTokens                     # importa só quem usa
+            self._tokens = EmissorTokens(chave_tokens)
 
     # ---------- criação de evento (agora com tipo) ----------
+    @idempotente
     def criar_evento(self, nome, data_evento, local, capacidade_max, categoria, preco,
                      tipo: str = "evento", **extras):  # tipo define a subclasse; extras guarda campos específicos
         if data_evento < date.today():                 # valida data
@@ -28,42 +59,192 @@ class SistemaEventos:
         else:                                          # caso contrário, evento genérico
             evento = Evento(novo_id, nome, data_evento, local, capacidade_max, categoria, preco)  # cria Evento
 
-        self._repo.salvar_evento(evento)               # persiste no repositório
+        with self._trava(novo_id):                     # "criar" vai para o journal antes de qualquer inscrição
+            self._repo.salvar_evento(evento)           # persiste no repositório
+            self._registrar("criar", evento)           # registra no journal (se houver)
+            self._atualizar_relatorios(evento)         # entra nos agregados
         return True, f"Evento cadastrado com sucesso! ID: {evento.id}"  # mensagem de sucesso
 
     # ---------- demais casos de uso (inalterados) ----------
-    def listar_eventos(self):                          # retorna todos os eventos
-        return self._repo.todos_eventos()
+    def listar_eventos(self, after_id=None, limit=None):  # gera os eventos em ordem de ID (cursor opcional)
+        if hasattr(self._repo, "iter_eventos"):        # repositório com cursor: sem copiar o catálogo
+            return self._repo.iter_eventos(after_id, limit)
+        eventos = (e for e in sorted(self._repo.todos_eventos(), key=lambda e: e.id)
+                   if after_id is None or e.id > after_id)
+        return eventos if limit is None else islice(eventos, limit)
+
+    def buscar_eventos(self, **filtros):               # busca por categoria/local/tipo/data/preço
+        if hasattr(self._repo, "buscar_eventos"):      # repositório com índices
+            return self._repo.buscar_eventos(**filtros)
+        from indices import IndiceEventos              # repositório sem índices: indexa na hora
+        eventos = {e.id: e for e in self._repo.todos_eventos()}
+        return (eventos[i] for i in IndiceEventos(eventos.values()).buscar(**filtros))
 
     def obter_evento(self, id_evento):                 # busca evento por ID
         return self._repo.buscar_evento(id_evento)
 
+    @idempotente
     def inscrever(self, id_evento, participante: Participante):  # inscreve alguém
-        evento = self.obter_evento(id_evento)                    # busca evento
-        if not evento:                                           # valida existência
-            return False, "Evento não encontrado."               # erro
-        ok, msg = evento.inscrever(participante)                 # chama regra do evento
-        if ok:                                                   # se deu certo
-            self._repo.salvar_evento(evento)                     # regrava (no JSON é importante)
-        return ok, msg                                           # repassa resultado
+        self._varrer_reservas()                                  # vagas de reservas vencidas voltam antes
+        with self._trava(id_evento):                             # checar vagas + inscrever é atômico
+            evento = self.obter_evento(id_evento)                # busca evento
+            if not evento:                                       # valida existência
+                return False, "Evento não encontrado."           # erro
+            return self._inscrever(evento, participante)         # repassa resultado
+
+    @idempotente
+    def inscrever_lote(self, id_evento, participantes):          # inscreve um lote com uma única gravação
+        self._varrer_reservas()
+        with self._trava(id_evento):                             # o lote inteiro sob a trava do evento
+            evento = self.obter_evento(id_evento)                # busca evento
+            if not evento:                                       # valida existência
+                return False, "Evento não encontrado."           # erro
+            resultados = evento.inscrever_lote(self._registro.existente(p) for p in participantes)  # valida o lote todo
+            aceitos = [self._registro.interno(p).to_dict() for p, ok, _ in resultados if ok]  # só os aceitos entram na tabela
+            if aceitos:                                          # uma gravação por lote, não por pessoa
+                self._registrar("inscrever_lote", evento, participantes=aceitos)
+                self._repo.salvar_evento(evento)
+                self._atualizar_relatorios(evento)
+                if self._participantes is not None:              # índice e-mail -> eventos
+                    for p in aceitos:
+                        self._participantes.inscrever(p["email"], evento.id)
+        return True, [(i, p.email, ok, msg) for i, (p, ok, msg) in enumerate(resultados, start=1)]  # relatório
+
+    def importar_csv(self, id_evento, caminho: str):             # inscrições a partir de planilha CSV
+        from importacao import ler_participantes_csv             # importa aqui (só quem importa CSV precisa)
+        return self.inscrever_lote(id_evento, ler_participantes_csv(caminho))  # lê linha a linha
 
+    @idempotente
     def cancelar_inscricao(self, id_evento: int, email: str):    # cancela inscrição por e-mail
-        evento = self.obter_evento(id_evento)                    # busca evento
-        if not evento:                                           # valida existência
-            return False, "Evento não encontrado."               # erro
-        ok, msg = evento.cancelar_inscricao(email)               # executa no evento
-        if ok:                                                   # se deu certo
-            self._repo.salvar_evento(evento)                     # regrava
-        return ok, msg                                           # repassa
+        with self._trava(id_evento):                             # exclusão mútua por evento
+            evento = self.obter_evento(id_evento)                # busca evento
+            if not evento:                                       # valida existência
+                return False, "Evento não encontrado."           # erro
+            ok, msg = evento.cancelar_inscricao(email)           # executa no evento
+            if ok:                                               # se deu certo
+                self._registrar("cancelar", evento, email=email.strip().lower())
+                self._repo.salvar_evento(evento)                 # regrava
+                if self._participantes is not None:              # índice e-mail -> eventos
+                    self._participantes.cancelar(email.strip().lower(), evento.id)
+                msg += self._vaga_liberada(evento)               # vaga liberada vai para o próximo da fila
+            return ok, msg                                       # repassa
 
+    # ---------- reservas temporárias (vaga segura durante o pagamento) ----------
+    @idempotente
+    def reservar(self, id_evento: int, email: str, ttl: float = 600.0):  # segura uma vaga por ttl segundos
+        self._varrer_reservas()
+        with self._trava(id_evento):
+            evento = self.obter_evento(id_evento)
+            if not evento:
+                return False, "Evento não encontrado."
+            expira_em = self._reservas.relogio() + ttl
+            ok, msg = evento.reservar(email, expira_em)
+            if ok:
+                self._reservas.agendar(evento.id, email.strip().lower(), expira_em)
+                self._atualizar_relatorios(evento)               # a vaga some de "eventos com vagas"
+                msg += f" Confirme em até {ttl:g} s."
+            return ok, msg
+
+    @idempotente
+    def confirmar_reserva(self, id_evento: int, participante: Participante):  # reserva -> inscrição
+        self._varrer_reservas()                                  # reserva vencida não pode ser confirmada
+        with self._trava(id_evento):
+            evento = self.obter_evento(id_evento)
+            if not evento:
+                return False, "Evento não encontrado."
+            if evento.reserva_de(participante.email) is None:
+                return False, "Reserva não encontrada ou expirada."
+            return self._inscrever(evento, participante)         # usa a vaga reservada
+
+    @idempotente
+    def liberar_reserva(self, id_evento: int, email: str):       # desistência antes do prazo
+        with self._trava(id_evento):
+            evento = self.obter_evento(id_evento)
+            if not evento:
+                return False, "Evento não encontrado."
+            if not evento.liberar_reserva(email):
+                return False, "Reserva não encontrada ou expirada."
+            return True, "Reserva liberada." + self._vaga_liberada(evento)
+
+    def liberar_reservas_vencidas(self) -> int:                  # devolve as vagas de reservas vencidas
+        liberadas = 0
+        for expira_em, id_evento, email in self._reservas.vencidas():  # só o que venceu (topo do heap)
+            with self._trava(id_evento):
+                evento = self.obter_evento(id_evento)
+                if evento is not None and evento.liberar_reserva(email, expira_em):  # confirmada/renovada: ignora
+                    liberadas += 1
+                    self._vaga_liberada(evento)
+        return liberadas
+
+    def iniciar_varredura_reservas(self, intervalo: float = 1.0):  # varredura periódica em segundo plano
+        self._reservas.iniciar(self.liberar_reservas_vencidas, intervalo)
+
+    @idempotente
+    def entrar_lista_espera(self, id_evento: int, participante: Participante):  # fila de evento lotado
+        self._varrer_reservas()
+        with self._trava(id_evento):
+            evento = self.obter_evento(id_evento)
+            if not evento:
+                return False, "Evento não encontrado."
+            participante = self._registro.existente(participante)
+            ok, msg = evento.entrar_lista_espera(participante)
+            if ok:
+                self._registro.interno(participante)             # só quem entrou na fila é registrado
+                self._registrar("espera", evento, nome=participante.nome, email=participante.email)
+                self._repo.salvar_evento(evento)
+            return ok, msg
+
+    def lista_espera(self, id_evento: int):                      # (ok, [Participante] em ordem de chegada)
+        evento = self.obter_evento(id_evento)
+        if not evento:
+            return False, "Evento não encontrado."
+        return True, evento.lista_espera()
+
+    @idempotente
     def checkin(self, id_evento: int, email: str):               # registra check-in
-        evento = self.obter_evento(id_evento)                    # busca evento
-        if not evento:                                           # valida
-            return False, "Evento não encontrado."               # erro
-        ok, msg = evento.checkin(email)                          # executa no evento
-        if ok:                                                   # se deu certo
-            self._repo.salvar_evento(evento)                     # regrava
-        return ok, msg                                           # repassa
+        with self._trava(id_evento):                             # exclusão mútua por evento
+            evento = self.obter_evento(id_evento)                # busca evento
+            if not evento:                                       # valida
+                return False, "Evento não encontrado."           # erro
+            ok, msg = evento.checkin(email)                      # executa no evento
+            if ok:                                               # se deu certo
+                self._registrar("checkin", evento, email=email.strip().lower())
+                self._repo.salvar_evento(evento)                 # regrava
+                self._atualizar_relatorios(evento)
+                if self._participantes is not None:              # índice e-mail -> eventos
+                    self._participantes.checkin(email.strip().lower(), evento.id)
+            return ok, msg                                       # repassa
+
+    def token_checkin(self, id_evento: int, email: str):         # (ok, token assinado) de um inscrito
+        if self._tokens is None:
+            return False, "Tokens de check-in desativados."
+        evento = self.obter_evento(id_evento)
+        if not evento:
+            return False, "Evento não encontrado."
+        email = email.strip().lower()
+        if email not in evento.emails_inscritos():
+            return False, "E-mail não inscrito neste evento."
+        return True, self._tokens.emitir(evento.id, email)
+
+    @idempotente
+    def checkin_token(self, token: str):                         # check-in pela leitura do token
+        dados = self._tokens.verificar(token) if self._tokens is not None else None
+        if dados is None:
+            return False, "Token inválido."
+        return self.checkin(*dados)
+
+    def eventos_do_participante(self, email: str):               # [(evento, fez_checkin)] de um e-mail
+        if hasattr(self._repo, "eventos_do_participante"):       # repositório com índice próprio (SQLite)
+            inscritos, checkins = self._repo.eventos_do_participante(email)
+        else:
+            inscritos, checkins = self._indice_participantes().eventos_de(email)
+        com_checkin = set(checkins)
+        eventos = ((self.obter_evento(i), i in com_checkin) for i in inscritos)
+        return [(e, c) for e, c in eventos if e]
+
+    def cancelar_todas_inscricoes(self, email: str):             # cancela o e-mail em todos os eventos
+        return [(e.id,) + self.cancelar_inscricao(e.id, email)   # [(id, ok, msg)] por evento
+                for e, _ in self.eventos_do_participante(email)]
 
     def relatorio_total_inscritos(self, id_evento: int):         # total de inscritos
         evento = self.obter_evento(id_evento)                    # busca evento
@@ -71,8 +252,9 @@ class SistemaEventos:
             return False, "Evento não encontrado."               # erro
         return True, evento.total_inscritos()                    # retorna total
 
-    def relatorio_eventos_com_vagas(self):                       # lista eventos com vagas
-        return [e for e in self.listar_eventos() if e.vagas_disponiveis > 0]  # filtra
+    def relatorio_eventos_com_vagas(self):                       # gera os eventos com vagas (ordem de ID)
+        ids = self._motor().ids_com_vagas()                      # conjunto mantido a cada operação
+        return (e for e in map(self._repo.buscar_evento, ids) if e)  # um evento por vez
 
     def relatorio_receita_evento(self, id_evento: int):          # receita total por evento
         evento = self.obter_evento(id_evento)                    # busca evento
@@ -80,10 +262,139 @@ class SistemaEventos:
             return False, "Evento não encontrado."               # erro
         return True, evento.receita_total()                      # retorna receita
 
+    def relatorio_ocupacao_evento(self, id_evento: int):         # ocupação, receita e taxa de check-in
+        dados = self._motor().do_evento(id_evento)               # consulta O(1)
+        if dados is None:                                        # arquivado: calculado só para ele
+            evento = self.obter_evento(id_evento)
+            dados = MotorRelatorios([evento]).do_evento(id_evento) if evento else None
+        if dados is None:                                        # valida
+            return False, "Evento não encontrado."               # erro
+        return True, dados                                       # dict com os indicadores
+
+    def relatorio_por_categoria(self):                           # agregados por categoria (com o histórico)
+        return self._motor_historico().por_categoria()
+
+    def relatorio_por_mes(self):                                 # agregados por mês ("AAAA-MM", com o histórico)
+        return self._motor_historico().por_mes()
+
+    def relatorio_geral(self):                                   # agregado de todo o catálogo (com o histórico)
+        return self._motor_historico().total()
+
+    def relatorio_receita_categoria_mes(self):                  # {categoria: {"AAAA-MM": receita/inscritos}}
+        return self._analitico().receita_por_categoria_mes()
+
+    def relatorio_distribuicao_ocupacao(self, faixas: int = 10):  # nº de eventos por faixa de ocupação
+        return self._analitico().distribuicao_ocupacao(faixas)
+
+    def relatorio_no_show(self, ate=None):                       # fração de inscritos sem check-in, por categoria
+        return self._analitico().no_show_por_categoria(ate)
+
+    def ativar_metricas(self, metricas=None):                    # liga a instrumentação (opcional)
+        if self.metricas is None:                                # desligada: nenhum custo nas operações
+            from metricas import Metricas, instrumentar          # importa só quem usa
+            self.metricas = instrumentar(self, metricas or Metricas())
+        return self.metricas
+
+    def ativar_rastro(self, caminho: str):                       # grava cada chamada num JSONL (opcional)
+        if self.rastro is None:                                  # desligado: nenhum custo nas operações
+            from rastro import gravar_rastro                     # importa só quem usa
+            self.rastro = gravar_rastro(self, caminho)
+        return self.rastro
+
+    def _inscrever(self, evento, participante):                  # inscrição sob a trava do evento
+        participante = self._registro.existente(participante)    # quem já está em outro evento reusa o objeto
+        ok, msg = evento.inscrever(participante)                 # chama regra do evento
+        if ok:                                                   # se deu certo
+            self._registro.interno(participante)                 # só inscrições aceitas entram na tabela
+            self._registrar("inscrever", evento, nome=participante.nome, email=participante.email)
+            self._repo.salvar_evento(evento)                     # regrava (no JSON é importante)
+            self._atualizar_relatorios(evento)
+            if self._participantes is not None:                  # índice e-mail -> eventos
+                self._participantes.inscrever(participante.email, evento.id)
+        return ok, msg
+
+    def _vaga_liberada(self, evento) -> str:                     # sob a trava: promove da espera; texto extra
+        promovido = evento.promover_da_espera()                  # vaga liberada vai para o próximo da fila
+        extra = ""
+        if promovido is not None:
+            self._registrar("promover", evento, nome=promovido.nome, email=promovido.email)
+            self._repo.salvar_evento(evento)
+            if self._participantes is not None:
+                self._participantes.inscrever(promovido.email, evento.id)
+            extra = f" {promovido.nome} ({promovido.email}) saiu da lista de espera e foi inscrito(a)."
+        self._atualizar_relatorios(evento)
+        return extra
+
+    def _varrer_reservas(self):                                  # sem reservas pendentes: custo zero
+        if len(self._reservas):
+            self.liberar_reservas_vencidas()
+
+    def _trava(self, id_evento):                                 # trava da faixa do evento
+        return self._travas[hash(id_evento) % len(self._travas)]
+
+    def _montar_parado(self, atributo, fabrica, historico: bool = False):  # monta com os eventos parados e publica
+        for t in self._travas:                                   # ordem fixa: sem risco de deadlock
+            t.acquire()
+        try:
+            eventos = self._repo.todos_eventos()
+            if historico and hasattr(self._repo, "eventos_arquivados"):  # relatórios contam o arquivo frio
+                eventos = chain(eventos, self._repo.eventos_arquivados())
+            setattr(self, atributo, fabrica(eventos))            # publicado antes de soltar as travas: uma
+        finally:                                                 # operação logo depois já atualiza a estrutura
+            for t in self._travas:
+                t.release()
+        return getattr(self, atributo)
+
+    def _motor(self):                                            # motor de relatórios (montado 1x)
+        if self._relatorios is None:
+            with self._trava_relatorios:
+                if self._relatorios is None:
+                    self._montar_parado("_relatorios", MotorRelatorios)  # só os eventos em memória
+        return self._relatorios
+
+    def _motor_historico(self):                                  # motor + arquivo frio (somado 1x, no 1º pedido)
+        motor = self._motor()
+        if not motor.historico:
+            with self._trava_relatorios:
+                if not motor.historico:                          # sem travas de evento: incluir_historico não
+                    arquivados = getattr(self._repo, "eventos_arquivados", None)  # sobrescreve quem voltou à memória
+                    motor.incluir_historico(arquivados() if arquivados else ())
+        return motor
+
+    def _analitico(self):                                        # colunas do catálogo (montadas 1x)
+        if self._colunas is None:
+            with self._trava_relatorios:
+                if self._colunas is None:
+                    from analitico import ColunasEventos          # importa só quem usa (NumPy opcional)
+                    self._montar_parado("_colunas", ColunasEventos, historico=True)
+        return self._colunas
+
+    def _indice_participantes(self):                             # índice e-mail -> eventos (montado 1x)
+        if self._participantes is None:
+            with self._trava_relatorios:
+                if self._participantes is None:
+                    self._montar_parado("_participantes", IndiceParticipantes)
+        return self._participantes
+
+    def _atualizar_relatorios(self, evento):                     # chamado sob a trava do evento
+        if self._relatorios is not None:                         # ainda não montado: nada a manter
+            self._relatorios.atualizar(evento)
+        if self._colunas is not None:                            # linha do evento nas colunas analíticas
+            self._colunas.atualizar(evento)
+
+    def _registrar(self, op, evento, **dados):                   # registra operação no journal (se suportado)
+        # Chamado antes de salvar_evento: o SqliteRepo grava só a linha da operação e o salvar_evento
+        # seguinte encontra o evento já em dia (não regrava o evento inteiro).
+        if hasattr(self._repo, "registrar_operacao"):            # checa se método existe
+            self._repo.registrar_operacao(op, evento, **dados)   # delega
+
     # ---------- persistência (JSONRepo oferece carregar/salvar) ----------
     def carregar(self):                                          # carrega do repositório (se suportado)
         if hasattr(self._repo, "carregar"):                      # checa se método existe
             self._repo.carregar()                                # delega
+        self._relatorios = None                                  # agregados serão remontados
+        self._participantes = None                               # índice e-mail -> eventos: na 1ª consulta, não
+        self._colunas = None                                     # aqui (BinRepo decodificaria o snapshot todo)
 
     def salvar(self):                                            # salva no repositório (se suportado)
         if hasattr(self._repo, "salvar"):                        # checa se método existe
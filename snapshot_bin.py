@@ -0,0 +1,238 @@
+"""Snapshot binário de eventos, lido via mmap.
+
+Layout (little-endian, versão 2)::
+
+    cabeçalho   "EVSB", versão, flags, seq, op_n, nº de eventos, offsets das seções, nº de strings
+    eventos     registros de largura fixa, ordenados por ID (busca binária sem índice extra)
+    inscritos   pares (nome, e-mail) como índices na tabela de strings
+    checkins    e-mails como índices na tabela de strings
+    espera      pares (nome, e-mail) da lista de espera, em ordem de chegada
+    strings     offsets (nº de strings + 1) seguidos do blob UTF-8; cada texto aparece uma vez
+
+A versão 1 (sem a seção de espera) continua sendo lida; a gravação é sempre na versão atual.
+
+Datas são gravadas como ordinal (``date.toordinal``). Abrir o arquivo só lê o
+cabeçalho; cada evento é decodificado quando acessado.
+
+Conversão a partir da raiz do projeto::
+
+    python -m snapshot_bin para-bin data/events.json data/events.bin
+    python -m snapshot_bin para-json data/events.bin data/events.json
+"""
+import argparse, mmap, os, struct
+from datetime import date
+from evento import evento_from_dict
+
+MAGICO = b"EVSB"
+VERSAO = 2
+_CABECALHO = struct.Struct("<4sHHIQIQQQQQI")   # mágico, versão, flags, seq, op_n, n_eventos, 5 offsets, n_strings
+_EVENTO = struct.Struct("<IB3xiIdIIIIIIIIII")  # id, tipo, data, cap., preço, 4 strings, inscritos, checkins, espera
+_CABECALHO_V1 = struct.Struct("<4sHHIQIQQQQI")
+_EVENTO_V1 = struct.Struct("<IB3xiIdIIIIIIII")
+_VERSAO = struct.Struct("<4sH")
+_INSCRITO = struct.Struct("<II")               # nome, e-mail
+_U32 = struct.Struct("<I")
+_TIPOS = ("evento", "workshop", "palestra")
+
+
+class _Escalares:
+    """Campos escalares de um evento (sem inscritos), o suficiente para indexar."""
+    __slots__ = ("id", "tipo", "data_evento", "capacidade_max", "preco", "nome", "local", "categoria")
+
+
+class SnapshotBinario:
+    """Leitor de snapshot binário mapeado em memória (decodificação sob demanda)."""
+    def __init__(self, caminho: str):
+        self._arquivo = open(caminho, "rb")
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, versao = _VERSAO.unpack_from(self._mm, 0)
+        if magico != MAGICO:
+            self.fechar()
+            raise ValueError(f"{caminho} não é um snapshot binário de eventos.")
+        if versao == 1:
+            (_, _, _, self.seq, self.op_n, self._n, self._off_ev, self._off_insc, self._off_chk,
+             self._off_str, self._n_str) = _CABECALHO_V1.unpack_from(self._mm, 0)
+            self._off_esp, self._reg = None, _EVENTO_V1
+        elif versao == VERSAO:
+            (_, _, _, self.seq, self.op_n, self._n, self._off_ev, self._off_insc, self._off_chk,
+             self._off_esp, self._off_str, self._n_str) = _CABECALHO.unpack_from(self._mm, 0)
+            self._reg = _EVENTO
+        else:
+            self.fechar()
+            raise ValueError(f"Versão de snapshot não suportada: {versao}.")
+        self._off_blob = self._off_str + _U32.size * (self._n_str + 1)
+        self._textos = {}                            # índice -> str já decodificada (e-mails se repetem)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def fechar(self) -> None:
+        self._mm.close()
+        self._arquivo.close()
+
+    def ids(self):
+        """IDs de todos os eventos, em ordem crescente."""
+        for i in range(self._n):
+            yield _U32.unpack_from(self._mm, self._off_ev + i * self._reg.size)[0]
+
+    def evento(self, id_evento: int, participantes=None):
+        """Decodifica um evento (com inscritos e check-ins) ou devolve None.
+
+        Com um RegistroParticipantes, os inscritos são os Participantes compartilhados dele.
+        """
+        i = self._posicao(id_evento)
+        return None if i is None else evento_from_dict(self._dict(i), participantes)
+
+    def iter_escalares(self):
+        """Campos escalares de cada evento, sem decodificar inscritos."""
+        for i in range(self._n):
+            r = self._reg.unpack_from(self._mm, self._off_ev + i * self._reg.size)
+            e = _Escalares()
+            e.id, e.tipo, e.data_evento = r[0], _TIPOS[r[1]], date.fromordinal(r[2])
+            e.capacidade_max, e.preco = r[3], r[4]
+            e.nome, e.local, e.categoria = self._str(r[5]), self._str(r[6]), self._str(r[7])
+            yield e
+
+    # ---------- util ----------
+    def _posicao(self, id_evento):
+        ini, fim = 0, self._n
+        while ini < fim:                                 # busca binária direto no mmap
+            meio = (ini + fim) // 2
+            atual = _U32.unpack_from(self._mm, self._off_ev + meio * self._reg.size)[0]
+            if atual < id_evento:
+                ini = meio + 1
+            elif atual > id_evento:
+                fim = meio
+            else:
+                return meio
+        return None
+
+    def _str(self, k: int) -> str:
+        texto = self._textos.get(k)
+        if texto is None:
+            ini, fim = struct.unpack_from("<II", self._mm, self._off_str + k * _U32.size)
+            texto = self._textos[k] = self._mm[self._off_blob + ini:self._off_blob + fim].decode("utf-8")
+        return texto
+
+    def _dict(self, i: int) -> dict:
+        r = self._reg.unpack_from(self._mm, self._off_ev + i * self._reg.size)
+        id_, tipo, data, cap, preco, nome, local, categoria, extra, insc_ini, n_insc, chk_ini, n_chk = r[:13]
+        inscritos = self._pares(self._off_insc, insc_ini, n_insc)
+        ini = self._off_chk + chk_ini * _U32.size
+        checkins = [self._str(e) for (e,) in _U32.iter_unpack(self._mm[ini:ini + n_chk * _U32.size])]
+        d = {"tipo": _TIPOS[tipo], "id": id_, "nome": self._str(nome),
+             "data_evento": date.fromordinal(data).isoformat(), "local": self._str(local),
+             "capacidade_max": cap, "categoria": self._str(categoria), "preco": preco,
+             "inscritos": inscritos, "checkins": checkins}
+        if _TIPOS[tipo] == "workshop":
+            d["material_necessario"] = self._str(extra)
+        elif _TIPOS[tipo] == "palestra":
+            d["palestrante"] = self._str(extra)
+        if self._off_esp is not None and r[14]:            # só aparece quando há alguém esperando
+            d["lista_espera"] = self._pares(self._off_esp, r[13], r[14])
+        return d
+
+    def _pares(self, secao: int, inicio: int, n: int) -> list:
+        ini = secao + inicio * _INSCRITO.size
+        return [{"nome": self._str(nome), "email": self._str(email)}
+                for nome, email in _INSCRITO.iter_unpack(self._mm[ini:ini + n * _INSCRITO.size])]
+
+
+def gravar_snapshot(caminho: str, seq: int, eventos, op_n: int = 0, fsync: bool = True) -> int:
+    """Grava eventos (objetos Evento ou dicts de to_dict) no formato binário, de forma atômica.
+
+    Devolve o número de bytes gravados.
+    """
+    strings, tabela = [], {}
+
+    def idx(texto) -> int:
+        texto = texto or ""
+        k = tabela.get(texto)
+        if k is None:
+            k = tabela[texto] = len(strings)
+            strings.append(texto)
+        return k
+
+    dicts = sorted((e if isinstance(e, dict) else e.to_dict() for e in eventos), key=lambda d: int(d["id"]))
+    registros, inscritos, checkins, espera = bytearray(), bytearray(), bytearray(), bytearray()
+    n_insc = n_chk = n_esp = 0
+    for d in dicts:
+        tipo = _TIPOS.index(d.get("tipo", "evento")) if d.get("tipo") in _TIPOS else 0
+        extra = d.get("material_necessario", "") if tipo == 1 else d.get("palestrante", "") if tipo == 2 else ""
+        lista_insc = d.get("inscritos", [])
+        lista_chk = d.get("checkins", [])
+        lista_esp = d.get("lista_espera", [])
+        registros += _EVENTO.pack(int(d["id"]), tipo, date.fromisoformat(d["data_evento"]).toordinal(),
+                                  int(d.get("capacidade_max", 0)), float(d.get("preco", 0.0)),
+                                  idx(d.get("nome")), idx(d.get("local")), idx(d.get("categoria")), idx(extra),
+                                  n_insc, len(lista_insc), n_chk, len(lista_chk), n_esp, len(lista_esp))
+        for p in lista_insc:
+            inscritos += _INSCRITO.pack(idx(p.get("nome")), idx(p.get("email")))
+        for e in lista_chk:
+            checkins += _U32.pack(idx(e))
+        for p in lista_esp:
+            espera += _INSCRITO.pack(idx(p.get("nome")), idx(p.get("email")))
+        n_insc += len(lista_insc)
+        n_chk += len(lista_chk)
+        n_esp += len(lista_esp)
+
+    blob, offsets = bytearray(), [0]
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    off_ev = _CABECALHO.size
+    off_insc = off_ev + len(registros)
+    off_chk = off_insc + len(inscritos)
+    off_esp = off_chk + len(checkins)
+    off_str = off_esp + len(espera)
+    tmp = caminho + ".tmp"
+    with open(tmp, "wb") as f:
+        n = f.write(_CABECALHO.pack(MAGICO, VERSAO, 0, seq, op_n, len(dicts), off_ev, off_insc, off_chk,
+                                    off_esp, off_str, len(strings)))
+        n += f.write(registros)
+        n += f.write(inscritos)
+        n += f.write(checkins)
+        n += f.write(espera)
+        n += f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        n += f.write(blob)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, caminho)
+    return n
+
+
+def json_para_bin(origem: str, destino: str) -> None:
+    """Converte um events.json (formato do JsonRepo) em snapshot binário."""
+    from json_repo import JsonRepo                   # resolve os IDs da tabela de participantes
+    from json_stream import LeitorEventosJson
+    leitor = LeitorEventosJson(origem)
+    eventos = list(JsonRepo(origem).iter_arquivo(leitor))
+    gravar_snapshot(destino, int(leitor.campos.get("seq", 1)), eventos, int(leitor.campos.get("op_n", 0)))
+
+
+def bin_para_json(origem: str, destino: str) -> None:
+    """Converte um snapshot binário de volta para o formato do JsonRepo (com a tabela de participantes)."""
+    from json_repo import JsonRepo
+    repo = JsonRepo(destino)                         # o próprio gravador do JsonRepo monta o arquivo
+    snap = SnapshotBinario(origem)
+    try:
+        cabecalho = {"seq": snap.seq}
+        if snap.op_n:
+            cabecalho["op_n"] = snap.op_n
+        repo._grava_snapshot(cabecalho, [snap.evento(i, repo.participantes) for i in snap.ids()])
+    finally:
+        snap.fechar()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Converte snapshots de eventos entre JSON e binário")
+    ap.add_argument("direcao", choices=("para-bin", "para-json"))
+    ap.add_argument("origem")
+    ap.add_argument("destino")
+    args = ap.parse_args()
+    (json_para_bin if args.direcao == "para-bin" else bin_para_json)(args.origem, args.destino)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import os, sqlite3, threading                 # sqlite3 da biblioteca padrão, os para criar a pasta
+from contextlib import contextmanager          # transações com "with"
+from evento import Evento, evento_from_dict    # classe base + fábrica polimórfica
+from indices import normalizar_texto                      # mesma normalização dos índices em memória
+
+# Esquema: um evento por linha, participantes normalizados, uma linha por inscrição/check-in/espera
+# (inscrições e lista de espera saem em ordem de rowid, isto é, de chegada).
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sequencia (
+    nome  TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS eventos (
+    id                  INTEGER PRIMARY KEY,
+    tipo                TEXT    NOT NULL,
+    nome                TEXT    NOT NULL,
+    data_evento         TEXT    NOT NULL,
+    local               TEXT    NOT NULL,
+    capacidade_max      INTEGER NOT NULL,
+    categoria           TEXT    NOT NULL,
+    preco               REAL    NOT NULL,
+    material_necessario TEXT,
+    palestrante         TEXT,
+    categoria_norm      TEXT,
+    local_norm          TEXT
+);
+CREATE TABLE IF NOT EXISTS participantes (
+    id    INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    nome  TEXT NOT NULL,
+    UNIQUE (email, nome)
+);
+CREATE TABLE IF NOT EXISTS inscricoes (
+    evento_id       INTEGER NOT NULL REFERENCES eventos(id),
+    email           TEXT    NOT NULL,
+    participante_id INTEGER NOT NULL REFERENCES participantes(id),
+    PRIMARY KEY (evento_id, email)
+);
+CREATE TABLE IF NOT EXISTS checkins (
+    evento_id INTEGER NOT NULL REFERENCES eventos(id),
+    email     TEXT    NOT NULL,
+    PRIMARY KEY (evento_id, email)
+);
+CREATE TABLE IF NOT EXISTS lista_espera (
+    evento_id       INTEGER NOT NULL REFERENCES eventos(id),
+    email           TEXT    NOT NULL,
+    participante_id INTEGER NOT NULL REFERENCES participantes(id),
+    PRIMARY KEY (evento_id, email)
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_data       ON eventos(data_evento);
+CREATE INDEX IF NOT EXISTS idx_eventos_categoria  ON eventos(categoria);
+CREATE INDEX IF NOT EXISTS idx_inscricoes_evento  ON inscricoes(evento_id);
+CREATE INDEX IF NOT EXISTS idx_inscricoes_email   ON inscricoes(email);
+CREATE INDEX IF NOT EXISTS idx_checkins_email     ON checkins(email);
+CREATE INDEX IF NOT EXISTS idx_participantes_email ON participantes(email);
+CREATE INDEX IF NOT EXISTS idx_eventos_tipo       ON eventos(tipo, data_evento);
+INSERT OR IGNORE INTO sequencia (nome, valor) VALUES ('eventos', 1);
+"""
+
+_COLUNAS_EVENTO = ("id, tipo, nome, data_evento, local, capacidade_max, categoria, preco, "
+                   "material_necessario, palestrante")
+
+
+class SqliteRepo:
+    """Repositório em SQLite (modo WAL): eventos são lidos sob demanda e cada
+    inscrição/cancelamento/check-in vira uma escrita de uma linha.
+
+    A conexão é compartilhada entre threads e protegida por uma trava reentrante."""
+    def __init__(self, filepath: str = "data/events.db"):
+        self._filepath = filepath
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # isolation_level=None: autocommit; as transações são abertas explicitamente.
+        self._con = sqlite3.connect(filepath, isolation_level=None, check_same_thread=False)
+        self._trava = threading.RLock()
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("PRAGMA foreign_keys=ON")
+        self._con.executescript(_ESQUEMA)
+        self._migrar()
+        # Mapa de identidade: cada evento é montado no máximo uma vez por sessão.
+        self._cache = {}
+        self._versoes = {}                     # id -> versão do evento em cache que o banco já reflete
+
+    # ---------- identidade ----------
+    def proximo_id(self) -> int:
+        """Reserva o próximo ID na tabela de sequência."""
+        with self._transacao() as cur:
+            cur.execute("UPDATE sequencia SET valor = valor + 1 WHERE nome = 'eventos'")
+            (valor,) = cur.execute("SELECT valor FROM sequencia WHERE nome = 'eventos'").fetchone()
+        return valor - 1
+
+    # ---------- CRUD ----------
+    def salvar_evento(self, evento: Evento) -> None:
+        """Grava o evento inteiro, a menos que o banco já reflita esta versão dele
+        (as operações do SistemaEventos chegam linha a linha por registrar_operacao())."""
+        versao = evento.versao                 # lida antes de gravar: se mudar no meio, regrava na próxima
+        if self._cache.get(evento.id) is evento and self._versoes.get(evento.id) == versao:
+            return
+        with self._transacao() as cur:
+            self._grava_evento(cur, evento)
+            self._cache[evento.id] = evento
+            self._versoes[evento.id] = versao
+
+    def buscar_evento(self, id_evento: int):
+        """Busca um evento pelo ID (consulta o banco só na primeira vez)."""
+        ev = self._cache.get(id_evento)
+        if ev is None:
+            with self._trava:
+                eventos = self._monta_eventos("WHERE id = ?", (id_evento,))
+            ev = eventos[0] if eventos else None
+        return ev
+
+    def todos_eventos(self):
+        """Retorna uma lista com todos os eventos, em ordem de ID."""
+        with self._trava:
+            return self._monta_eventos("", ())
+
+    def iter_eventos(self, after_id=None, limit=None):
+        """Gera os eventos em ordem de ID após ``after_id`` (cursor), no máximo ``limit``.
+
+        Lê do banco em blocos de até 256 eventos, então listar o catálogo inteiro não
+        monta todos de uma vez.
+        """
+        ultimo, restantes = after_id or 0, limit
+        while restantes is None or restantes > 0:
+            bloco = 256 if restantes is None else min(256, restantes)
+            with self._trava:
+                eventos = self._monta_eventos(
+                    "WHERE id IN (SELECT id FROM eventos WHERE id > ? ORDER BY id LIMIT ?)", (ultimo, bloco))
+            yield from eventos
+            if len(eventos) < bloco:
+                return
+            ultimo = eventos[-1].id
+            if restantes is not None:
+                restantes -= len(eventos)
+
+    def buscar_eventos(self, categoria=None, local=None, tipo=None,
+                       data_de=None, data_ate=None, preco_max=None):
+        """Gera, em ordem de data, os eventos que atendem aos filtros (consulta indexada no banco)."""
+        condicoes, params = [], []
+        for coluna, valor in (("categoria_norm", categoria), ("local_norm", local), ("tipo", tipo)):
+            if valor:
+                condicoes.append(f"{coluna} = ?")
+                params.append(normalizar_texto(valor))
+        if data_de:
+            condicoes.append("data_evento >= ?")
+            params.append(data_de.isoformat())
+        if data_ate:
+            condicoes.append("data_evento <= ?")
+            params.append(data_ate.isoformat())
+        if preco_max is not None:
+            condicoes.append("preco <= ?")
+            params.append(preco_max)
+        filtro = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+        with self._trava:
+            ids = [r[0] for r in self._con.execute(
+                f"SELECT id FROM eventos {filtro} ORDER BY data_evento, id", params)]
+        for id_evento in ids:
+            ev = self.buscar_evento(id_evento)
+            if ev is not None:
+                yield ev
+
+    def eventos_do_participante(self, email: str):
+        """(IDs inscritos, IDs com check-in) de um e-mail, pelos índices de e-mail do banco."""
+        email = email.strip().lower()
+        with self._trava:
+            inscritos = [r[0] for r in self._con.execute(
+                "SELECT evento_id FROM inscricoes WHERE email = ? ORDER BY evento_id", (email,))]
+            checkins = [r[0] for r in self._con.execute(
+                "SELECT evento_id FROM checkins WHERE email = ? ORDER BY evento_id", (email,))]
+        return inscritos, checkins
+
+    def registrar_operacao(self, op: str, evento: Evento, **dados) -> None:
+        """Aplica no banco a mudança de uma operação bem-sucedida do SistemaEventos."""
+        email = dados.get("email", "")
+        with self._transacao() as cur:
+            if op in ("inscrever", "promover"):                 # promover: sai da espera e vira inscrição
+                pid = self._participante_id(cur, dados.get("nome", ""), email)
+                cur.execute("DELETE FROM lista_espera WHERE evento_id = ? AND email = ?", (evento.id, email))
+                cur.execute("INSERT OR IGNORE INTO inscricoes (evento_id, email, participante_id) "
+                            "VALUES (?, ?, ?)", (evento.id, email, pid))
+            elif op == "inscrever_lote":                        # lote inteiro numa só transação
+                for p in dados.get("participantes", []):
+                    pid = self._participante_id(cur, p["nome"], p["email"])
+                    cur.execute("DELETE FROM lista_espera WHERE evento_id = ? AND email = ?",
+                                (evento.id, p["email"]))
+                    cur.execute("INSERT OR IGNORE INTO inscricoes (evento_id, email, participante_id) "
+                                "VALUES (?, ?, ?)", (evento.id, p["email"], pid))
+            elif op == "espera":
+                pid = self._participante_id(cur, dados.get("nome", ""), email)
+                cur.execute("INSERT OR IGNORE INTO lista_espera (evento_id, email, participante_id) "
+                            "VALUES (?, ?, ?)", (evento.id, email, pid))
+            elif op == "cancelar":                              # inscrição ou lugar na lista de espera
+                cur.execute("DELETE FROM checkins WHERE evento_id = ? AND email = ?", (evento.id, email))
+                cur.execute("DELETE FROM inscricoes WHERE evento_id = ? AND email = ?", (evento.id, email))
+                cur.execute("DELETE FROM lista_espera WHERE evento_id = ? AND email = ?", (evento.id, email))
+            elif op == "checkin":
+                cur.execute("INSERT OR IGNORE INTO checkins (evento_id, email) VALUES (?, ?)",
+                            (evento.id, email))
+            # Cada operação é uma alteração do evento: se o banco estava uma versão atrás, agora está em dia.
+            # Outras alterações sem registro deixam a versão para trás e salvar_evento regrava o evento.
+            if self._cache.get(evento.id) is evento and self._versoes.get(evento.id) == evento.versao - 1:
+                self._versoes[evento.id] = evento.versao
+
+    # ---------- persistência ----------
+    def carregar(self) -> None:
+        """Nada é lido antecipadamente; apenas descarta o que estava em cache."""
+        with self._trava:
+            self._cache, self._versoes = {}, {}
+
+    def salvar(self) -> None:
+        """As escritas já são confirmadas por operação; aqui só se faz checkpoint do WAL."""
+        with self._trava:
+            self._con.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._trava:
+            self._con.close()
+
+    # ---------- util ----------
+    @contextmanager
+    def _transacao(self):
+        with self._trava:                              # uma transação por vez na conexão compartilhada
+            cur = self._con.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+
+    def _migrar(self) -> None:
+        """Bancos criados antes das colunas normalizadas (usadas na busca) ganham as colunas e os índices."""
+        colunas = {r[1] for r in self._con.execute("PRAGMA table_info(eventos)")}
+        if "categoria_norm" not in colunas:
+            with self._transacao() as cur:
+                cur.execute("ALTER TABLE eventos ADD COLUMN categoria_norm TEXT")
+                cur.execute("ALTER TABLE eventos ADD COLUMN local_norm TEXT")
+                linhas = cur.execute("SELECT id, categoria, local FROM eventos").fetchall()
+                cur.executemany("UPDATE eventos SET categoria_norm = ?, local_norm = ? WHERE id = ?",
+                                [(normalizar_texto(c), normalizar_texto(l), i) for i, c, l in linhas])
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_eventos_categoria_norm "
+                          "ON eventos(categoria_norm, data_evento)")
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_eventos_local_norm ON eventos(local_norm, data_evento)")
+
+    def _participante_id(self, cur, nome: str, email: str) -> int:
+        cur.execute("INSERT OR IGNORE INTO participantes (email, nome) VALUES (?, ?)", (email, nome))
+        (pid,) = cur.execute("SELECT id FROM participantes WHERE email = ? AND nome = ?",
+                             (email, nome)).fetchone()
+        return pid
+
+    def _grava_evento(self, cur, evento: Evento) -> None:
+        """Grava (ou substitui) o evento inteiro: linha do evento, inscrições, check-ins e lista de espera."""
+        d = evento.to_dict()
+        cur.execute("DELETE FROM lista_espera WHERE evento_id = ?", (evento.id,))
+        cur.execute("DELETE FROM checkins WHERE evento_id = ?", (evento.id,))
+        cur.execute("DELETE FROM inscricoes WHERE evento_id = ?", (evento.id,))
+        cur.execute(
+            f"INSERT OR REPLACE INTO eventos ({_COLUNAS_EVENTO}, categoria_norm, local_norm) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (d["id"], d["tipo"], d["nome"], d["data_evento"], d["local"], d["capacidade_max"],
+             d["categoria"], d["preco"], d.get("material_necessario"), d.get("palestrante"),
+             normalizar_texto(d["categoria"]), normalizar_texto(d["local"])))
+        for p in d["inscritos"]:
+            pid = self._participante_id(cur, p["nome"], p["email"])
+            cur.execute("INSERT INTO inscricoes (evento_id, email, participante_id) VALUES (?, ?, ?)",
+                        (evento.id, p["email"], pid))
+        cur.executemany("INSERT INTO checkins (evento_id, email) VALUES (?, ?)",
+                        [(evento.id, e) for e in d["checkins"]])
+        for p in d.get("lista_espera", []):
+            pid = self._participante_id(cur, p["nome"], p["email"])
+            cur.execute("INSERT INTO lista_espera (evento_id, email, participante_id) VALUES (?, ?, ?)",
+                        (evento.id, p["email"], pid))
+
+    def _monta_eventos(self, filtro: str, params: tuple) -> list:
+        """Retorna, em ordem de ID, os eventos que satisfazem o filtro SQL sobre "eventos",
+        montando (e pondo em cache) apenas os que ainda não estavam em memória."""
+        ids = [r[0] for r in self._con.execute(f"SELECT id FROM eventos {filtro} ORDER BY id", params)]
+        if any(i not in self._cache for i in ids):
+            dicts = {}
+            for (id_, tipo, nome, data, local, cap, cat, preco, material, palestrante) in self._con.execute(
+                    f"SELECT {_COLUNAS_EVENTO} FROM eventos {filtro}", params):
+                if id_ not in self._cache:
+                    dicts[id_] = {"tipo": tipo, "id": id_, "nome": nome, "data_evento": data,
+                                  "local": local, "capacidade_max": cap, "categoria": cat,
+                                  "preco": preco, "material_necessario": material or "",
+                                  "palestrante": palestrante or "", "inscritos": [], "checkins": []}
+            sub = f"SELECT id FROM eventos {filtro}"
+            for id_, nome, email in self._con.execute(
+                    "SELECT i.evento_id, p.nome, i.email FROM inscricoes i "
+                    "JOIN participantes p ON p.id = i.participante_id "
+                    f"WHERE i.evento_id IN ({sub}) ORDER BY i.rowid", params):
+                if id_ in dicts:
+                    dicts[id_]["inscritos"].append({"nome": nome, "email": email})
+            for id_, email in self._con.execute(
+                    f"SELECT evento_id, email FROM checkins WHERE evento_id IN ({sub})", params):
+                if id_ in dicts:
+                    dicts[id_]["checkins"].append(email)
+            for id_, nome, email in self._con.execute(
+                    "SELECT l.evento_id, p.nome, l.email FROM lista_espera l "
+                    "JOIN participantes p ON p.id = l.participante_id "
+                    f"WHERE l.evento_id IN ({sub}) ORDER BY l.rowid", params):
+                if id_ in dicts:
+                    dicts[id_].setdefault("lista_espera", []).append({"nome": nome, "email": email})
+            for id_, d in dicts.items():
+                ev = self._cache[id_] = evento_from_dict(d)
+                self._versoes[id_] = ev.versao
+        return [self._cache[i] for i in ids]
@@ -8,6 +8,16 @@ from sistemas_evento import SistemaEventos
 from memory_repo import MemoryRepo
 # Importa a entidade Participante para simular inscrições
 from participante import Participante
+# Repositório JSON (usado nos testes de persistência) e utilitários de arquivos temporários
+from json_repo import JsonRepo
+# Repositório SQLite (stdlib sqlite3)
+from sqlite_repo import SqliteRepo
+from bin_repo import BinRepo
+from snapshot_bin import json_para_bin, bin_para_json
+from tokens import EmissorTokens, EstacaoCheckin
+from particionado import PartitionedRepo
+from rastro import Reproducao, ler_rastro
+import os, json, tempfile
 
 
 # Classe de testes herdando de unittest.TestCase
@@ -56,7 +66,7 @@ class TestSistemaEventos(unittest.TestCase):
 
     # Testa se a listagem retorna 1 evento (o criado no setUp)
     def test_listar_eventos(self):
-        eventos = self.sis.listar_eventos()          # lista eventos no repo
+        eventos = list(self.sis.listar_eventos())    # lista eventos no repo (gerador)
         self.assertEqual(len(eventos), 1)            # deve ter exatamente 1 (o DevConf)
 
     # Testa uma inscrição válida
@@ -105,12 +115,1168 @@ class TestSistemaEventos(unittest.TestCase):
         ok, total = self.sis.relatorio_total_inscritos(self.id_evento)    # consulta total
         self.assertTrue(ok)                                               # chamada válida
         self.assertEqual(total, 1)                                        # total esperado = 1
-        lista = self.sis.relatorio_eventos_com_vagas()                    # eventos com vagas > 0
+        lista = list(self.sis.relatorio_eventos_com_vagas())              # eventos com vagas > 0
         self.assertEqual(len(lista), 1)                                   # ainda há vagas (capacidade=2)
         ok2, receita = self.sis.relatorio_receita_evento(self.id_evento)  # receita = inscritos * preço
         self.assertTrue(ok2)                                              # chamada válida
         self.assertEqual(receita, 100.0)                                  # 1 * 100.0 = 100.0
 
+# Testes da inscrição em lote (API + CSV)
+class TestInscricaoLote(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = MemoryRepo()
+        self.sis = SistemaEventos(self.repo)
+        self.sis.criar_evento("DevConf", date.today() + timedelta(days=1), "Recife", 3, "Tech", 10.0)
+
+    # Relatório por linha: duplicado no lote, já inscrito, vazio e excesso de capacidade
+    def test_relatorio_por_linha(self):
+        self.sis.inscrever(1, Participante("Z", "z@x.com"))
+        lote = [Participante("A", "a@x.com"), Participante("A2", "A@x.com"), Participante("Z", "z@x.com"),
+                Participante("V", ""), Participante("B", "b@x.com"), Participante("C", "c@x.com")]
+        ok, rel = self.sis.inscrever_lote(1, iter(lote))
+        self.assertTrue(ok)
+        self.assertEqual([r[2] for r in rel], [True, False, False, False, True, False])
+        self.assertEqual(rel[5][3], "Evento lotado.")
+        self.assertEqual(self.sis.obter_evento(1).vagas_disponiveis, 0)
+        self.assertFalse(self.sis.inscrever_lote(99, lote)[0])  # evento inexistente
+
+    # CSV com ";" (padrão pt-BR) e gravação única no journal
+    def test_importar_csv_com_journal(self):
+        with tempfile.TemporaryDirectory() as d:
+            csv_path = os.path.join(d, "lista.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("Nome;E-mail\nAna;ana@x.com\nBia;bia@x.com\n")
+            repo = JsonRepo(os.path.join(d, "events.json"), journal=True, fsync=False)
+            sis = SistemaEventos(repo)
+            sis.carregar()
+            sis.criar_evento("DevConf", date.today() + timedelta(days=1), "Recife", 5, "Tech", 10.0)
+            ok, rel = sis.importar_csv(1, csv_path)
+            self.assertEqual([r[1] for r in rel if r[2]], ["ana@x.com", "bia@x.com"])
+            repo.fechar()
+            with open(repo._journal_path, encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 2)           # criar + 1 registro para o lote
+            repo2 = JsonRepo(os.path.join(d, "events.json"), journal=True, fsync=False)
+            repo2.carregar()
+            self.assertEqual(repo2.buscar_evento(1).total_inscritos(), 2)
+            repo2.fechar()
+
+# Teste de estresse: várias threads inscrevendo/fazendo check-in ao mesmo tempo
+class TestConcorrencia(unittest.TestCase):
+
+    def setUp(self):
+        import sys
+        self._intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)                              # força trocas de thread frequentes
+
+    def tearDown(self):
+        import sys
+        sys.setswitchinterval(self._intervalo)
+
+    # Capacidade nunca é ultrapassada e IDs gerados em paralelo são únicos
+    def test_capacidade_nunca_excedida(self):
+        from concurrent.futures import ThreadPoolExecutor
+        sis = SistemaEventos(MemoryRepo(), n_travas=4)
+        amanha = date.today() + timedelta(days=1)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            oks = list(pool.map(lambda i: sis.criar_evento(f"E{i}", amanha, "R", 50, "C", 1.0)[0], range(8)))
+        self.assertTrue(all(oks))
+        self.assertEqual(sorted(e.id for e in sis.listar_eventos()), list(range(1, 9)))
+
+        def tarefa(i):
+            id_evento, email = 1 + i % 8, f"p{i}@x.com"
+            ok, _ = sis.inscrever(id_evento, Participante("P", email))
+            sis.checkin(id_evento, email)
+            cancelou = i % 7 == 0 and sis.cancelar_inscricao(id_evento, email)[0]
+            return id_evento, ok, cancelou
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            resultados = list(pool.map(tarefa, range(8 * 200)))
+        for ev in sis.listar_eventos():
+            aceitas = sum(1 for i, ok, _ in resultados if ok and i == ev.id)
+            canceladas = sum(1 for i, _, c in resultados if c and i == ev.id)
+            self.assertEqual(ev.total_inscritos(), aceitas - canceladas)  # nenhuma inscrição perdida
+            self.assertLessEqual(ev.total_inscritos(), ev.capacidade_max)
+            self.assertGreaterEqual(ev.vagas_disponiveis, 0)
+            self.assertTrue(set(ev.to_dict()["checkins"]) <= set(ev._inscritos_emails))
+
+# Teste do front-end HTTP/JSON (asyncio) contra um servidor local em porta livre
+class TestServidorHttp(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        import asyncio
+        from servidor import ServidorEventos
+        self.sis = SistemaEventos(MemoryRepo())
+        self.servidor = ServidorEventos(self.sis, "127.0.0.1", 0, workers=4)
+        await self.servidor.iniciar()
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.servidor.porta)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.servidor.encerrar()
+
+    async def _req(self, metodo, caminho, corpo=None):          # uma requisição na mesma conexão (keep-alive)
+        dados = json.dumps(corpo).encode() if corpo is not None else b""
+        self.writer.write(f"{metodo} {caminho} HTTP/1.1\r\nContent-Length: {len(dados)}\r\n\r\n".encode() + dados)
+        status = int((await self.reader.readline()).split()[1])
+        tamanho = 0
+        while (h := await self.reader.readline()) not in (b"\r\n", b""):
+            if h.lower().startswith(b"content-length:"):
+                tamanho = int(h.split(b":")[1])
+        return status, json.loads(await self.reader.readexactly(tamanho))
+
+    # Fluxo completo: criar, inscrever, check-in, relatórios, cancelar e erros
+    async def test_fluxo_completo(self):
+        amanha = (date.today() + timedelta(days=1)).isoformat()
+        st, r = await self._req("POST", "/eventos", {"nome": "Talk", "data_evento": amanha, "local": "Recife",
+                                                     "capacidade_max": 1, "categoria": "Tech", "preco": 20,
+                                                     "tipo": "palestra", "palestrante": "Maria"})
+        self.assertEqual(st, 201)
+        st, _ = await self._req("POST", "/eventos/1/inscricoes", {"nome": "Ana", "email": "ana@x.com"})
+        self.assertEqual(st, 201)
+        st, r = await self._req("POST", "/eventos/1/inscricoes", {"nome": "Bia", "email": "bia@x.com"})
+        self.assertEqual((st, r["mensagem"]), (400, "Evento lotado."))
+        self.assertEqual((await self._req("POST", "/eventos/1/checkins", {"email": "ana@x.com"}))[0], 200)
+        st, r = await self._req("GET", "/eventos")
+        self.assertEqual((r["resultado"][0]["palestrante"], r["resultado"][0]["vagas"]), ("Maria", 0))
+        self.assertEqual((await self._req("GET", "/eventos/1/receita"))[1]["resultado"], 20.0)
+        self.assertEqual((await self._req("GET", "/relatorios/eventos-com-vagas"))[1]["resultado"], [])
+        self.assertEqual((await self._req("DELETE", "/eventos/1/inscricoes/ana%40x.com"))[0], 200)
+        self.assertEqual((await self._req("GET", "/eventos/1/total-inscritos"))[1]["resultado"], 0)
+        self.assertEqual((await self._req("GET", "/eventos/9/total-inscritos"))[0], 404)
+        self.assertEqual((await self._req("POST", "/eventos/1/checkins", {}))[0], 400)
+        st, r = await self._req("GET", "/eventos?limit=1")
+        self.assertEqual((st, len(r["resultado"]), r["proximo"]), (200, 1, 1))
+        st, r = await self._req("GET", "/eventos?after=1&limit=5")
+        self.assertEqual((r["resultado"], r["proximo"]), ([], None))
+        self.assertEqual((await self._req("GET", "/eventos?limit=x"))[0], 400)
+        self.assertEqual((await self._req("GET", "/eventos/1/foo"))[0], 404)        # caminho desconhecido
+        self.assertEqual((await self._req("GET", "/eventos/1/inscricoes/a/b"))[0], 404)
+        self.assertEqual((await self._req("GET", "/eventos/1/inscricoes"))[0], 405)  # caminho certo, método errado
+        self.assertEqual((await self._req("GET", "/checkins"))[0], 405)
+        for corpo in ({"capacidade_max": None}, {"preco": [1]}, {"data_evento": 5}):
+            dados = dict({"nome": "X", "data_evento": amanha, "local": "R", "categoria": "C"}, **corpo)
+            self.assertEqual((await self._req("POST", "/eventos", dados))[0], 400)
+
+    # Com tokens ligados, a inscrição traz o token num campo próprio; a mensagem não muda
+    async def test_token_na_inscricao(self):
+        self.sis._tokens = EmissorTokens("segredo")
+        amanha = (date.today() + timedelta(days=1)).isoformat()
+        await self._req("POST", "/eventos", {"nome": "T", "data_evento": amanha, "local": "Recife",
+                                             "capacidade_max": 2, "categoria": "Tech", "preco": 0})
+        st, r = await self._req("POST", "/eventos/1/inscricoes", {"nome": "Ana", "email": "Ana@x.com"})
+        self.assertEqual((st, r["mensagem"]), (201, "Inscrição realizada!"))
+        self.assertEqual(EmissorTokens("segredo").verificar(r["token"]), (1, "ana@x.com"))
+        st, r = await self._req("POST", "/eventos/1/inscricoes", {"nome": "Ana", "email": "ana@x.com"})
+        self.assertNotIn("token", r)                             # recusada: sem token
+
+    # Content-Length inválido vira 400; exceção inesperada vira 500 e a conexão segue viva
+    async def test_erros_viram_resposta(self):
+        def falha(_id):
+            raise RuntimeError("bug")
+        self.sis.relatorio_total_inscritos = falha
+        st, r = await self._req("GET", "/eventos/1/total-inscritos")
+        self.assertEqual((st, r["ok"]), (500, False))
+        self.assertEqual((await self._req("GET", "/eventos"))[0], 200)
+        for tamanho in (b"abc", b"-5"):
+            import asyncio
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.servidor.porta)
+            writer.write(b"POST /eventos HTTP/1.1\r\nContent-Length: " + tamanho + b"\r\n\r\n")
+            self.assertIn(b" 400 ", await reader.readline())
+            writer.close()
+
+# Relatórios cruzados do snapshot colunar (com e sem NumPy) mantidos a cada operação
+class TestAnalitico(unittest.TestCase):
+
+    def test_colunas_incrementais(self):
+        from analitico import ColunasEventos, np
+        sis = SistemaEventos(MemoryRepo())
+        dia = date.today() + timedelta(days=1)
+        sis.criar_evento("A", dia, "Recife", 4, "Tech", 10.0)
+        sis.criar_evento("B", dia, "Recife", 2, "Arte", 5.5)
+        sis.criar_evento("C", dia + timedelta(days=40), "Recife", 10, "Tech", 20.0)
+        self.assertEqual(sis.relatorio_distribuicao_ocupacao(), [3] + [0] * 9)  # monta as colunas aqui
+        for i in range(4):
+            sis.inscrever(1, Participante("P", f"p{i}@x.com"))
+        sis.inscrever(2, Participante("P", "p0@x.com"))
+        sis.checkin(1, "p0@x.com")
+        sis.checkin(2, "p0@x.com")
+        mes_a, mes_c = dia.strftime("%Y-%m"), (dia + timedelta(days=40)).strftime("%Y-%m")
+        receita = sis.relatorio_receita_categoria_mes()
+        self.assertEqual(receita["Tech"][mes_a], {"eventos": 1, "inscritos": 4, "receita": 40.0})
+        self.assertEqual(receita["Tech"][mes_c]["receita"], 0.0)
+        self.assertEqual(receita["Arte"][mes_a]["receita"], 5.5)
+        self.assertEqual(sis.relatorio_distribuicao_ocupacao(), [1, 0, 0, 0, 0, 1, 0, 0, 0, 1])
+        no_show = sis.relatorio_no_show()
+        self.assertEqual((no_show["Tech"]["inscritos"], no_show["Tech"]["no_show"]), (4, 0.75))
+        self.assertEqual(sis.relatorio_no_show(ate=date.today()), {})
+        for usar_numpy in {False, np is not None}:              # os dois caminhos dão o mesmo resultado
+            c = ColunasEventos(sis.listar_eventos(), usar_numpy=usar_numpy)
+            self.assertEqual(c.receita_por_categoria_mes(), receita)
+            self.assertEqual(c.no_show_por_categoria(ate=dia)["Tech"],       # só o evento A até ``dia``
+                             {"eventos": 1, "inscritos": 4, "checkins": 1, "no_show": 0.75})
+
+# Cursor de listagem (after_id/limit) igual em todos os repositórios
+class TestPaginacao(unittest.TestCase):
+
+    def test_cursor_em_todos_os_repos(self):
+        with tempfile.TemporaryDirectory() as d:
+            for repo in (MemoryRepo(), JsonRepo(os.path.join(d, "e.json")), BinRepo(os.path.join(d, "e.bin")),
+                         SqliteRepo(os.path.join(d, "e.db"))):
+                sis = SistemaEventos(repo)
+                sis.carregar()
+                for i in range(7):
+                    sis.criar_evento(f"E{i}", date.today() + timedelta(days=1), "Recife", 1 + i % 2, "Tech", 1.0)
+                paginas, cursor = [], None
+                while True:
+                    pagina = [e.id for e in sis.listar_eventos(after_id=cursor, limit=3)]
+                    if not pagina:
+                        break
+                    paginas.append(pagina)
+                    cursor = pagina[-1]
+                self.assertEqual(paginas, [[1, 2, 3], [4, 5, 6], [7]])
+                self.assertEqual([e.id for e in sis.listar_eventos(after_id=5)], [6, 7])
+                sis.inscrever(1, Participante("A", "a@x.com"))
+                vagas = sis.relatorio_eventos_com_vagas()
+                self.assertNotIsInstance(vagas, list)            # gerador: nada montado antes do uso
+                self.assertEqual([e.id for e in vagas], [2, 3, 4, 5, 6, 7])
+                if hasattr(repo, "fechar"):
+                    repo.fechar()
+
+    # A página custa o seu tamanho, não os buracos na sequência de IDs
+    def test_cursor_pula_buracos_sem_buscar(self):
+        from evento import Evento
+        repo = MemoryRepo()
+        for i in (1, 500_000, 500_001, 900_000):
+            repo.salvar_evento(Evento(i, f"E{i}", date.today(), "R", 5, "C", 1.0))
+        buscas = []
+        repo._eventos = _DictContado(repo._eventos, buscas)
+        self.assertEqual([e.id for e in repo.iter_eventos(after_id=1, limit=2)], [500_000, 500_001])
+        self.assertEqual(buscas, [500_000, 500_001])
+        self.assertEqual([e.id for e in repo.iter_eventos(after_id=500_001)], [900_000])
+
+
+class _DictContado(dict):                                        # anota cada get (busca por ID)
+    def __init__(self, dados, buscas):
+        super().__init__(dados)
+        self._buscas = buscas
+
+    def get(self, chave, padrao=None):
+        self._buscas.append(chave)
+        return super().get(chave, padrao)
+
+# Testes dos relatórios incrementais (devem bater com um recálculo completo)
+class TestRelatoriosIncrementais(unittest.TestCase):
+
+    def test_agregados_batem_com_recalculo(self):
+        from relatorios import MotorRelatorios
+        sis = SistemaEventos(MemoryRepo())
+        d1 = date.today() + timedelta(days=1)
+        d2 = date.today() + timedelta(days=40)
+        sis.criar_evento("A", d1, "R", 2, "Tech", 10.0)
+        self.assertEqual([e.id for e in sis.relatorio_eventos_com_vagas()], [1])  # motor montado aqui
+        sis.criar_evento("B", d2, "R", 3, "Tech", 0.1)
+        sis.criar_evento("C", d2, "R", 5, "Arte", 7.5, tipo="workshop")
+        for i in range(3):
+            sis.inscrever(1, Participante("P", f"p{i}@x.com"))   # a 3ª falha (lotado)
+            sis.inscrever(2, Participante("P", f"p{i}@x.com"))
+        sis.inscrever_lote(3, [Participante("Q", f"q{i}@x.com") for i in range(4)])
+        sis.checkin(1, "p0@x.com")
+        sis.checkin(3, "q1@x.com")
+        sis.cancelar_inscricao(2, "p2@x.com")
+        sis.checkin(2, "p1@x.com")
+
+        self.assertEqual([e.id for e in sis.relatorio_eventos_com_vagas()], [2, 3])
+        recalculo = MotorRelatorios(sis.listar_eventos())               # varredura completa
+        self.assertEqual(sis.relatorio_por_categoria(), recalculo.por_categoria())
+        self.assertEqual(sis.relatorio_por_mes(), recalculo.por_mes())
+        tech = sis.relatorio_por_categoria()["Tech"]
+        self.assertEqual((tech["inscritos"], tech["checkins"], tech["receita"]), (4, 2, 20.2))
+        ok, ev1 = sis.relatorio_ocupacao_evento(1)
+        self.assertEqual((ev1["ocupacao"], ev1["taxa_checkin"]), (1.0, 0.5))
+        self.assertFalse(sis.relatorio_ocupacao_evento(99)[0])
+
+    # Uma inscrição logo depois de o motor soltar as travas (antes de o método voltar) não se perde
+    def test_inscricao_enquanto_motor_e_publicado(self):
+        import threading
+        sis = SistemaEventos(MemoryRepo())
+        sis.criar_evento("A", date.today() + timedelta(days=1), "R", 5, "Tech", 10.0)
+
+        class TravaQueInscreve:                                  # faz o papel de outra thread nessa janela
+            def __init__(self):
+                self._trava, self.disparar = threading.Lock(), True
+            def acquire(self):
+                self._trava.acquire()
+            def release(self):
+                self._trava.release()
+                if self.disparar:
+                    self.disparar = False
+                    sis.inscrever(1, Participante("P", "p@x.com"))
+        sis._travas[-1] = TravaQueInscreve()                     # a última a ser solta; o evento 1 usa outra
+        sis.relatorio_geral()
+        self.assertEqual(sis.relatorio_geral()["inscritos"], 1)
+
+# Testes da busca por índices secundários
+class TestBuscaEventos(unittest.TestCase):
+
+    def _popula(self, sis):
+        hoje = date.today()
+        sis.criar_evento("A", hoje + timedelta(days=5), "Recife", 10, "Tech", 80.0, tipo="workshop")
+        sis.criar_evento("B", hoje + timedelta(days=40), "recife ", 10, "Tech", 50.0, tipo="workshop")
+        sis.criar_evento("C", hoje + timedelta(days=2), "Olinda", 10, "Tech", 20.0, tipo="workshop")
+        sis.criar_evento("D", hoje + timedelta(days=3), "Recife", 10, "tech", 150.0, tipo="workshop")
+        sis.criar_evento("E", hoje + timedelta(days=1), "Recife", 10, "Arte", 10.0)
+        return hoje
+
+    # Mesmo resultado (e ordem por data) em memória, JSON e SQLite
+    def test_filtros_combinados(self):
+        with tempfile.TemporaryDirectory() as d:
+            repos = [MemoryRepo(), JsonRepo(os.path.join(d, "e.json"), fsync=False),
+                     SqliteRepo(os.path.join(d, "e.db"))]
+            for repo in repos:
+                sis = SistemaEventos(repo)
+                sis.carregar()
+                hoje = self._popula(sis)
+                busca = lambda **f: [e.nome for e in sis.buscar_eventos(**f)]
+                self.assertEqual(busca(categoria="TECH", local="recife", tipo="workshop", preco_max=100,
+                                       data_ate=hoje + timedelta(days=30)), ["A"])
+                self.assertEqual(busca(local="Recife"), ["E", "D", "A", "B"])
+                self.assertEqual(busca(data_de=hoje + timedelta(days=2), data_ate=hoje + timedelta(days=5)),
+                                 ["C", "D", "A"])
+                self.assertEqual(busca(tipo="palestra"), [])
+                self.assertEqual(len(busca()), 5)
+            repos[2].fechar()
+
+    # Índice acompanha mudanças de um evento reindexado
+    def test_reindexa_evento(self):
+        from indices import IndiceEventos
+        from evento import Evento
+        ev = Evento(1, "A", date(2030, 1, 1), "Recife", 1, "Tech", 10.0)
+        indice = IndiceEventos([ev])
+        ev._categoria = "Arte"                                      # simula alteração
+        indice.adicionar(ev)
+        self.assertEqual(list(indice.buscar(categoria="tech")), [])
+        self.assertEqual(list(indice.buscar(categoria="arte")), [1])
+        indice.remover(1)
+        self.assertEqual(list(indice.buscar()), [])
+
+# Testes do índice e-mail -> eventos
+class TestEventosDoParticipante(unittest.TestCase):
+
+    def _cenario(self, sis):
+        amanha = date.today() + timedelta(days=1)
+        for nome in "ABC":
+            sis.criar_evento(nome, amanha, "R", 5, "C", 1.0)
+        sis.inscrever(1, Participante("Ana", "ana@x.com"))
+        sis.inscrever_lote(3, [Participante("Ana", "ANA@x.com"), Participante("Bia", "bia@x.com")])
+        sis.checkin(3, "ana@x.com")
+
+    # Índice acompanha inscrições, check-ins, cancelamentos e recarga (memória, JSON e SQLite)
+    def test_consulta_e_cancelamento_em_massa(self):
+        with tempfile.TemporaryDirectory() as d:
+            for fabrica in (MemoryRepo, lambda: JsonRepo(os.path.join(d, "e.json"), journal=True, fsync=False),
+                            lambda: SqliteRepo(os.path.join(d, "e.db"))):
+                repo = fabrica()
+                sis = SistemaEventos(repo)
+                sis.carregar()
+                self._cenario(sis)
+                self.assertEqual([(e.id, c) for e, c in sis.eventos_do_participante(" Ana@X.com")],
+                                 [(1, False), (3, True)])
+                if isinstance(repo, JsonRepo):                    # recarga reconstrói o índice
+                    repo.fechar()
+                    repo = JsonRepo(os.path.join(d, "e.json"), journal=True, fsync=False)
+                    sis = SistemaEventos(repo)
+                    sis.carregar()
+                    self.assertEqual(len(sis.eventos_do_participante("ana@x.com")), 2)
+                res = sis.cancelar_todas_inscricoes("ana@x.com")
+                self.assertEqual([(i, ok) for i, ok, _ in res], [(1, True), (3, True)])
+                self.assertEqual(sis.eventos_do_participante("ana@x.com"), [])
+                self.assertEqual([e.id for e, _ in sis.eventos_do_participante("bia@x.com")], [3])
+                if hasattr(repo, "fechar"):
+                    repo.fechar()
+
+# Testes da estrutura interna do Evento (dict e-mail -> Participante)
+class TestEventoInscritos(unittest.TestCase):
+
+    # Cancelar no meio preserva a ordem dos demais e mantém e-mails/check-ins consistentes
+    def test_cancelamento_mantem_ordem_e_conjuntos(self):
+        from evento import Evento
+        ev = Evento(1, "X", date.today(), "R", 10, "C", 10.0)
+        for nome in "ABCD":
+            ev.inscrever(Participante(nome, f"{nome}@x.com"))
+        ev.checkin("b@x.com")
+        ok, _ = ev.cancelar_inscricao(" B@x.com ")
+        self.assertTrue(ok)
+        self.assertEqual([p["nome"] for p in ev.to_dict()["inscritos"]], ["A", "C", "D"])
+        self.assertFalse(ev.ja_inscrito("b@x.com"))
+        self.assertEqual(ev.to_dict()["checkins"], [])
+        self.assertEqual(ev.vagas_disponiveis, 7)
+        self.assertFalse(hasattr(ev, "__dict__"))               # __slots__ em uso
+        self.assertFalse(hasattr(Participante("A", "a@x.com"), "__dict__"))
+
+    # Carregar não monta Participantes: contagens vêm dos dados crus, a 1ª alteração hidrata
+    def test_hidratacao_sob_demanda(self):
+        from evento import evento_from_dict
+        d = {"tipo": "workshop", "id": 1, "nome": "W", "data_evento": date.today().isoformat(), "local": "R",
+             "capacidade_max": 3, "categoria": "C", "preco": 20.0, "material_necessario": "Nada",
+             "inscritos": [{"nome": "A", "email": "a@x.com"}, {"nome": "B", "email": "b@x.com"}],
+             "checkins": ["a@x.com"]}
+        ev = evento_from_dict(d)
+        self.assertEqual((ev.vagas_disponiveis, ev.total_checkins(), ev.receita_total()), (1, 1, 40.0))
+        self.assertEqual(ev.to_dict(), d)
+        self.assertEqual(len(ev._inscritos), 0)                 # ainda não hidratado
+        self.assertEqual(ev.checkin("b@x.com")[0], True)
+        self.assertEqual(list(ev.emails_inscritos()), ["a@x.com", "b@x.com"])
+        self.assertEqual((ev.total_inscritos(), ev.total_checkins()), (2, 2))
+
+    # SistemaEventos.carregar() (índice e-mail -> eventos incluso) também não hidrata
+    def test_carregar_sistema_nao_hidrata(self):
+        with tempfile.TemporaryDirectory() as d:
+            caminho = os.path.join(d, "events.json")
+            sis = SistemaEventos(JsonRepo(caminho))
+            sis.carregar()
+            for nome in ("A", "B"):
+                sis.criar_evento(nome, date.today() + timedelta(days=1), "R", 5, "C", 10.0)
+            sis.inscrever(1, Participante("Ana", "ana@x.com"))
+            sis.inscrever(2, Participante("Ana", "ana@x.com"))
+            sis.checkin(2, "ana@x.com")
+            sis.salvar()
+            sis = SistemaEventos(JsonRepo(caminho))
+            sis.carregar()
+            eventos = list(sis.listar_eventos())
+            self.assertTrue(all(e._pendente is not None for e in eventos))
+            self.assertEqual([(e.id, c) for e, c in sis.eventos_do_participante("ana@x.com")], [(1, False), (2, True)])
+            self.assertTrue(all(e._pendente is not None for e in eventos))
+            self.assertEqual(len(sis._repo.participantes), 0)   # nenhum Participante montado na carga
+            anas = [next(iter(e._inscritos.values())) for e in eventos if e.emails_inscritos()]
+            self.assertIs(anas[0], anas[1])                     # hidratados com o objeto compartilhado
+
+# Testes do modo journal do JsonRepo (cada operação vai para o log na hora)
+class TestJsonRepoJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()                # pasta temporária isolada por teste
+        self.caminho = os.path.join(self.dir.name, "events.json")
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _novo_sistema(self, **kw):                              # sistema com repo journal já carregado
+        repo = JsonRepo(self.caminho, journal=True, fsync=False, **kw)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        return repo, sis
+
+    # Sem chamar salvar(): um novo repo deve reconstruir tudo a partir de snapshot + log
+    def test_reaplica_log_sem_salvar(self):
+        repo, sis = self._novo_sistema()
+        sis.criar_evento("DevConf", self.amanha, "Recife", 3, "Tech", 50.0, tipo="workshop",
+                         material_necessario="Notebook")
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        sis.inscrever(1, Participante("B", "b@x.com"))
+        sis.cancelar_inscricao(1, "a@x.com")
+        sis.checkin(1, "b@x.com")
+        repo.fechar()                                           # simula queda (sem salvar)
+
+        repo2, sis2 = self._novo_sistema()
+        ev = sis2.obter_evento(1)
+        self.assertEqual(ev.tipo, "workshop")                   # tipo preservado
+        self.assertEqual(ev.total_inscritos(), 1)               # A cancelado, B inscrito
+        self.assertFalse(ev.ja_inscrito("a@x.com"))
+        self.assertEqual(sis2.checkin(1, "b@x.com")[1], "Check-in já registrado (idempotente).")
+        ok, msg = sis2.criar_evento("Outro", self.amanha, "Recife", 1, "Tech", 0.0)
+        self.assertIn("ID: 2", msg)                             # contador recuperado do log
+        repo2.fechar()
+
+    # Ao passar do limite o log é dobrado num snapshot e truncado
+    def test_compactacao(self):
+        repo, sis = self._novo_sistema(limite_journal=3)
+        sis.criar_evento("DevConf", self.amanha, "Recife", 10, "Tech", 50.0)
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        sis.inscrever(1, Participante("B", "b@x.com"))          # 3º registro -> compacta
+        self.assertEqual(os.path.getsize(self.caminho + ".log"), 0)
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["eventos"][0]["inscritos"]), 2)
+        sis.inscrever(1, Participante("C", "c@x.com"))          # volta a ir para o log
+        repo.fechar()
+        repo2, sis2 = self._novo_sistema(limite_journal=3)
+        self.assertEqual(sis2.obter_evento(1).total_inscritos(), 3)
+        repo2.fechar()
+
+    # Uma linha cortada no fim do log (queda durante a escrita) é ignorada
+    def test_linha_parcial_ignorada(self):
+        repo, sis = self._novo_sistema()
+        sis.criar_evento("DevConf", self.amanha, "Recife", 10, "Tech", 50.0)
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        repo.fechar()
+        with open(self.caminho + ".log", "a", encoding="utf-8") as f:
+            f.write('{"n": 3, "op": "insc')                     # registro incompleto
+        repo2, sis2 = self._novo_sistema()
+        self.assertEqual(sis2.obter_evento(1).total_inscritos(), 1)
+        repo2.fechar()
+
+# Testes do leitor incremental de events.json
+class TestSnapshotIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.dir.name, "events.json")
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # Só os eventos alterados são recodificados; os demais trechos vêm do cache
+    def test_salvar_recodifica_so_os_sujos(self):
+        repo = JsonRepo(self.caminho)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        for i in range(3):
+            sis.criar_evento(f"E{i}", self.amanha, "Recife", 5, "Tech", 10.0)
+            sis.inscrever(i + 1, Participante("A", "a@x.com"))
+        sis.salvar()
+        antes = {i: f[2] for i, f in repo._fragmentos.items()}
+        sis.checkin(2, "a@x.com")                                 # via SistemaEventos (salvar_evento)
+        repo.buscar_evento(3).cancelar_inscricao("a@x.com")       # direto no Evento (só a versão muda)
+        sis.salvar()
+        self.assertIs(repo._fragmentos[1][2], antes[1])
+        self.assertIsNot(repo._fragmentos[2][2], antes[2])
+        self.assertIsNot(repo._fragmentos[3][2], antes[3])
+
+        repo2 = JsonRepo(self.caminho)
+        repo2.carregar()
+        self.assertEqual(repo2.buscar_evento(2).to_dict()["checkins"], ["a@x.com"])
+        self.assertEqual(repo2.buscar_evento(3).total_inscritos(), 0)
+        self.assertEqual(repo2.proximo_id(), 4)
+
+class TestListaEspera(unittest.TestCase):
+
+    def _cenario(self, sis):
+        sis.criar_evento("Lotado", date.today() + timedelta(days=1), "Recife", 1, "Tech", 10.0)
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        self.assertEqual(sis.entrar_lista_espera(1, Participante("B", "b@x.com"))[0], True)
+        self.assertEqual(sis.entrar_lista_espera(1, Participante("C", "c@x.com"))[0], True)
+        sis.entrar_lista_espera(1, Participante("D", "d@x.com"))
+        sis.cancelar_inscricao(1, "c@x.com")                    # C sai da fila sem ocupar vaga
+
+    # Fila FIFO, sem duplicidade, promoção automática no cancelamento e tamanho no resumo
+    def test_promocao_automatica(self):
+        sis = SistemaEventos(MemoryRepo())
+        self._cenario(sis)
+        self.assertEqual(sis.entrar_lista_espera(1, Participante("B", "B@x.com"))[1],
+                         "Este e-mail já está na lista de espera.")
+        self.assertEqual(sis.entrar_lista_espera(1, Participante("A", "a@x.com"))[1],
+                         "Este e-mail já está inscrito.")
+        self.assertIn("Espera: 2", sis.obter_evento(1).resumo())
+        ok, msg = sis.cancelar_inscricao(1, "a@x.com")
+        self.assertTrue(ok)
+        self.assertIn("b@x.com", msg)
+        ev = sis.obter_evento(1)
+        self.assertEqual(list(ev.emails_inscritos()), ["b@x.com"])
+        self.assertEqual([p.email for p in sis.lista_espera(1)[1]], ["d@x.com"])
+        self.assertEqual(sis.eventos_do_participante("b@x.com")[0][0].id, 1)
+        sis.cancelar_inscricao(1, "b@x.com")
+        self.assertEqual((list(ev.emails_inscritos()), ev.total_espera()), (["d@x.com"], 0))
+
+    # A fila sobrevive a journal, snapshot JSON/binário e SQLite
+    def test_persistencia(self):
+        with tempfile.TemporaryDirectory() as d:
+            for repo, novo in ((JsonRepo(os.path.join(d, "j.json"), journal=True),
+                                lambda: JsonRepo(os.path.join(d, "j.json"), journal=True)),
+                               (BinRepo(os.path.join(d, "b.bin")), lambda: BinRepo(os.path.join(d, "b.bin"))),
+                               (SqliteRepo(os.path.join(d, "s.db")), lambda: SqliteRepo(os.path.join(d, "s.db")))):
+                sis = SistemaEventos(repo)
+                sis.carregar()
+                self._cenario(sis)
+                if isinstance(repo, BinRepo):
+                    sis.salvar()
+                repo.fechar()                                    # JsonRepo: sem salvar, só o journal
+                repo2 = novo()
+                sis2 = SistemaEventos(repo2)
+                sis2.carregar()
+                self.assertEqual([p.email for p in sis2.lista_espera(1)[1]], ["b@x.com", "d@x.com"])
+                sis2.cancelar_inscricao(1, "a@x.com")
+                self.assertEqual(list(sis2.obter_evento(1).emails_inscritos()), ["b@x.com"])
+                repo2.fechar()
+                if isinstance(repo2, BinRepo):
+                    repo2._fechar_snapshot()
+
+    # Reservas não vão ao journal: a entrada na fila e a promoção gravadas valem mesmo assim
+    def test_promocao_apos_reserva_liberada_sobrevive_ao_journal(self):
+        with tempfile.TemporaryDirectory() as d:
+            caminho = os.path.join(d, "j.json")
+            repo = JsonRepo(caminho, journal=True)
+            sis = SistemaEventos(repo)
+            sis.carregar()
+            sis.criar_evento("E", date.today() + timedelta(days=1), "Recife", 2, "Tech", 10.0)
+            sis.inscrever(1, Participante("A", "a@x.com"))
+            sis.reservar(1, "b@x.com", ttl=60)
+            self.assertTrue(sis.entrar_lista_espera(1, Participante("C", "c@x.com"))[0])
+            sis.liberar_reserva(1, "b@x.com")                        # vaga da reserva vai para c
+            self.assertEqual(list(sis.obter_evento(1).emails_inscritos()), ["a@x.com", "c@x.com"])
+            repo.fechar()
+            sis2 = SistemaEventos(JsonRepo(caminho, journal=True))
+            sis2.carregar()
+            ev = sis2.obter_evento(1)
+            self.assertEqual((list(ev.emails_inscritos()), ev.total_espera()), (["a@x.com", "c@x.com"], 0))
+            sis2._repo.fechar()
+
+class TestTokens(unittest.TestCase):
+
+    # Token emitido na inscrição, verificação sem repositório e recusa de token adulterado
+    def test_emitir_verificar(self):
+        sis = SistemaEventos(MemoryRepo(), chave_tokens="segredo")
+        sis.criar_evento("E", date.today() + timedelta(days=1), "Recife", 5, "Tech", 10.0)
+        ok, msg = sis.inscrever(1, Participante("A", "A@x.com"))
+        ok, token = sis.token_checkin(1, "a@x.com")
+        self.assertTrue(ok)
+        self.assertNotIn(token, msg)                             # mensagem igual à de sempre; token à parte
+        self.assertEqual(EmissorTokens("segredo").verificar(token), (1, "a@x.com"))
+        self.assertIsNone(EmissorTokens("outra").verificar(token))
+        self.assertIsNone(EmissorTokens("segredo").verificar(token[:-1] + ("A" if token[-1] != "A" else "B")))
+        self.assertEqual(sis.token_checkin(1, "b@x.com"), (False, "E-mail não inscrito neste evento."))
+        self.assertEqual(sis.checkin_token("lixo"), (False, "Token inválido."))
+        self.assertEqual(sis.checkin_token(token), (True, "Check-in realizado com sucesso."))
+        self.assertEqual(SistemaEventos(MemoryRepo()).token_checkin(1, "a@x.com")[0], False)
+
+    # Estação: lote com duplicados, fila em disco que sobrevive a reinício e sincronização
+    def test_estacao_offline(self):
+        sis = SistemaEventos(MemoryRepo())
+        sis.criar_evento("E", date.today() + timedelta(days=1), "Recife", 5, "Tech", 10.0)
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        emissor = EmissorTokens("segredo")
+        t_a, t_b = emissor.emitir(1, "a@x.com"), emissor.emitir(2, "a@x.com")
+        with tempfile.TemporaryDirectory() as d:
+            fila = os.path.join(d, "porta.jsonl")
+            estacao = EstacaoCheckin("segredo", id_evento=1, caminho_fila=fila)
+            res = estacao.validar_lote([t_a, t_a, t_b, "x.y"])
+            self.assertEqual([ok for ok, _, _ in res], [True, True, False, False])
+            self.assertEqual(res[1][1], "Check-in já registrado (idempotente).")
+            estacao = EstacaoCheckin("segredo", id_evento=1, caminho_fila=fila)  # reinício da estação
+            self.assertEqual(estacao.pendentes(), [(1, "a@x.com")])
+            self.assertTrue(estacao.validar(t_a)[0])
+            self.assertEqual(estacao.sincronizar(sis), [(1, "a@x.com", True, "Check-in realizado com sucesso.")])
+            self.assertEqual((estacao.pendentes(), os.path.getsize(fila)), ([], 0))
+        self.assertEqual(sis.obter_evento(1).total_checkins(), 1)
+
+class TestReservas(unittest.TestCase):
+
+    def setUp(self):
+        self.agora = [0.0]
+        self.sis = SistemaEventos(MemoryRepo())
+        self.sis._reservas.relogio = lambda: self.agora[0]      # relógio virtual
+        self.sis.criar_evento("Show", date.today() + timedelta(days=1), "Recife", 2, "Arte", 50.0)
+
+    # Reserva ocupa vaga, confirmação usa a própria vaga e ninguém passa da capacidade
+    def test_reservar_confirmar_liberar(self):
+        sis = self.sis
+        self.assertTrue(sis.reservar(1, "a@x.com", ttl=60)[0])
+        self.assertTrue(sis.reservar(1, "b@x.com", ttl=60)[0])
+        self.assertEqual(sis.reservar(1, "c@x.com", ttl=60), (False, "Evento lotado."))
+        self.assertEqual(sis.inscrever(1, Participante("C", "c@x.com")), (False, "Evento lotado."))
+        self.assertEqual([e.id for e in sis.relatorio_eventos_com_vagas()], [])
+        self.assertTrue(sis.confirmar_reserva(1, Participante("A", "A@x.com"))[0])
+        self.assertEqual(sis.confirmar_reserva(1, Participante("C", "c@x.com"))[1],
+                         "Reserva não encontrada ou expirada.")
+        self.assertEqual(sis.liberar_reserva(1, "b@x.com"), (True, "Reserva liberada."))
+        ev = sis.obter_evento(1)
+        self.assertEqual((ev.total_inscritos(), ev.total_reservas(), ev.vagas_disponiveis), (1, 0, 1))
+
+    # Reservas vencidas voltam a ser vagas (e promovem a lista de espera); confirmadas não são tocadas
+    def test_expiracao(self):
+        sis = self.sis
+        sis.reservar(1, "a@x.com", ttl=10)
+        sis.reservar(1, "b@x.com", ttl=30)
+        sis.entrar_lista_espera(1, Participante("W", "w@x.com"))
+        sis.confirmar_reserva(1, Participante("B", "b@x.com"))
+        self.agora[0] = 9.9
+        self.assertEqual(sis.liberar_reservas_vencidas(), 0)
+        self.agora[0] = 10.0
+        self.assertEqual(sis.liberar_reservas_vencidas(), 1)   # só a de A; a de B virou inscrição
+        ev = sis.obter_evento(1)
+        self.assertEqual(list(ev.emails_inscritos()), ["b@x.com", "w@x.com"])
+        self.assertEqual(sis.confirmar_reserva(1, Participante("A", "a@x.com"))[0], False)
+        self.agora[0] = 31.0
+        self.assertEqual((sis.liberar_reservas_vencidas(), len(sis._reservas)), (0, 0))
+
+class TestIdempotencia(unittest.TestCase):
+
+    # A repetição com a mesma chave recebe a resposta original sem consultar o repositório
+    def test_repeticao_responde_do_cache(self):
+        repo = MemoryRepo()
+        sis = SistemaEventos(repo)
+        sis.criar_evento("E", date.today() + timedelta(days=1), "Recife", 5, "Tech", 10.0)
+        p = Participante("A", "a@x.com")
+        primeira = sis.inscrever(1, p, chave_idempotencia="k1")
+        consultas = []
+        repo.buscar_evento = lambda i, _b=repo.buscar_evento: consultas.append(i) or _b(i)
+        self.assertEqual(sis.inscrever(1, p, chave_idempotencia="k1"), primeira)
+        self.assertEqual(sis.inscrever(1, p), (False, "Este e-mail já está inscrito."))  # sem chave: executa
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(sis.checkin(1, "a@x.com", chave_idempotencia="k1")[1], "Check-in realizado com sucesso.")
+        self.assertEqual(sis.checkin(1, "a@x.com", chave_idempotencia="k1")[1], "Check-in realizado com sucesso.")
+        e = sis.idempotencia.estatisticas()
+        self.assertEqual((e["acertos"], e["falhas"], e["itens"]), (2, 2, 2))
+
+    # LRU limitado e expiração por tempo
+    def test_lru_e_prazo(self):
+        from idempotencia import CacheIdempotencia
+        agora = [0.0]
+        c = CacheIdempotencia(capacidade=2, ttl=10, relogio=lambda: agora[0])
+        for k in "abc":
+            c.executar(k, lambda k=k: (True, k))
+        self.assertIsNone(c.obter("a"))                         # saiu por falta de espaço
+        self.assertEqual(c.executar("b", lambda: (False, "não executa")), (True, "b"))
+        agora[0] = 10.0
+        self.assertIsNone(c.obter("c"))                         # venceu
+        self.assertEqual((c.descartadas, c.expiradas, len(c)), (1, 1, 1))
+
+class TestMetricas(unittest.TestCase):
+
+    # Ativadas: contam chamadas do sistema e do repositório, bytes do journal e grava o dump
+    def test_metricas_opcionais(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = JsonRepo(os.path.join(d, "events.json"), journal=True)
+            sis = SistemaEventos(repo)
+            self.assertIsNone(sis.metricas)                      # desligadas por padrão
+            sis.carregar()
+            antes = repo.bytes_gravados                          # snapshot inicial criado pelo carregar
+            m = sis.ativar_metricas()
+            self.assertIs(sis.ativar_metricas(), m)              # ativar de novo não instrumenta 2x
+            sis.criar_evento("E", date.today() + timedelta(days=1), "Recife", 5, "Tech", 10.0)
+            for i in range(3):
+                sis.inscrever(1, Participante("A", f"a{i}@x.com"))
+            sis.relatorio_geral()
+            dados = m.instantaneo()
+            self.assertEqual(dados["chamadas"]["sistema.inscrever"]["n"], 3)
+            self.assertEqual(dados["chamadas"]["repo.registrar_operacao"]["n"], 4)
+            self.assertEqual(dados["chamadas"]["sistema.relatorio_geral"]["n"], 1)
+            self.assertEqual(dados["espera_trava"]["n"], 4 + 64)  # 4 operações + montagem do motor
+            self.assertEqual(dados["bytes_gravados"] - antes, os.path.getsize(repo._journal_path))
+            h = dados["chamadas"]["sistema.inscrever"]
+            self.assertLessEqual(h["p50_ms"], h["p99_ms"])
+            caminho = os.path.join(d, "metricas.jsonl")
+            m.gravar_dump(caminho)
+            with open(caminho, encoding="utf-8") as f:
+                self.assertIn("sistema.inscrever", json.loads(f.readline())["chamadas"])
+            sis.entrar_lista_espera(1, Participante("B", "b@x.com"))  # recusada (há vagas), mas medida
+            sis.checkin_token("token-invalido")
+            chamadas = m.instantaneo()["chamadas"]
+            self.assertEqual((chamadas["sistema.entrar_lista_espera"]["n"], chamadas["sistema.checkin_token"]["n"]),
+                             (1, 1))
+            repo.fechar()
+
+class TestRastro(unittest.TestCase):
+
+    def _gravar(self, caminho):
+        sis = SistemaEventos(MemoryRepo())
+        sis.ativar_rastro(caminho)
+        amanha = date.today() + timedelta(days=1)
+        sis.criar_evento("A", amanha, "Recife", 2, "Tech", 10.0)
+        sis.criar_evento("B", amanha, "Olinda", 5, "Arte", 0.0, tipo="palestra", palestrante="Ana")
+        sis.inscrever(1, Participante("Ana", "ana@x.com"))
+        sis.inscrever_lote(2, (Participante(n, f"{n}@x.com") for n in ("bia", "caio")))  # gerador: gravado como lista
+        sis.inscrever(1, Participante("Bia", "bia@x.com"))
+        sis.inscrever(1, Participante("Caio", "caio@x.com"))          # lotado
+        sis.checkin(2, "bia@x.com")
+        self.assertEqual([e.id for e in sis.listar_eventos(limit=1)], [1])  # gerador devolvido continua iterável
+        sis.cancelar_todas_inscricoes("bia@x.com")
+        sis.relatorio_geral()
+        sis.rastro.fechar()
+
+    # Cada chamada de fora vira uma linha (as internas não); a reprodução bate com o gravado
+    def test_grava_e_reproduz(self):
+        with tempfile.TemporaryDirectory() as d:
+            caminho = os.path.join(d, "rastro.jsonl")
+            self._gravar(caminho)
+            inicio, registros = ler_rastro(caminho)
+            self.assertEqual([r["metodo"] for r in registros],
+                             ["criar_evento", "criar_evento", "inscrever", "inscrever_lote", "inscrever", "inscrever",
+                              "checkin", "listar_eventos", "cancelar_todas_inscricoes", "relatorio_geral"])
+            self.assertEqual(registros[3]["args"][1][1], {"__participante__": ["caio", "caio@x.com"]})
+            self.assertEqual(registros[5]["resultado"], [False, "Evento lotado."])
+
+            r = Reproducao(SistemaEventos(MemoryRepo()), registros, inicio).executar()
+            self.assertEqual((r["operacoes"], r["divergencias"]), (10, 0))
+            self.assertEqual(r["por_metodo"]["inscrever"]["n"], 3)
+            r = Reproducao(SistemaEventos(MemoryRepo()), registros, inicio, workers=3).executar()
+            self.assertEqual(r["divergencias"], 0)
+
+            sis = SistemaEventos(MemoryRepo())                      # estado de partida diferente: diverge
+            sis.criar_evento("Antes", date.today() + timedelta(days=1), "Recife", 1, "Tech", 1.0)
+            reproducao = Reproducao(sis, registros, inicio)
+            self.assertGreater(reproducao.executar()["divergencias"], 0)
+            self.assertEqual(reproducao.exemplos[0][:2], (0, "criar_evento"))
+
+class TestLeitorEventosJson(unittest.TestCase):
+
+    # Com blocos minúsculos (valores cortados no meio) o resultado é igual ao json.load
+    def test_equivale_ao_json_load(self):
+        from json_stream import LeitorEventosJson
+        doc = {"eventos": [{"id": 1, "nome": "Café ☕", "preco": 12345.5, "inscritos": [{"nome": "A", "email": "a@x.com"}]},
+                           {"id": 22, "nome": "B", "preco": 0, "checkins": []}],
+               "seq": 123456}                                    # seq depois da lista
+        with tempfile.TemporaryDirectory() as d:
+            caminho = os.path.join(d, "events.json")
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(doc, f, ensure_ascii=False, indent=2)
+            for bloco in (1, 3, 7, 64 * 1024):
+                leitor = LeitorEventosJson(caminho, tamanho_bloco=bloco)
+                self.assertEqual(list(leitor), doc["eventos"])
+                self.assertEqual(leitor.campos, {"seq": 123456})
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write('{"seq": 1, "eventos": [ ]}')
+            leitor = LeitorEventosJson(caminho, tamanho_bloco=2)
+            self.assertEqual(list(leitor), [])
+            self.assertEqual(leitor.campos, {"seq": 1})
+
+# Testes do SqliteRepo usado como repositório do SistemaEventos
+class TestSqliteRepo(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.dir.name, "events.db")
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # Tudo que foi feito numa sessão aparece numa conexão nova (sem salvar())
+    def test_persistencia_por_operacao(self):
+        repo = SqliteRepo(self.caminho)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        sis.criar_evento("Talk", self.amanha, "Recife", 2, "Tech", 30.0, tipo="palestra",
+                         palestrante="Maria")
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        sis.inscrever(1, Participante("B", "B@x.com"))
+        sis.checkin(1, "a@x.com")
+        sis.cancelar_inscricao(1, "a@x.com")
+        repo.fechar()
+
+        repo2 = SqliteRepo(self.caminho)
+        sis2 = SistemaEventos(repo2)
+        ev = sis2.obter_evento(1)
+        self.assertEqual((ev.tipo, ev.palestrante), ("palestra", "Maria"))
+        self.assertEqual([p["email"] for p in ev.to_dict()["inscritos"]], ["b@x.com"])
+        self.assertEqual(ev.to_dict()["checkins"], [])          # check-in de A saiu com o cancelamento
+        self.assertEqual(repo2.proximo_id(), 2)                 # sequência vem do banco
+        self.assertEqual(len(list(sis2.listar_eventos())), 1)
+        self.assertIsNone(sis2.obter_evento(99))
+        repo2.fechar()
+
+    # Pelo SistemaEventos só a linha da operação é gravada; alteração direta + salvar_evento regrava o evento
+    def test_salvar_evento_alterado_fora_do_sistema(self):
+        repo = SqliteRepo(self.caminho)
+        sis = SistemaEventos(repo)
+        sis.criar_evento("Talk", self.amanha, "Recife", 5, "Tech", 30.0)
+        gravados = []
+        original = repo._grava_evento
+        repo._grava_evento = lambda cur, ev: (gravados.append(ev.id), original(cur, ev))
+        sis.inscrever(1, Participante("A", "a@x.com"))
+        sis.checkin(1, "a@x.com")
+        self.assertEqual(gravados, [])                          # só linhas de inscrição/check-in
+        ev = repo.buscar_evento(1)
+        ev.inscrever(Participante("B", "b@x.com"))              # fora do SistemaEventos
+        repo.salvar_evento(ev)
+        repo.salvar_evento(ev)                                  # já em dia: não regrava
+        self.assertEqual(gravados, [1])
+        repo.fechar()
+        repo2 = SqliteRepo(self.caminho)
+        ev2 = repo2.buscar_evento(1)
+        self.assertEqual(([p["email"] for p in ev2.to_dict()["inscritos"]], ev2.to_dict()["checkins"]),
+                         (["a@x.com", "b@x.com"], ["a@x.com"]))
+        repo2.fechar()
+
+class TestParticipantesCompartilhados(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.dir.name, "events.json")
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    # A mesma pessoa é um único objeto em todos os eventos; o arquivo guarda a tabela uma vez
+    def test_tabela_unica_no_snapshot(self):
+        sis = SistemaEventos(JsonRepo(self.caminho))
+        sis.carregar()
+        for nome in ("A", "B", "C"):
+            sis.criar_evento(nome, self.amanha, "Recife", 5, "Tech", 10.0)
+        for i in (1, 2, 3):
+            sis.inscrever(i, Participante("Ana", " ANA@x.com "))
+        sis.inscrever(3, Participante("Ana Maria", "ana@x.com"))     # mesmo e-mail, outro nome: entrada própria
+        sis.inscrever(2, Participante("Bia", "bia@x.com"))
+        sis.checkin(2, "ana@x.com")
+        anas = [next(iter(sis.obter_evento(i)._inscritos.values())) for i in (1, 2, 3)]
+        self.assertTrue(anas[0] is anas[1] is anas[2])
+        sis.salvar()
+
+        with open(self.caminho, encoding="utf-8") as f:
+            dados = json.load(f)
+        self.assertEqual(dados["participantes"], [["Ana", "ana@x.com"], ["Bia", "bia@x.com"]])  # "Ana Maria" foi
+        self.assertEqual([(e["inscritos"], e["checkins"]) for e in dados["eventos"]],        # recusada: fica fora
+                         [([0], []), ([0, 1], [0]), ([0], [])])
+
+        sis2 = SistemaEventos(JsonRepo(self.caminho))
+        sis2.carregar()
+        ev1, ev2 = sis2.obter_evento(1), sis2.obter_evento(2)
+        self.assertEqual(ev2.to_dict()["inscritos"], [{"nome": "Ana", "email": "ana@x.com"},
+                                                      {"nome": "Bia", "email": "bia@x.com"}])
+        self.assertEqual(set(ev2.emails_checkin()), {"ana@x.com"})
+        ev1.emails_inscritos()                                  # hidrata
+        self.assertIs(ev1._inscritos["ana@x.com"], ev2._inscritos["ana@x.com"])
+        sis2.inscrever(3, Participante("Bia", "bia@x.com"))
+        self.assertIs(sis2.obter_evento(3)._inscritos["bia@x.com"], ev2._inscritos["bia@x.com"])
+        sis2.salvar()
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["participantes"], [["Ana", "ana@x.com"], ["Bia", "bia@x.com"]])
+        sis2.cancelar_inscricao(2, "bia@x.com")
+        sis2.cancelar_inscricao(3, "bia@x.com")
+        self.assertFalse(sis2.entrar_lista_espera(1, Participante("Caio", "caio@x.com"))[0])  # recusado: fora
+        sis2.salvar()                                           # quem não está em evento algum sai do arquivo
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["participantes"], [["Ana", "ana@x.com"]])
+
+    # A tabela codificada acompanha as contagens: só é refeita quando alguém entra ou sai dela
+    def test_tabela_incremental(self):
+        repo = JsonRepo(self.caminho)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        for nome in ("A", "B"):
+            sis.criar_evento(nome, self.amanha, "Recife", 5, "Tech", 10.0)
+        sis.inscrever(1, Participante("Ana", "ana@x.com"))
+        sis.inscrever(2, Participante("Bia", "bia@x.com"))
+        sis.inscrever(2, Participante("Ana", "ana@x.com"))
+        sis.salvar()
+        tabela = repo._tabela.codificar()
+        sis.checkin(1, "ana@x.com")
+        sis.cancelar_inscricao(2, "ana@x.com")                  # Ana continua citada pelo evento 1
+        sis.salvar()
+        self.assertIs(repo._tabela.codificar(), tabela)         # conjunto igual: nada recodificado
+        sis.cancelar_inscricao(2, "bia@x.com")
+        sis.salvar()
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["participantes"], [["Ana", "ana@x.com"]])
+        sis.inscrever(2, Participante("Bia", "bia@x.com"))
+        sis.salvar()
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["participantes"], [["Ana", "ana@x.com"], ["Bia", "bia@x.com"]])
+        sis2 = SistemaEventos(JsonRepo(self.caminho))
+        sis2.carregar()
+        self.assertEqual(list(sis2.obter_evento(2).emails_inscritos()), ["bia@x.com"])
+
+    # Arquivo no formato antigo (inscritos completos em cada evento) é lido e regravado com a tabela
+    def test_le_formato_antigo(self):
+        from evento import Evento
+        ev = Evento(1, "Antigo", self.amanha, "Recife", 5, "Tech", 10.0)
+        ev.inscrever(Participante("Ana", "ana@x.com"))
+        ev.checkin("ana@x.com")
+        with open(self.caminho, "w", encoding="utf-8") as f:
+            json.dump({"seq": 2, "eventos": [ev.to_dict()]}, f)
+        repo = JsonRepo(self.caminho)
+        repo.carregar()
+        self.assertEqual(repo.buscar_evento(1).to_dict(), ev.to_dict())
+        repo.salvar()
+        with open(self.caminho, encoding="utf-8") as f:
+            dados = json.load(f)
+        self.assertEqual((dados["participantes"], dados["eventos"][0]["inscritos"]), ([["Ana", "ana@x.com"]], [0]))
+
+class TestParticionado(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _sessao(self, processos):
+        opcoes = {} if processos else {"journal": True}         # com processos, o journal já é o padrão
+        repo = PartitionedRepo(self.dir.name, 3, processos=processos, fsync=False, **opcoes)
+        sis = SistemaEventos(repo)
+        sis.carregar()
+        return repo, sis
+
+    # IDs revezam entre as partições; listagem e busca juntam todas; tudo volta dos arquivos
+    def _verificar(self, processos):
+        repo, sis = self._sessao(processos)
+        for i in range(7):
+            sis.criar_evento(f"E{i}", self.amanha + timedelta(days=6 - i), "Recife", 5, "Tech", 10.0)
+        self.assertEqual([repo.particao(e.id) for e in sis.listar_eventos()], [0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual([e.id for e in sis.listar_eventos(after_id=2, limit=3)], [3, 4, 5])
+        self.assertEqual([e.id for e in repo.buscar_eventos(categoria="tech")], [7, 6, 5, 4, 3, 2, 1])
+        sis.inscrever(5, Participante("A", "a@x.com"))
+        sis.checkin(5, "a@x.com")
+        repo.fechar()                                           # sem salvar(): o journal de cada partição basta
+
+        repo, sis = self._sessao(processos)
+        ev = sis.obter_evento(5)
+        self.assertEqual((ev.total_inscritos(), ev.total_checkins()), (1, 1))
+        self.assertEqual(len(list(sis.listar_eventos())), 7)
+        self.assertTrue(os.path.exists(os.path.join(self.dir.name, "p1.json.log")))
+        sis.criar_evento("Novo", self.amanha, "Recife", 5, "Tech", 10.0)
+        self.assertEqual(repo.particao(max(e.id for e in sis.listar_eventos())), 0)
+        repo.fechar()
+
+    def test_mesmo_processo(self):
+        self._verificar(False)
+
+    def test_uma_particao_por_processo(self):
+        self._verificar(True)
+
+class TestSnapshotBinario(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.amanha = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _caminho(self, nome):
+        return os.path.join(self.dir.name, nome)
+
+    # JSON -> binário -> JSON preserva todos os eventos (tipos, inscritos, check-ins, contador)
+    def test_conversao_ida_e_volta(self):
+        sis = SistemaEventos(JsonRepo(self._caminho("events.json")))
+        sis.carregar()
+        sis.criar_evento("Oficina", self.amanha, "Recife", 5, "Tech", 10.5, tipo="workshop",
+                         material_necessario="Notebook")
+        sis.criar_evento("Talk", self.amanha, "Olinda", 5, "Negócios", 0.0, tipo="palestra", palestrante="Ana")
+        sis.inscrever(1, Participante("José", "jose@x.com"))
+        sis.inscrever(2, Participante("José", "jose@x.com"))
+        sis.checkin(2, "jose@x.com")
+        sis.salvar()
+        json_para_bin(self._caminho("events.json"), self._caminho("events.bin"))
+        bin_para_json(self._caminho("events.bin"), self._caminho("volta.json"))
+        with open(self._caminho("events.json"), encoding="utf-8") as a, \
+                open(self._caminho("volta.json"), encoding="utf-8") as b:
+            self.assertEqual(json.load(a), json.load(b))
+
+    # BinRepo decodifica sob demanda, busca pelos índices e regrava o arquivo ao salvar
+    def test_bin_repo_sob_demanda(self):
+        caminho = self._caminho("events.bin")
+        repo0 = BinRepo(caminho, journal=True)
+        sis = SistemaEventos(repo0)
+        sis.carregar()
+        for i in range(3):
+            sis.criar_evento(f"E{i}", self.amanha, "Recife", 2, "Tech" if i else "Arte", 10.0)
+        sis.inscrever(2, Participante("A", "a@x.com"))
+        sis.salvar()
+        sis.inscrever(3, Participante("B", "b@x.com"))   # só no journal
+        repo0.fechar()
+
+        repo = BinRepo(caminho, journal=True)
+        repo.carregar()
+        self.assertEqual(sorted(repo._eventos), [3])      # só o evento tocado pelo journal foi decodificado
+        sis = SistemaEventos(repo)
+        sis.carregar()                                    # o sistema também não decodifica nada na carga
+        self.assertEqual(sorted(repo._eventos), [3])
+        self.assertEqual(list(repo.buscar_evento(2).emails_inscritos()), ["a@x.com"])
+        self.assertEqual([e.id for e in repo.buscar_eventos(categoria="tech")], [2, 3])
+        self.assertEqual(repo.proximo_id(), 4)
+        repo.salvar()
+        repo2 = BinRepo(caminho)
+        repo2.carregar()
+        self.assertEqual([e.total_inscritos() for e in repo2.todos_eventos()], [0, 1, 1])
+        repo2._fechar_snapshot()
+
+class TestArquivoFrio(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.dir.name, "events.json")
+        self.pasta = os.path.join(self.dir.name, "arquivo")
+        self.hoje = date.today()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _sistema(self):
+        sis = SistemaEventos(JsonRepo(self.caminho, journal=True, pasta_arquivo=self.pasta, carencia_dias=30))
+        sis.carregar()
+        return sis
+
+    # Eventos de datas passadas (criados direto no repositório: criar_evento recusa) com um inscrito cada
+    def _historico(self, dias):
+        from evento import Evento
+        repo = JsonRepo(self.caminho)
+        repo.carregar()
+        for i, d in enumerate(dias, start=1):
+            ev = Evento(i, f"E{i}", self.hoje + timedelta(days=d), "Recife", 5, "Tech", 10.0)
+            ev.inscrever(Participante("Ana", "ana@x.com"))
+            repo.salvar_evento(ev)
+        repo.salvar()
+
+    # Encerrados há mais que a carência saem do snapshot; busca por ID e relatórios ainda os acham
+    def test_arquiva_encerrados(self):
+        self._historico([-400, -90, -60, -10, 5])
+        sis = self._sistema()
+        self.assertEqual([e.id for e in sis.listar_eventos()], [4, 5])
+        self.assertEqual([e.id for e in sis.relatorio_eventos_com_vagas()], [4, 5])
+        self.assertIsNone(sis._repo.arquivo._blocos)             # vagas: o arquivo frio nem foi aberto
+        self.assertEqual(sis.relatorio_ocupacao_evento(1)[1]["inscritos"], 1)
+        with open(self.caminho, encoding="utf-8") as f:
+            self.assertEqual([e["id"] for e in json.load(f)["eventos"]], [4, 5])
+        meses = sorted({(self.hoje + timedelta(days=d)).strftime("%Y-%m") for d in (-400, -90, -60)})
+        self.assertEqual(sis._repo.arquivo.meses(), meses)
+        self.assertEqual(list(sis.obter_evento(1).emails_inscritos()), ["ana@x.com"])
+        self.assertIsNone(sis.obter_evento(9))
+        self.assertEqual((sis.relatorio_geral()["eventos"], sis.relatorio_geral()["inscritos"]), (5, 5))
+        self.assertEqual([e.id for e in sis.relatorio_eventos_com_vagas()], [4, 5])
+
+        sis.inscrever(2, Participante("Bia", "bia@x.com"))      # arquivado alterado: volta à memória
+        self.assertEqual(sis.relatorio_total_inscritos(2), (True, 2))
+        sis.salvar()
+        sis = self._sistema()                                    # e é arquivado de novo (vale a versão nova)
+        self.assertEqual([e.id for e in sis.listar_eventos()], [4, 5])
+        self.assertEqual(sis.relatorio_total_inscritos(2), (True, 2))
+        self.assertEqual(sorted(e.id for e in sis._repo.eventos_arquivados()), [1, 2, 3])
+        self.assertEqual(sis.relatorio_geral()["inscritos"], 6)
+
+    # Alteração num arquivado fica só no journal até a queda: a reaplicação acha o evento no arquivo
+    def test_journal_de_evento_arquivado(self):
+        self._historico([-90, 5])
+        sis = self._sistema()
+        self.assertIs(sis.obter_evento(1), sis.obter_evento(1))  # o mesmo objeto a cada busca
+        self.assertTrue(sis.cancelar_inscricao(1, "ana@x.com")[0])
+        self.assertEqual(sis.relatorio_total_inscritos(1), (True, 0))
+        sis._repo.fechar()                                       # queda: sem salvar()
+        sis = self._sistema()
+        self.assertEqual(sis.relatorio_total_inscritos(1), (True, 0))
+        self.assertEqual([e.id for e in sis.listar_eventos()], [2])
+        sis._repo.fechar()
+
+    # Sem o arquivo frio configurado, o log que cita um evento arquivado não é descartado em silêncio
+    def test_journal_de_arquivado_sem_pasta_falha(self):
+        self._historico([-90, 5])
+        sis = self._sistema()
+        self.assertTrue(sis.checkin(1, "ana@x.com")[0])
+        sis._repo.fechar()                                       # queda: sem salvar()
+        tamanho = os.path.getsize(self.caminho + ".log")
+        with self.assertRaises(ValueError):
+            SistemaEventos(JsonRepo(self.caminho, journal=True)).carregar()
+        self.assertEqual(os.path.getsize(self.caminho + ".log"), tamanho)  # log intacto
+        sis = self._sistema()
+        self.assertEqual(sis.relatorio_ocupacao_evento(1)[1]["checkins"], 1)
+        sis._repo.fechar()
+
+    # Queda no meio do arquivamento: a linha cortada do índice é ignorada e a seguinte começa limpa
+    def test_indice_com_linha_cortada(self):
+        self._historico([-100, -90])
+        self._sistema()
+        with open(os.path.join(self.pasta, "indice.jsonl"), "ab") as f:
+            f.write(b'{"mes":"2000-01","pos":0,"ta')
+        self._historico([-100, -90, -80])                        # o 3º chega depois da queda
+        sis = self._sistema()
+        self.assertEqual(sis.obter_evento(3).nome, "E3")
+        self.assertEqual(len(sis._repo.arquivo), 3)
+        self.assertEqual(sis._repo.arquivo.meses(), sorted({(self.hoje + timedelta(days=d)).strftime("%Y-%m")
+                                                            for d in (-100, -90, -80)}))
+
 # Executa os testes quando o arquivo é chamado diretamente
 if __name__ == "__main__":
     unittest.main()
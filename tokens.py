@@ -0,0 +1,184 @@
+"""Tokens de check-in assinados (HMAC) e estação de check-in que funciona sem o repositório.
+
+O token é ``base64url(id do evento + e-mail) "." base64url(HMAC-SHA256 truncado)``:
+curto o bastante para um QR code e verificável só com a chave, em tempo constante.
+A estação valida os tokens lidos na porta, guarda os check-ins numa fila local
+(arquivo JSON Lines) e depois os aplica no sistema com ``sincronizar``:
+
+    python -m tokens estacao --chave SEGREDO --fila data/porta1.jsonl [--evento 3]
+    python -m tokens sincronizar --fila data/porta1.jsonl [--arquivo data/events.json]
+"""
+import argparse, base64, hmac, json, os, struct, sys
+from datetime import datetime
+from hashlib import sha256
+
+_ID = struct.Struct(">I")
+_TAM_ASSINATURA = 12                           # 96 bits de HMAC bastam para um ingresso
+
+
+def _b64(dados: bytes) -> str:
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+
+def _de_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+class EmissorTokens:
+    """Emite e verifica tokens com uma chave secreta (o estado interno do HMAC é montado uma vez)."""
+    def __init__(self, chave):
+        if isinstance(chave, str):
+            chave = chave.encode("utf-8")
+        if not chave:
+            raise ValueError("A chave dos tokens não pode ser vazia.")
+        self._base = hmac.new(chave, digestmod=sha256)     # copy() evita refazer o preparo da chave
+
+    def _assinatura(self, carga: bytes) -> bytes:
+        h = self._base.copy()
+        h.update(carga)
+        return h.digest()[:_TAM_ASSINATURA]
+
+    def emitir(self, id_evento: int, email: str) -> str:
+        carga = _ID.pack(id_evento) + email.strip().lower().encode("utf-8")
+        return f"{_b64(carga)}.{_b64(self._assinatura(carga))}"
+
+    def verificar(self, token: str):
+        """(id do evento, e-mail) se a assinatura confere; None caso contrário."""
+        try:
+            texto_carga, texto_assinatura = token.strip().split(".")
+            carga, assinatura = _de_b64(texto_carga), _de_b64(texto_assinatura)
+        except (ValueError, TypeError):                    # formato ou base64 inválido
+            return None
+        if len(carga) < _ID.size or not hmac.compare_digest(self._assinatura(carga), assinatura):
+            return None
+        return _ID.unpack_from(carga)[0], carga[_ID.size:].decode("utf-8", "replace")
+
+    def verificar_lote(self, tokens) -> list:
+        """Verifica vários tokens de uma vez: [(id, e-mail) ou None] na mesma ordem."""
+        verificar = self.verificar
+        return [verificar(t) for t in tokens]
+
+
+class EstacaoCheckin:
+    """Estação de porta: valida tokens sem consultar o repositório e enfileira os check-ins.
+
+    Cada check-in aceito vai para a memória e, se houver ``caminho_fila``, para um
+    arquivo JSON Lines (sobrevive a queda da estação). Tokens repetidos são
+    idempotentes. ``sincronizar(sistema)`` aplica a fila via ``SistemaEventos.checkin``
+    (journal, relatórios e índices atualizados normalmente) e a esvazia.
+    """
+    def __init__(self, chave, id_evento: int = None, caminho_fila: str = None):
+        self._emissor = EmissorTokens(chave)
+        self._id_evento = id_evento                    # None: aceita qualquer evento
+        self._caminho = caminho_fila
+        self._fila = []                                # [(id, e-mail)] ainda não sincronizados
+        self._vistos = set()                           # (id, e-mail) já lidos nesta estação
+        for id_evento_fila, email in _ler_fila(caminho_fila):  # retoma a fila de uma sessão anterior
+            self._enfileirar_memoria(id_evento_fila, email)
+
+    def validar(self, token: str):
+        """(ok, mensagem, (id, e-mail) ou None) para um token lido na porta."""
+        return self.validar_lote([token])[0]
+
+    def validar_lote(self, tokens) -> list:
+        """Valida uma rajada de leituras; grava a fila uma vez por lote."""
+        resultados, novos = [], []
+        for token, dados in zip(tokens, self._emissor.verificar_lote(tokens)):
+            if dados is None:
+                resultados.append((False, "Token inválido.", None))
+            elif self._id_evento is not None and dados[0] != self._id_evento:
+                resultados.append((False, "Token de outro evento.", dados))
+            elif dados in self._vistos:
+                resultados.append((True, "Check-in já registrado (idempotente).", dados))
+            else:
+                self._enfileirar_memoria(*dados)
+                novos.append(dados)
+                resultados.append((True, "Check-in realizado com sucesso.", dados))
+        if novos and self._caminho:
+            agora = datetime.now().isoformat(timespec="seconds")
+            with open(self._caminho, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps({"id": i, "email": e, "em": agora}, ensure_ascii=False) + "\n"
+                             for i, e in novos)
+                f.flush()
+                os.fsync(f.fileno())
+        return resultados
+
+    def pendentes(self) -> list:
+        """Check-ins aceitos que ainda não foram aplicados no sistema."""
+        return list(self._fila)
+
+    def sincronizar(self, sistema) -> list:
+        """Aplica a fila no sistema: [(id, e-mail, ok, msg)]. A fila local é esvaziada."""
+        resultados = [(i, e) + tuple(sistema.checkin(i, e)) for i, e in self._fila]
+        self._fila = []
+        if self._caminho and os.path.exists(self._caminho):
+            open(self._caminho, "w", encoding="utf-8").close()
+        return resultados
+
+    def _enfileirar_memoria(self, id_evento, email):
+        if (id_evento, email) not in self._vistos:
+            self._vistos.add((id_evento, email))
+            self._fila.append((id_evento, email))
+
+
+def _ler_fila(caminho):
+    if not caminho or not os.path.exists(caminho):
+        return
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                reg = json.loads(linha)
+            except ValueError:                         # linha parcial (queda no meio da gravação)
+                continue
+            yield int(reg["id"]), reg["email"]
+
+
+def sincronizar_fila(caminho: str, sistema) -> list:
+    """Aplica no sistema a fila gravada por uma estação (sem precisar da chave) e a esvazia."""
+    resultados = [(i, e) + tuple(sistema.checkin(i, e)) for i, e in dict.fromkeys(_ler_fila(caminho))]
+    if os.path.exists(caminho):
+        open(caminho, "w", encoding="utf-8").close()
+    return resultados
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Estação de check-in com tokens assinados")
+    sub = ap.add_subparsers(dest="comando", required=True)
+    est = sub.add_parser("estacao", help="lê tokens (um por linha) e enfileira os check-ins")
+    est.add_argument("--chave", default=os.environ.get("EVENTOS_CHAVE_TOKENS"))
+    est.add_argument("--fila", required=True)
+    est.add_argument("--evento", type=int)
+    sinc = sub.add_parser("sincronizar", help="aplica a fila no arquivo de eventos")
+    sinc.add_argument("--fila", required=True)
+    sinc.add_argument("--arquivo", default="data/events.json")
+    sinc.add_argument("--pasta-arquivo", default="data/arquivo",
+                      help="arquivo frio dos eventos encerrados (o mesmo do servidor)")
+    sinc.add_argument("--carencia", type=int, default=30, help="dias após o evento antes de arquivá-lo")
+    args = ap.parse_args()
+
+    if args.comando == "estacao":
+        if not args.chave:
+            ap.error("informe --chave ou EVENTOS_CHAVE_TOKENS")
+        estacao = EstacaoCheckin(args.chave, args.evento, args.fila)
+        print("Leia os tokens (Ctrl+D para sair).")
+        for linha in sys.stdin:
+            if linha.strip():
+                ok, msg, dados = estacao.validar(linha)
+                print(("✔️ " if ok else "❌ ") + msg + (f" {dados[1]}" if dados else ""))
+        print(f"{len(estacao.pendentes())} check-in(s) aguardando sincronização.")
+        return
+
+    from json_repo import JsonRepo
+    from sistemas_evento import SistemaEventos
+    sistema = SistemaEventos(JsonRepo(args.arquivo, journal=True, pasta_arquivo=args.pasta_arquivo,
+                                      carencia_dias=args.carencia))
+    sistema.carregar()
+    try:
+        for id_evento, email, ok, msg in sincronizar_fila(args.fila, sistema):  # fila já verificada
+            print(f"[{id_evento}] {email}: " + ("✔️ " if ok else "❌ ") + msg)
+    finally:
+        sistema.salvar()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ from evento import Evento  # importa a classe base
 # Subclasse Workshop acrescenta o campo "material_necessario"
 
 class Workshop(Evento):  # define que Workshop herda de Evento
+    __slots__ = ("_material_necessario",)  # campo específico (a base já define os demais slots)
+
     def __init__(self, id_, nome, data_evento, local, capacidade_max, categoria, preco,
                  material_necessario: str):  # inclui campo específico
         super().__init__(id_, nome, data_evento, local, capacidade_max, categoria, preco)  # inicializa base
@@ -19,14 +21,14 @@ class Workshop(Evento):  # define que Workshop herda de Evento
         base = super().resumo()     # aproveita o resumo da classe base
         return f"{base} | Material: {self._material_necessario}"  # adiciona informação
 
-    def to_dict(self) -> dict:      # serializa incluindo campo específico
-        data = super().to_dict()    # pega dict base
+    def to_dict(self, participantes=None) -> dict:  # serializa incluindo campo específico
+        data = super().to_dict(participantes)  # pega dict base
         data["tipo"] = "workshop"   # garante tipo correto
         data["material_necessario"] = self._material_necessario  # campo extra
         return data                 # retorna dict completo
 
     @classmethod
-    def from_dict(cls, d: dict):    # desserializa um Workshop
+    def from_dict(cls, d: dict, participantes=None):  # desserializa um Workshop
         from datetime import date   # importa date para parse
         data = date.fromisoformat(d["data_evento"])  # converte data ISO
         obj = cls(                  # cria instância de Workshop
@@ -39,10 +41,5 @@ class Workshop(Evento):  # define que Workshop herda de Evento
             preco=float(d.get("preco", 0.0)),      # preço
             material_necessario=d.get("material_necessario", ""),  # campo específico
         )
-        # reconstrói inscritos/check-ins a partir do dict, reaproveitando lógica da base
-        from participante import Participante       # importa Participante aqui para evitar ciclos
-        inscritos = [Participante.from_dict(x) for x in d.get("inscritos", [])]  # lista de inscritos
-        obj._inscritos = inscritos                  # aplica inscritos
-        obj._inscritos_emails = {p.email for p in inscritos}  # set de e-mails
-        obj._checkins = set(d.get("checkins", []))  # aplica check-ins
+        obj._restaurar_inscricoes(d, participantes)  # reconstrói inscritos/check-ins reaproveitando lógica da base
         return obj                                  # retorna objeto